@@ -0,0 +1,36 @@
+"""
+Time the parser on pathological inputs at growing sizes.
+
+Each row shows the time to parse and serialize an input of size n and the
+growth factor from the previous size; linear code grows by about the same
+factor as n.
+
+Run from the repository root:
+
+    python benchmarks/bench_adversarial.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.tests.test_linear_time import ADVERSARIAL_INPUTS, parse_time
+
+SIZES = [1000, 4000, 16000, 64000]
+
+
+def main():
+    print(f"{'input':<26}" + "".join(f"{n:>16}" for n in SIZES))
+    for name, make in ADVERSARIAL_INPUTS.items():
+        cells = []
+        previous = None
+        for n in SIZES:
+            elapsed = parse_time(make(n))
+            growth = f"x{elapsed / previous:.1f}" if previous else ""
+            cells.append(f"{elapsed * 1000:9.2f}ms{growth:>5}")
+            previous = elapsed
+        print(f"{name:<26}" + "".join(f"{cell:>16}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure the cost of HTML escaping in the serializer.
+
+Parses a corpus once, then serializes it with HTMLNode.to_html() and with
+a copy of the pre-escaping to_html()/props_to_html() methods swapped in, and reports the relative overhead.
+
+Run from the repository root:
+
+    python benchmarks/bench_escaping.py [pages]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.block_markdown import markdown_to_html_node
+from src.htmlnode import HTMLNode, LeafNode, ParentNode
+
+
+def _raw_props_to_html(self):
+    if self.props is None:
+        return ""
+    props_html = ""
+    for prop in self.props:
+        props_html += f' {prop}="{self.props[prop]}"'
+    return props_html
+
+
+def _raw_leaf_to_html(self):
+    if self.value is None:
+        raise ValueError("invalid HTML: no value")
+    if self.tag is None:
+        return self.value
+    return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+
+def _raw_parent_to_html(self):
+    children_html = "".join(child.to_html() for child in self.children)
+    return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+
+
+RAW_METHODS = {
+    (HTMLNode, "props_to_html"): _raw_props_to_html,
+    (LeafNode, "to_html"): _raw_leaf_to_html,
+    (ParentNode, "to_html"): _raw_parent_to_html,
+}
+
+
+def serialize_raw(trees):
+    """Serialize with the methods as they were before escaping was added."""
+    saved = {key: getattr(*key) for key in RAW_METHODS}
+    for (cls, name), method in RAW_METHODS.items():
+        setattr(cls, name, method)
+    try:
+        return serialize_all(trees)
+    finally:
+        for (cls, name), method in saved.items():
+            setattr(cls, name, method)
+
+
+def load_corpus(count):
+    """The repository's own content, repeated, plus a few special characters."""
+    pages = []
+    for root, _, files in os.walk("content"):
+        for file in files:
+            if file.endswith(".md"):
+                with open(os.path.join(root, file)) as f:
+                    pages.append(f.read().split("\n---\n", 1)[-1])
+    pages.append("# Escapes\n\nFish & chips < 5 > 3 and [a link](/search?q=a&b=\"c\")")
+    return [pages[i % len(pages)] for i in range(count)]
+
+
+def serialize_all(trees):
+    start = time.perf_counter()
+    for tree in trees:
+        tree.to_html()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    trees = [markdown_to_html_node(page) for page in load_corpus(count)]
+
+    baseline = min(serialize_raw(trees) for _ in range(7))
+    escaped = min(serialize_all(trees) for _ in range(7))
+
+    print(f"pages: {count}")
+    print(f"without escaping: {baseline * 1000:8.1f} ms")
+    print(f"with escaping:    {escaped * 1000:8.1f} ms ({escaped / baseline - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare the object tree and the flat array document on a list-heavy page.
+
+Reports parse + serialize time and the peak memory held by the parsed
+document for markdown_to_html_node() and markdown_to_flat_document().
+
+Run from the repository root:
+
+    python benchmarks/bench_flatdoc.py [items]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.block_markdown import markdown_to_html_node
+from src.flatdoc import markdown_to_flat_document
+
+
+def make_page(items):
+    lines = [f"- item {i} with **bold** and a [link](/page/{i})" for i in range(items)]
+    return "# Big list\n\n" + "\n".join(lines)
+
+
+def measure(parse, markdown):
+    tracemalloc.start()
+    start = time.perf_counter()
+    document = parse(markdown)
+    parsed = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    document.to_html()
+    serialized = time.perf_counter()
+    return parsed - start, serialized - parsed, retained, peak
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    markdown = make_page(items)
+    print(f"list items: {items}")
+    for name, parse in (("tree", markdown_to_html_node), ("flat", markdown_to_flat_document)):
+        # Time without tracemalloc overhead, memory from a separate run
+        start = time.perf_counter()
+        document = parse(markdown)
+        parse_time = time.perf_counter() - start
+        start = time.perf_counter()
+        document.to_html()
+        serialize_time = time.perf_counter() - start
+        del document
+        _, _, retained, peak = measure(parse, markdown)
+        print(f"{name}: parse {parse_time * 1000:7.1f} ms, serialize {serialize_time * 1000:6.1f} ms, "
+              f"document {retained / 1e6:6.1f} MB, peak {peak / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
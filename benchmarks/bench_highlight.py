@@ -0,0 +1,66 @@
+"""
+Measure the build-time cost of syntax highlighting on a code-heavy corpus.
+
+Renders the same set of pages with untagged fences (no highlighting) and
+with language-tagged fences, once with a cold highlighter cache and once
+with a warm one, the way a multi-page build sees repeated snippets. Pages
+go through the same FlatDocument path as the build.
+
+Run from the repository root:
+
+    python benchmarks/bench_highlight.py [pages]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.flatdoc import markdown_to_flat_document
+from src.highlight import cache_stats, clear_cache
+
+SNIPPETS = {
+    "python": 'def greet(name):\n    # say hello\n    return f"Hello, {name}!" * 3\n',
+    "javascript": 'const greet = (name) => {\n  // say hello\n  return `Hello, ${name}!`;\n};\n',
+    "go": 'func main() {\n    fmt.Println("Aiya, Ambar!") // hi\n    x := 42\n}\n',
+    "bash": 'for f in *.md; do\n  echo "$f"  # list\ndone\n',
+}
+
+
+def make_page(index, tagged):
+    parts = [f"# Page {index}"]
+    for n, (language, code) in enumerate(SNIPPETS.items()):
+        fence = language if tagged else ""
+        parts.append(f"Some prose about snippet {n} with **bold** text.")
+        # Half the snippets are shared across pages, half are unique
+        body = code if n % 2 == 0 else code.replace("name", f"name{index}")
+        parts.append(f"```{fence}\n{body * 5}```")
+    return "\n\n".join(parts)
+
+
+def render_all(pages):
+    start = time.perf_counter()
+    for page in pages:
+        markdown_to_flat_document(page).to_html()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    plain = [make_page(i, tagged=False) for i in range(count)]
+    tagged = [make_page(i, tagged=True) for i in range(count)]
+
+    baseline = min(render_all(plain) for _ in range(3))
+    clear_cache()
+    cold = render_all(tagged)
+    warm = min(render_all(tagged) for _ in range(3))
+
+    print(f"pages: {count}")
+    print(f"no highlighting:        {baseline * 1000:8.1f} ms")
+    print(f"highlighting, cold:     {cold * 1000:8.1f} ms ({cold / baseline - 1:+.0%})")
+    print(f"highlighting, warm:     {warm * 1000:8.1f} ms ({warm / baseline - 1:+.0%})")
+    print(f"cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measure what registered syntax extensions cost on text that doesn't use them.
+
+Parses a corpus with the built-in syntax only, then again with a number of
+extra block and inline syntaxes registered whose trigger characters never
+occur in the corpus, and reports the difference.
+
+Run from the repository root:
+
+    python benchmarks/bench_syntax.py [pages] [extensions]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.block_markdown import BlockSyntax, register_block_syntax, markdown_to_html_node
+from src.flatdoc import markdown_to_flat_document
+from src.htmlnode import LeafNode
+from src.inline_markdown import delimiter_syntax, register_inline_syntax
+
+# First of a run of characters (Unicode private use area) that don't occur
+# in the repository's content; each extension gets its own.
+UNUSED = 0xE000
+
+
+def load_corpus(count):
+    """The repository's own content, repeated."""
+    pages = []
+    for root, _, files in os.walk("content"):
+        for file in files:
+            if file.endswith(".md"):
+                with open(os.path.join(root, file)) as f:
+                    pages.append(f.read().split("\n---\n", 1)[-1])
+    return [pages[i % len(pages)] for i in range(count)]
+
+
+def parse_all(pages, parse):
+    start = time.perf_counter()
+    for page in pages:
+        parse(page)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    extensions = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    pages = load_corpus(count)
+    parsers = (("tree", markdown_to_html_node), ("flat", markdown_to_flat_document))
+
+    baseline = {name: min(parse_all(pages, parse) for _ in range(5)) for name, parse in parsers}
+    for i in range(extensions):
+        char = chr(UNUSED + i)
+        register_inline_syntax(delimiter_syntax(f"ext-inline-{i}", char * 2, "span"))
+        register_block_syntax(BlockSyntax(f"ext-block-{i}", char, lambda block: True,
+                                          lambda block: LeafNode("div", block)))
+    extended = {name: min(parse_all(pages, parse) for _ in range(5)) for name, parse in parsers}
+
+    print(f"pages: {count}")
+    for name, _ in parsers:
+        print(f"{name}: built-in syntax only {baseline[name] * 1000:8.1f} ms, "
+              f"with {extensions} unused extensions {extended[name] * 1000:8.1f} ms "
+              f"({extended[name] / baseline[name] - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,50 @@
 import os
-import shutil
 import sys
 
-from src.block_markdown import extract_title, markdown_to_html_node
+# Heavy subsystems (the markdown parser, shutil, argument parsing) are
+# imported inside the functions that need them so that an up-to-date build
+# can exit before paying for them. See build_is_up_to_date().
 
-def copy_directory(src, dst):
+STAMP_DIR = ".ssg-cache"
+STAMP_FILE = "build-stamp"
+
+
+def copy_directory(src, dst, manifest=None):
     """
     Recursively copies all contents from source directory to destination directory.
     Deletes destination directory contents before copying.
     
-    Args:
-        src: Source directory path
-        dst: Destination directory path
-    """
-    # Delete destination directory if it exists
-    if os.path.exists(dst):
-        print(f"Deleting existing directory: {dst}")
-        shutil.rmtree(dst)
-    
-    # Create the destination directory
-    print(f"Creating directory: {dst}")
-    os.mkdir(dst)
-    
-    # Recursively copy contents
-    _copy_contents(src, dst)
-    
+    Files matching the source directory's ignore rules (see src/discovery.py)
+    are left out.
 
-def _copy_contents(src, dst):
-    """
-    Helper function to recursively copy directory contents.
-    
     Args:
         src: Source directory path
-        dst: Destination directory path
+        dst: Destination directory path, or an output from src.output
+            (e.g. an archive)
+        manifest: Optional AssetManifest; files are then also copied to
+            their fingerprinted names
     """
-    # List all items in the source directory
-    items = os.listdir(src)
+    from src.discovery import scan_tree
+    from src.output import as_output
+
+    # Delete the destination's previous contents and start again
+    output = as_output(dst)
+    output.reset()
     
-    for item in items:
-        src_path = os.path.join(src, item)
-        dst_path = os.path.join(dst, item)
-        
-        if os.path.isfile(src_path):
-            # Copy file
-            print(f"Copying file: {src_path} -> {dst_path}")
-            shutil.copy(src_path, dst_path)
-        else:
-            # Create subdirectory and recursively copy its contents
-            print(f"Creating directory: {dst_path}")
-            os.mkdir(dst_path)
-            _copy_contents(src_path, dst_path)
+    # Copy every file, in a stable order so archives are reproducible
+    for entry in scan_tree(src):
+        src_path = os.path.join(src, entry.path)
+        url = "/" + entry.path
+        if manifest is not None:
+            # Rewritten references use the hashed name; the original name
+            # stays for those that aren't (url() in CSS, raw HTML, deep links)
+            hashed_url = manifest.urls[url]
+            print(f"Copying file: {src_path} -> {output.root}{hashed_url}")
+            output.copy_file(hashed_url[1:], src_path)
+        print(f"Copying file: {src_path} -> {output.root}{url}")
+        output.copy_file(url[1:], src_path)
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def generate_page(from_path, template_path, dest_path, basepath="/", url=None):
     """
     Generate an HTML page from a markdown file using a template.
 
@@ -60,70 +53,630 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
         template_path (str): Path to the HTML template file.
         dest_path (str): Path to save the generated HTML file.
         basepath (str): Base path for the site (e.g., / or /subpath/).
+        url (str): Site-relative URL of the page, recorded in its metadata.
+
+    Returns:
+        Page: The page's metadata (title, date, tags) for listings and feeds.
     """
+    from src.output import DirectoryOutput
+    from src.targets import BuildTarget
+
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
+    # Read the template file
+    with open(template_path, "r") as template_file:
+        template_content = template_file.read()
+
+    return generate_page_variants(
+        from_path, template_content,
+        [(BuildTarget("", basepath), DirectoryOutput(os.path.dirname(dest_path)),
+          os.path.basename(dest_path))],
+        url,
+    )
+
+def parse_page(from_path, url=None):
+    """
+    Read and parse a markdown file.
+
+    Args:
+        from_path (str): Path to the markdown file.
+        url (str): Site-relative URL of the page, recorded in its metadata.
+
+    Returns:
+        tuple: (FlatDocument of the body, Page metadata).
+    """
+    import hashlib
+
+    from src.block_markdown import extract_title
+    from src.flatdoc import markdown_to_flat_document
+    from src.frontmatter import split_front_matter
+    from src.listings import Page
+
     # Read the markdown file
     with open(from_path, "r") as markdown_file:
         markdown_content = markdown_file.read()
+    source_hash = hashlib.sha1(markdown_content.encode("utf-8")).hexdigest()
+    try:
+        metadata, markdown_content = split_front_matter(markdown_content)
+    except ValueError as error:
+        raise ValueError(f"{from_path}: {error}") from error
 
-    # Read the template file
-    with open(template_path, "r") as template_file:
-        template_content = template_file.read()
+    # Convert markdown to the compact array-backed document
+    document = markdown_to_flat_document(markdown_content)
+
+    # Front matter title wins over the first H1
+    title = metadata.get("title") or extract_title(markdown_content)
+
+    tags = metadata.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    date = metadata.get("date")
+    page = Page(from_path, url, title, str(date) if date else None,
+                [str(tag) for tag in tags], source_hash)
+    return document, page
+
+def render_page(document, page, template_content, target, critical=None):
+    """
+    Render a parsed page into a complete HTML document for one target.
+
+    With a CriticalCss, the page's critical CSS is inlined, the full
+    stylesheet deferred and its first image preloaded.
+    """
+    from src.template import fill_template
+
+    html_content = document.to_html(rewrite_url=target.rewrite_url)
+    template = target.template(template_content)
+    if critical is not None:
+        template = critical.apply(template, document, target.rewrite_url)
+    return fill_template(template, page.title, html_content)
 
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+def generate_page_variants(from_path, template_content, variants, url=None, parse_cache=None,
+                           critical=None, profiler=None):
+    """
+    Parse a markdown file once and write it for one or more build targets.
+
+    Each target gets its own copy of the page, with link and image URLs
+    rewritten on the parsed document rather than in the finished HTML.
+
+    Args:
+        from_path (str): Path to the markdown file.
+        template_content (str): The HTML template text.
+        variants (list): (BuildTarget, output, site-relative destination path)
+            triples.
+        url (str): Site-relative URL of the page, recorded in its metadata.
+        parse_cache (ParseCache): Reuses parsed pages whose source is unchanged.
+        critical (CriticalCss): Inlines each page's critical CSS, if given.
+        profiler (MemoryProfiler): Measures the page's memory use and node
+            counts, and enforces the per-page limits.
 
-    # Extract the title
-    title = extract_title(markdown_content)
+    Returns:
+        Page: The page's metadata (title, date, tags) for listings and feeds.
 
-    # Replace placeholders in the template
-    full_html = template_content.replace("{{ Title }}", title)
-    full_html = full_html.replace("{{ Content }}", html_content)
+    Raises:
+        MemoryBudgetError: If the page goes over a profiler limit.
+    """
+    import contextlib
+
+    measure = profiler.measure(from_path) if profiler is not None else contextlib.nullcontext()
+    with measure as sample:
+        if parse_cache is None:
+            document, page = parse_page(from_path, url)
+        else:
+            document, page = parse_cache.get(from_path, lambda: parse_page(from_path, url))
+        if sample is not None:
+            profiler.add_document(sample, document)
 
-    # Replace basepath in href and src attributes
-    full_html = full_html.replace("href=\"/", f"href=\"{basepath}")
-    full_html = full_html.replace("src=\"/", f"src=\"{basepath}")
+        for target, output, dest_path in variants:
+            full_html = render_page(document, page, template_content, target, critical)
 
-    # Ensure the destination directory exists
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            # Write the generated HTML to the destination file
+            output.write_text(dest_path, full_html)
 
-    # Write the generated HTML to the destination file
-    with open(dest_path, "w") as dest_file:
-        dest_file.write(full_html)
+    return page
 
-def generate_pages_recursive(content_dir, template_path, output_dir, basepath="/"):
+def generate_pages_recursive(content_dir, template_path, output_dir, basepath="/",
+                             include_drafts=False, targets=None, parse_cache=None,
+                             outputs=None, critical=None, profiler=None,
+                             template_content=None):
     """
     Process all markdown files in the content directory (including subdirectories),
     convert them to HTML using the template, and save them in the output directory.
 
     Args:
-        content_dir (str): Path to the content directory containing markdown files.
+        content_dir (str): Path to the content directory containing markdown
+            files. Paths matching its ignore rules (see src/discovery.py) are skipped.
         template_path (str): Path to the HTML template file.
         output_dir (str): Path to the output directory for generated HTML files.
         basepath (str): Base path for the site (e.g., / or /subpath/).
+        include_drafts (bool): Also render pages marked "draft: true".
+        targets (list): BuildTargets to write every page to. Overrides
+            output_dir and basepath when given.
+        parse_cache (ParseCache): Reuses parsed pages whose source is unchanged.
+        outputs (list): Output for each target (e.g. an archive); defaults to
+            each target's output directory.
+        critical (CriticalCss): Inlines each page's critical CSS, if given.
+        profiler (MemoryProfiler): Measures every page, if given.
+        template_content (str): Template text; read from template_path when omitted.
+
+    Returns:
+        list: Page metadata for every generated page, in a stable order.
     """
-    for root, _, files in os.walk(content_dir):
-        for file in files:
-            if file.endswith(".md"):
-                # Construct full paths
-                from_path = os.path.join(root, file)
-                relative_path = os.path.relpath(from_path, content_dir)
-                dest_path = os.path.join(output_dir, relative_path.replace(".md", ".html"))
+    from src.discovery import scan_tree
+    from src.frontmatter import is_draft, read_front_matter
+    from src.listings import page_url
+    from src.output import as_output
+    from src.targets import BuildTarget
 
-                # Generate the HTML page
-                generate_page(from_path, template_path, dest_path, basepath)
+    if targets is None:
+        targets = [BuildTarget(output_dir, basepath)]
+    if outputs is None:
+        outputs = [as_output(target.output_dir) for target in targets]
 
-# Example usage
-if __name__ == "__main__":
-    # Get the basepath from the first CLI argument or default to "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    # Read the template file once for the whole site
+    if template_content is None:
+        with open(template_path, "r") as template_file:
+            template_content = template_file.read()
+
+    pages = []
+    for entry in scan_tree(content_dir):
+        if entry.path.endswith(".md"):
+            # Construct full paths
+            from_path = os.path.join(content_dir, entry.path)
+
+            # Drafts are skipped from their header alone, before any parsing
+            if not include_drafts and is_draft(read_front_matter(from_path)):
+                print(f"Skipping draft {from_path}")
+                continue
+
+            relative_path = entry.path
+            html_path = relative_path[:-len(".md")] + ".html"
+            variants = [(target, output, html_path)
+                        for target, output in zip(targets, outputs)]
+            print(f"Generating page from {from_path} for {len(variants)} target(s)")
+
+            # Generate the HTML page
+            pages.append(generate_page_variants(from_path, template_content, variants,
+                                                page_url(relative_path), parse_cache, critical,
+                                                profiler))
+    return pages
+
+
+def compute_build_stamp(inputs, settings, snapshot=None):
+    """
+    Describe the current state of every build input without reading file contents.
+
+    The stamp lists the size, modification time and inode of each file under
+    the given input paths (minus ignored files, see src/discovery.py),
+    followed by the build settings, so any edit, addition, removal or
+    settings change produces a different stamp.
+
+    Args:
+        inputs (list): Files or directories the build reads from.
+        settings (dict): Build settings that affect the output (e.g. basepath).
+        snapshot (DirectorySnapshot): If given, directories whose mtime is
+            unchanged are not listed or stat-ed again.
+
+    Returns:
+        str: The stamp text.
+    """
+    from src.discovery import scan_tree
+
+    lines = [f"{key}={settings[key]}" for key in sorted(settings)]
+    for path in inputs:
+        if os.path.isfile(path):
+            st = os.stat(path)
+            lines.append(f"{path}\t{st.st_size}\t{st.st_mtime_ns}\t{st.st_ino}")
+            continue
+        for entry in scan_tree(path, with_stats=True, snapshot=snapshot):
+            lines.append(f"{os.path.join(path, entry.path)}\t{entry.size}\t"
+                         f"{entry.mtime_ns}\t{entry.inode}")
+    return "\n".join(lines) + "\n"
+
+
+def build_is_up_to_date(stamp, output_dirs, stamp_dir=STAMP_DIR):
+    """
+    Check whether the last successful build was made from exactly this stamp,
+    and its output has not been changed since.
+
+    The saved stamp ends with a stamp of the output trees (see
+    save_build_stamp()), so deleting or editing an output file, e.g. by
+    checking out an older copy of the output, makes the build run again.
+    The outputs are only listed when the inputs are unchanged.
+
+    Args:
+        stamp (str): Stamp returned by compute_build_stamp().
+        output_dirs (list): Output directories (or archives) of the build.
+        stamp_dir (str): Directory holding the saved stamp.
+
+    Returns:
+        bool: True if the outputs exist and the saved stamp matches.
+    """
+    if not all(os.path.exists(output_dir) for output_dir in output_dirs):
+        return False
+    try:
+        with open(os.path.join(stamp_dir, STAMP_FILE), "r") as stamp_file:
+            saved = stamp_file.read()
+    except OSError:
+        return False
+    return saved.startswith(stamp) and saved == stamp + compute_build_stamp(output_dirs, {})
+
+
+def save_build_stamp(stamp, output_dirs, stamp_dir=STAMP_DIR):
+    """
+    Record the stamp of a successful build, followed by that of its output.
+
+    Args:
+        stamp (str): Stamp returned by compute_build_stamp().
+        output_dirs (list): Output directories (or archives) just written.
+        stamp_dir (str): Directory holding the saved stamp.
+    """
+    stamp += compute_build_stamp(output_dirs, {})
+    os.makedirs(stamp_dir, exist_ok=True)
+    with open(os.path.join(stamp_dir, STAMP_FILE), "w") as stamp_file:
+        stamp_file.write(stamp)
 
-    # Delete all the files from docs and copy all the static files from static to docs
-    copy_directory("static", "docs")
+
+def parse_args(argv):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list): Arguments without the program name.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="base path for the site (e.g. / or /subpath/)")
+    parser.add_argument("--content", default="content", help="markdown source directory")
+    parser.add_argument("--static", default="static", help="static assets directory")
+    parser.add_argument("--template", default="template.html", help="HTML template")
+    parser.add_argument("--output", default="docs",
+                        help="output directory, or an archive to stream the site into "
+                             "(.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz or .zip)")
+    parser.add_argument("--target", action="append", metavar="SPEC",
+                        help="output tree to build, as a directory or "
+                             "output=DIR,basepath=/sub/,site_url=https://example.com; "
+                             "repeat to render each page once into several trees "
+                             "(overrides basepath, --output and --site-url)")
+    parser.add_argument("--cache-dir", default=STAMP_DIR, help="directory for build state")
+    parser.add_argument("--site-url", default="",
+                        help="absolute site URL used in feeds and the sitemap (e.g. https://example.com)")
+    parser.add_argument("--author", help="author named in the Atom feed (defaults to its title)")
+    parser.add_argument("--section", default="blog",
+                        help="content directory whose pages get an index, tag pages and a feed")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="copy static assets to content-hashed names and rewrite references")
+    parser.add_argument("--critical-css", action="store_true",
+                        help="inline the CSS rules each page uses, defer the full stylesheet "
+                             "and preload each page's first image")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="trace memory while rendering and report the pages with the "
+                             "highest peak memory and their node counts")
+    parser.add_argument("--max-page-memory", type=float, metavar="MB",
+                        help="fail the build if rendering one page allocates more than this "
+                             "(checked every 1000 nodes while parsing, and when the page is done)")
+    parser.add_argument("--max-page-nodes", type=int, metavar="N",
+                        help="fail the build as soon as one page creates more than N nodes")
+    parser.add_argument("--service-worker", action="store_true",
+                        help="write a service worker and precache manifest for offline reading")
+    parser.add_argument("--drafts", action="store_true",
+                        help="include pages marked as drafts in their front matter")
+    parser.add_argument("--daemon", metavar="SOCKET",
+                        help="keep running and serve build/render/status requests "
+                             "on this Unix socket (see src/daemon.py)")
+    parser.add_argument("--trust-dir-mtimes", action="store_true",
+                        help="when checking whether the output is up to date, only re-list "
+                             "directories whose mtime changed (misses files edited in place)")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="build into memory and serve the site over HTTP on this port "
+                             "instead of writing it to disk")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve to listen on")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild even if the output is up to date")
+    return parser.parse_args(argv)
+
+
+def build_targets(args):
+    """The BuildTargets selected on the command line."""
+    from src.targets import BuildTarget, parse_target
+
+    if not args.target:
+        return [BuildTarget(args.output, args.basepath, args.site_url)]
+    return [parse_target(spec) for spec in args.target]
+
+
+def run_daemon(args, targets):
+    """Serve build requests on a Unix socket until interrupted."""
+    from src.daemon import BuildDaemon, serve
+    from src.frontmatter import is_draft, read_front_matter
+    from src.listings import page_url
+    from src.pagecache import ParseCache
+
+    # Parsed pages stay in memory between requests
+    parse_cache = ParseCache()
+
+    # The template, asset map and critical CSS are set up once, and again
+    # only when the template (or, if assets are fingerprinted or CSS is
+    # inlined, a static file) has changed since.
+    rendering_inputs = [args.template]
+    if args.fingerprint or args.critical_css:
+        rendering_inputs.append(args.static)
+    rendering = {"stamp": None, "prepared": None}
+
+    def prepared_rendering():
+        stamp = compute_build_stamp(rendering_inputs, {})
+        if stamp != rendering["stamp"]:
+            rendering["prepared"] = prepare_rendering(args, targets)
+            rendering["stamp"] = stamp
+        return rendering["prepared"]
+
+    def build():
+        return build_site(args, targets, parse_cache)
+
+    content_root = os.path.realpath(args.content)
+
+    def render(path):
+        if not os.path.isfile(path):
+            path = os.path.join(args.content, path)
+        # Only pages the build would render: under the content directory...
+        path = os.path.realpath(path)
+        if os.path.commonpath([content_root, path]) != content_root or not path.endswith(".md"):
+            raise ValueError(f"{path} is not a markdown file under {args.content}")
+        # ...and not drafts, unless they are included
+        if not args.drafts and is_draft(read_front_matter(path)):
+            raise ValueError(f"{path} is a draft; start the daemon with --drafts to render it")
+        # Same template, asset map and critical CSS as a build would use
+        _, template_content, critical = prepared_rendering()
+        url = page_url(os.path.relpath(path, content_root))
+        document, page = parse_cache.get(path, lambda: parse_page(path, url))
+        return render_page(document, page, template_content, targets[0], critical)
+
+    def status():
+        return {"cached_pages": len(parse_cache), "cache_hits": parse_cache.hits,
+                "cache_misses": parse_cache.misses}
+
+    daemon = BuildDaemon(build, render, status)
+    print(f"Build daemon listening on {args.daemon}")
+    try:
+        serve(args.daemon, daemon)
+    except FileExistsError as error:
+        print(f"Cannot start the daemon: {error}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _cache_file(args, name):
+    """Path of a build cache file, or None when caching is off."""
+    return os.path.join(args.cache_dir, name) if args.cache_dir else None
+
+
+def run_preview(args, targets):
+    """Build the first target into memory and serve it over HTTP until interrupted."""
+    from src.output import MemoryOutput
+    from src.preview import serve
+
+    # Nothing is written to disk, not even the build caches
+    args.cache_dir = None
+    outputs = [MemoryOutput(target.name) for target in targets]
+    build_site(args, targets, outputs=outputs)
+    try:
+        serve(outputs[0], args.serve, args.host, targets[0].basepath)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_site(args, targets, parse_cache=None, outputs=None):
+    """
+    Run a full build for the given targets.
+
+    Args:
+        args (argparse.Namespace): Parsed command line options. Build caches
+            are not used when args.cache_dir is None.
+        targets (list): BuildTargets to write.
+        parse_cache (ParseCache): Parsed pages kept between builds, if any.
+        outputs (list): Output for each target; defaults to the directory or
+            archive named by the target.
+
+    Returns:
+        list: Page metadata for every generated page.
+    """
+    manifest, template_content, critical = prepare_rendering(args, targets)
+
+    # Each target is written to a directory or streamed into an archive
+    from src.output import open_output
+
+    if outputs is None:
+        outputs = [open_output(target.output_dir) for target in targets]
+    if args.service_worker:
+        from src.assets import fingerprint_assets
+        from src.serviceworker import PrecacheRecorder
+
+        # Static files are precached under the digests the asset manifest
+        # already has (or computes from its cache), not re-read from the output
+        if manifest is None:
+            digests = fingerprint_assets(args.static, _cache_file(args, "assets.json")).digests
+        else:
+            digests = manifest.digests
+        source_digests = {os.path.join(args.static, *url[1:].split("/")): digest
+                          for url, digest in digests.items()}
+        # Pages only reference fingerprinted assets by their hashed names
+        unrecorded = {url[1:] for url in manifest.urls} if manifest is not None else ()
+        outputs = [PrecacheRecorder(output, source_digests, unrecorded) for output in outputs]
+    try:
+        pages = _write_site(args, targets, outputs, manifest, parse_cache,
+                            template_content, critical)
+    finally:
+        for output in outputs:
+            output.close()
+
+    return pages
+
+
+def prepare_rendering(args, targets):
+    """
+    Set up what every page is rendered with, for a build or a single render.
+
+    Static assets are fingerprinted (when enabled) and the asset map is
+    given to each target; the template gets the service worker
+    registration; critical CSS is loaded from the template's stylesheet.
+
+    Returns:
+        tuple: (AssetManifest or None, template text, CriticalCss or None).
+    """
+    # Hash the static assets once per build (and only the ones that changed)
+    manifest = None
+    if args.fingerprint:
+        from src.assets import fingerprint_assets
+
+        manifest = fingerprint_assets(args.static, _cache_file(args, "assets.json"))
+        print(f"Fingerprinted {len(manifest.urls)} assets ({manifest.hashed} hashed)")
+        for target in targets:
+            target.assets = manifest.urls
+
+    with open(args.template, "r") as template_file:
+        template_content = template_file.read()
+    if args.service_worker:
+        from src.serviceworker import add_registration
+
+        template_content = add_registration(template_content)
+
+    critical = None
+    if args.critical_css:
+        from src.critical import CriticalCss
+
+        critical = CriticalCss.from_template(template_content, args.static)
+        if critical is None:
+            print("No local stylesheet linked from the template; not inlining critical CSS")
+    return manifest, template_content, critical
+
+
+def _write_site(args, targets, outputs, manifest, parse_cache, template_content, critical):
+    """Write static files, pages, listings and sitemaps to each output; see build_site()."""
+    import contextlib
+
+    # Delete all the files from each output and copy all the static files into it
+    for target, output in zip(targets, outputs):
+        copy_directory(args.static, output, manifest)
+        if manifest is not None:
+            from src.assets import write_asset_metadata
+
+            write_asset_metadata(output, manifest, target.basepath)
     print("\nCopy complete!")
 
-    # Process all markdown files in the content directory
-    generate_pages_recursive("content", "template.html", "docs", basepath)
-    print("\nAll pages generated successfully!")
\ No newline at end of file
+    # Optionally measure each page, failing fast on one that goes over a limit
+    profiler = None
+    if args.memory_report or args.max_page_memory or args.max_page_nodes:
+        from src.memory import MemoryProfiler
+
+        # Import the parser up front so its import isn't charged to the first page
+        import src.flatdoc
+        import src.frontmatter
+        import src.listings
+
+        max_page_bytes = int(args.max_page_memory * 2**20) if args.max_page_memory else None
+        profiler = MemoryProfiler(max_page_bytes, args.max_page_nodes)
+
+    # Process all markdown files in the content directory, parsing each once
+    with profiler if profiler is not None else contextlib.nullcontext():
+        pages = generate_pages_recursive(args.content, args.template, None,
+                                         include_drafts=args.drafts, targets=targets,
+                                         parse_cache=parse_cache, outputs=outputs,
+                                         critical=critical, profiler=profiler,
+                                         template_content=template_content)
+    print("\nAll pages generated successfully!")
+    if args.memory_report:
+        print(profiler.report())
+
+    from src.listings import generate_listings, section_posts
+
+    for index, (target, output) in enumerate(zip(targets, outputs)):
+        # Absolute URL of the site root, used in the feed and the sitemap
+        site_root = target.site_root()
+
+        # Section index, tag pages and feed, built from the metadata collected above
+        if section_posts(pages, args.section):
+            written, rendered = generate_listings(
+                pages, template_content, output, target.basepath, site_root,
+                args.section, _cache_file(args, f"listings-{index}.json"),
+                target=target, critical=critical, author=args.author,
+            )
+            print(f"Generated {len(written)} listing files in {target.output_dir} "
+                  f"({rendered} re-rendered)")
+
+        # Sitemaps need absolute URLs, so they are only written when the site URL is known
+        if site_root:
+            from src.sitemap import generate_sitemap
+
+            # A robots.txt from the static directory was copied as it is
+            robots = not os.path.isfile(os.path.join(args.static, "robots.txt"))
+            written = generate_sitemap(pages, output, site_root,
+                                       _cache_file(args, f"sitemap-{index}.json"),
+                                       robots=robots)
+            if robots:
+                written.append("robots.txt")
+            print(f"Generated {', '.join(written)} in {target.output_dir}")
+
+        # Precache every page and static file recorded while writing the output
+        if args.service_worker:
+            from src.serviceworker import write_service_worker
+
+            precache = write_service_worker(output, output.entries, target.basepath)
+            print(f"Generated a service worker precaching {len(precache['critical'])} files "
+                  f"({len(precache['lazy'])} more on first use) in {target.output_dir}")
+
+    if critical is not None:
+        print(f"Critical CSS computed for {critical.misses} distinct page styles "
+              f"({critical.hits} reused)")
+    return pages
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    targets = build_targets(args)
+
+    if args.daemon:
+        return run_daemon(args, targets)
+    if args.serve is not None:
+        return run_preview(args, targets)
+
+    # Source code is part of the stamp so that generator changes rebuild too.
+    here = os.path.dirname(os.path.abspath(__file__))
+    inputs = [args.content, args.static, args.template,
+              os.path.join(here, "main.py"), os.path.join(here, "src")]
+    settings = {"targets": " ".join(target.settings() for target in targets),
+                "section": args.section, "drafts": args.drafts,
+                "fingerprint": args.fingerprint, "critical_css": args.critical_css,
+                "service_worker": args.service_worker}
+    snapshot = None
+    if args.trust_dir_mtimes:
+        from src.discovery import DirectorySnapshot
+
+        snapshot = DirectorySnapshot(os.path.join(args.cache_dir, "snapshot.json"))
+    stamp = compute_build_stamp(inputs, settings, snapshot)
+    if snapshot is not None:
+        snapshot.save()
+    output_dirs = [target.output_dir for target in targets]
+    if not args.force and build_is_up_to_date(stamp, output_dirs, args.cache_dir):
+        print("Output is up to date, nothing to do.")
+        return 0
+
+    from src.memory import MemoryBudgetError
+
+    try:
+        build_site(args, targets)
+    except MemoryBudgetError as error:
+        print(f"Build failed: {error}", file=sys.stderr)
+        return 1
+    save_build_stamp(stamp, output_dirs, args.cache_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,2 @@
 #!/bin/bash
-python3 main.py
-cd public && python3 -m http.server 8888
\ No newline at end of file
+python3 main.py --serve 8888
\ No newline at end of file
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+from src.discovery import scan_tree
+
+# Characters of the content hash kept in fingerprinted file names.
+FINGERPRINT_LENGTH = 10
+
+MANIFEST_FILE = "asset-manifest.json"
+HEADERS_FILE = "_headers"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class AssetManifest:
+    """
+    Content hashes of the static assets and their fingerprinted URLs.
+
+    urls maps a site-relative URL ("/index.css") to its fingerprinted URL
+    ("/index.3f2a1b9c0d.css"); digests maps the same URL to the full hex
+    digest of the file's content.
+    """
+
+    def __init__(self):
+        self.urls = {}
+        self.digests = {}
+        self.hashed = 0
+
+    def to_json(self):
+        return json.dumps(self.urls, indent=2, sort_keys=True) + "\n"
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as asset:
+        for block in iter(lambda: asset.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_name(relative_path, digest):
+    """"images/tom.png" + digest -> "images/tom.<hash>.png"."""
+    head, tail = os.path.split(relative_path)
+    stem, ext = os.path.splitext(tail)
+    return os.path.join(head, f"{stem}.{digest[:FINGERPRINT_LENGTH]}{ext}")
+
+
+def fingerprint_assets(static_dir, cache_path=None):
+    """
+    Hash every file under static_dir (minus ignored files, see
+    src/discovery.py) and build the asset manifest.
+
+    Digests are cached by (path, size, mtime), so files that have not
+    changed since the last build are not read again.
+
+    Args:
+        static_dir (str): Static assets directory.
+        cache_path (str): JSON file of cached digests, or None.
+
+    Returns:
+        AssetManifest: The manifest; manifest.hashed counts files read.
+    """
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path, "r") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            cache = {}
+
+    manifest = AssetManifest()
+    new_cache = {}
+    for entry in scan_tree(static_dir, with_stats=True):
+        relative_path = entry.path
+        path = os.path.join(static_dir, relative_path)
+        key = [entry.size, entry.mtime_ns]
+        cached = cache.get(relative_path)
+        if cached and cached[:2] == key:
+            digest = cached[2]
+        else:
+            digest = file_digest(path)
+            manifest.hashed += 1
+        new_cache[relative_path] = key + [digest]
+
+        url = "/" + relative_path
+        manifest.urls[url] = "/" + fingerprint_name(relative_path, digest).replace(os.sep, "/")
+        manifest.digests[url] = digest
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path, "w") as cache_file:
+            json.dump(new_cache, cache_file)
+    return manifest
+
+
+def write_asset_metadata(output_dir, manifest, basepath="/"):
+    """
+    Write the asset manifest and a _headers file for the output tree.
+
+    The _headers file (understood by Netlify and Cloudflare Pages) marks
+    every fingerprinted asset as immutable, since its URL changes whenever
+    its content does. output_dir may also be an output from src.output.
+    """
+    from src.output import as_output
+
+    output = as_output(output_dir)
+    output.write_text(MANIFEST_FILE, manifest.to_json())
+    output.write_text(HEADERS_FILE, "".join(
+        f"{basepath}{url[1:]}\n  Cache-Control: {IMMUTABLE_CACHE_CONTROL}\n"
+        for url in sorted(manifest.urls.values())
+    ))
@@ -2,6 +2,7 @@ from enum import Enum
 import re
 import os
 
+from src.highlight import highlight_to_html_nodes, normalize_language
 from src.htmlnode import ParentNode
 from src.inline_markdown import text_to_textnodes
 from src.textnode import TextNode, TextType, text_node_to_html_node
@@ -22,27 +23,45 @@ def markdown_to_blocks(markdown: str):
     return blocks
 
 
-def block_to_block_type(block: str) -> BlockType:
-    lines = block.split("\n")
-    
-    if re.match(r"^#{1,6} ", lines[0]):
-        return BlockType.HEADING
+HEADING_RE = re.compile(r"#{1,6} ")
+ORDERED_ITEM_RE = re.compile(r"(\d+)\. ")
+
+
+def block_to_block_type(block: str):
+    """
+    Classify a block.
+
+    Returns:
+        The BlockType of built-in syntax, or the name of the extension
+        syntax (see register_block_syntax) the block matched.
+    """
+    return find_block_syntax(block).name
+
 
-    if lines[0].startswith("```") and lines[-1].endswith("```"):
-        return BlockType.CODE
+def is_heading_block(block):
+    return HEADING_RE.match(block) is not None
 
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
 
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
+def is_code_block(block):
+    return block.startswith("```") and block.endswith("```")
 
-    if all(re.match(r"^\d+\. ", line) for line in lines):
-        numbers = [int(re.match(r"^(\d+)\. ", line).group(1)) for line in lines]
-        if numbers == list(range(1, len(numbers)+1)):
-            return BlockType.ORDERED_LIST
 
-    return BlockType.PARAGRAPH
+def is_quote_block(block):
+    return all(line.startswith(">") for line in block.split("\n"))
+
+
+def is_unordered_list_block(block):
+    return all(line.startswith("- ") for line in block.split("\n"))
+
+
+def is_ordered_list_block(block):
+    """Check for lines numbered 1. 2. 3. ..., stopping at the first bad line."""
+    for expected, line in enumerate(block.split("\n"), start=1):
+        # Compare digit strings so huge numbers cost no int() conversion
+        match = ORDERED_ITEM_RE.match(line)
+        if match is None or (match.group(1).lstrip("0") or "0") != str(expected):
+            return False
+    return True
 
 
 def text_to_children(text):
@@ -59,8 +78,8 @@ def text_to_children(text):
     return children
 
 
-def heading_to_html_node(block):
-    """Convert a heading block to an HTMLNode."""
+def heading_parts(block):
+    """Return (level, text) of a heading block."""
     level = 0
     for char in block:
         if char == "#":
@@ -71,30 +90,46 @@ def heading_to_html_node(block):
     if level + 1 >= len(block):
         raise ValueError(f"Invalid heading level: {level}")
     
-    text = block[level + 1:]
+    return level, block[level + 1:]
+
+
+def heading_to_html_node(block):
+    """Convert a heading block to an HTMLNode."""
+    level, text = heading_parts(block)
     children = text_to_children(text)
     return ParentNode(f"h{level}", children)
 
 
-def code_to_html_node(block):
-    """Convert a code block to an HTMLNode."""
+def code_parts(block):
+    """Return (language or None, code text) of a fenced code block."""
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("Invalid code block")
     
+    # The opening fence line may name the language: ```python
+    fence_end = block.find("\n")
+    if fence_end == -1:
+        return None, block[3:-3]
     # Extract the text between the ``` markers
-    text = block[4:-3]
+    return normalize_language(block[3:fence_end]), block[fence_end + 1:-3]
+
+
+def code_to_html_node(block):
+    """Convert a code block to an HTMLNode."""
+    language, text = code_parts(block)
     
     # For code blocks, don't parse inline markdown
-    # Create a simple TextNode and convert it
-    code_node = TextNode(text, TextType.TEXT)
-    code_child = text_node_to_html_node(code_node)
-    
-    code = ParentNode("code", [code_child])
+    if language is None:
+        # Create a simple TextNode and convert it
+        code_node = TextNode(text, TextType.TEXT)
+        code = ParentNode("code", [text_node_to_html_node(code_node)])
+    else:
+        code = ParentNode("code", highlight_to_html_nodes(text, language),
+                          {"class": f"language-{language}"})
     return ParentNode("pre", [code])
 
 
-def quote_to_html_node(block):
-    """Convert a quote block to an HTMLNode."""
+def quote_text(block):
+    """Return the inline text of a quote block, markers removed."""
     lines = block.split("\n")
     new_lines = []
     for line in lines:
@@ -102,46 +137,151 @@ def quote_to_html_node(block):
             raise ValueError("Invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     
-    content = " ".join(new_lines)
-    children = text_to_children(content)
+    return " ".join(new_lines)
+
+
+def quote_to_html_node(block):
+    """Convert a quote block to an HTMLNode."""
+    children = text_to_children(quote_text(block))
     return ParentNode("blockquote", children)
 
 
+def unordered_list_items(block):
+    """Return the inline text of each item of an unordered list block."""
+    return [item[2:] for item in block.split("\n")]  # Remove "- " prefix
+
+
 def unordered_list_to_html_node(block):
     """Convert an unordered list block to an HTMLNode."""
-    items = block.split("\n")
     html_items = []
     
-    for item in items:
-        text = item[2:]  # Remove "- " prefix
+    for text in unordered_list_items(block):
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     
     return ParentNode("ul", html_items)
 
 
+def ordered_list_items(block):
+    """Return the inline text of each item of an ordered list block."""
+    # Remove the "1. ", "2. ", etc. prefix
+    return [ORDERED_ITEM_RE.sub("", item, count=1) for item in block.split("\n")]
+
+
 def ordered_list_to_html_node(block):
     """Convert an ordered list block to an HTMLNode."""
-    items = block.split("\n")
     html_items = []
     
-    for item in items:
-        # Remove the "1. ", "2. ", etc. prefix
-        text = re.sub(r"^\d+\. ", "", item)
+    for text in ordered_list_items(block):
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     
     return ParentNode("ol", html_items)
 
 
+def paragraph_text(block):
+    """Return the inline text of a paragraph block, lines joined."""
+    return " ".join(block.split("\n"))
+
+
 def paragraph_to_html_node(block):
     """Convert a paragraph block to an HTMLNode."""
-    lines = block.split("\n")
-    paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+    children = text_to_children(paragraph_text(block))
     return ParentNode("p", children)
 
 
+class BlockSyntax:
+    """
+    A kind of markdown block.
+
+    Args:
+        name: BlockType of built-in syntax, or a unique name for extensions.
+        triggers: Characters a block of this kind can start with.
+        match: Function telling whether a block (starting with one of the
+            triggers) is of this kind.
+        to_html_node: Function converting a matching block to an HTMLNode.
+    """
+
+    def __init__(self, name, triggers, match, to_html_node):
+        self.name = name
+        self.triggers = frozenset(triggers)
+        self.match = match
+        self.to_html_node = to_html_node
+
+    def __repr__(self):
+        return f"BlockSyntax({self.name!r})"
+
+
+PARAGRAPH_SYNTAX = BlockSyntax(BlockType.PARAGRAPH, "", lambda block: True,
+                               paragraph_to_html_node)
+
+# Every block that matches none of these is a paragraph.
+BLOCK_SYNTAXES = [
+    BlockSyntax(BlockType.HEADING, "#", is_heading_block, heading_to_html_node),
+    BlockSyntax(BlockType.CODE, "`", is_code_block, code_to_html_node),
+    BlockSyntax(BlockType.QUOTE, ">", is_quote_block, quote_to_html_node),
+    BlockSyntax(BlockType.UNORDERED_LIST, "-", is_unordered_list_block,
+                unordered_list_to_html_node),
+    BlockSyntax(BlockType.ORDERED_LIST, "0123456789", is_ordered_list_block,
+                ordered_list_to_html_node),
+]
+
+# First character of a block -> candidate syntaxes, in registration order.
+_BLOCK_DISPATCH = {}
+
+
+def _build_block_dispatch():
+    _BLOCK_DISPATCH.clear()
+    for syntax in BLOCK_SYNTAXES:
+        for char in syntax.triggers:
+            _BLOCK_DISPATCH.setdefault(char, []).append(syntax)
+
+
+_build_block_dispatch()
+
+
+def register_block_syntax(syntax, first=False):
+    """
+    Add a block syntax.
+
+    Args:
+        syntax (BlockSyntax): The syntax to add.
+        first (bool): Try it before the syntaxes already registered for the
+            same characters, instead of after them.
+    """
+    if any(registered.name == syntax.name for registered in BLOCK_SYNTAXES):
+        raise ValueError(f"Block syntax already registered: {syntax.name}")
+    if first:
+        BLOCK_SYNTAXES.insert(0, syntax)
+    else:
+        BLOCK_SYNTAXES.append(syntax)
+    _build_block_dispatch()
+
+
+def unregister_block_syntax(name):
+    """Remove the block syntax with the given name."""
+    for index, syntax in enumerate(BLOCK_SYNTAXES):
+        if syntax.name == name:
+            del BLOCK_SYNTAXES[index]
+            _build_block_dispatch()
+            return
+    raise ValueError(f"Block syntax not registered: {name}")
+
+
+def find_block_syntax(block):
+    """
+    Return the BlockSyntax of a block.
+
+    Only the syntaxes registered for the block's first character are tried,
+    so each extra syntax costs nothing on blocks that don't start with one
+    of its trigger characters.
+    """
+    for syntax in _BLOCK_DISPATCH.get(block[:1], ()):
+        if syntax.match(block):
+            return syntax
+    return PARAGRAPH_SYNTAX
+
+
 def markdown_to_html_node(markdown):
     """
     Convert a full markdown document into a single parent HTMLNode.
@@ -156,22 +296,7 @@ def markdown_to_html_node(markdown):
     children = []
     
     for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.PARAGRAPH:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == BlockType.HEADING:
-            children.append(heading_to_html_node(block))
-        elif block_type == BlockType.CODE:
-            children.append(code_to_html_node(block))
-        elif block_type == BlockType.QUOTE:
-            children.append(quote_to_html_node(block))
-        elif block_type == BlockType.UNORDERED_LIST:
-            children.append(unordered_list_to_html_node(block))
-        elif block_type == BlockType.ORDERED_LIST:
-            children.append(ordered_list_to_html_node(block))
-        else:
-            raise ValueError(f"Invalid block type: {block_type}")
+        children.append(find_block_syntax(block).to_html_node(block))
     
     return ParentNode("div", children)
 
@@ -0,0 +1,236 @@
+import hashlib
+import os
+import re
+
+from src.highlight import TOKEN_CLASSES
+from src.htmlnode import escape_attr
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+
+# The first stylesheet link of a template.
+STYLESHEET_LINK_RE = re.compile(r'<link\b[^>]*\brel="stylesheet"[^>]*>')
+HREF_RE = re.compile(r'\bhref="([^"]*)"')
+
+# Tags and class/id attributes in template markup.
+TEMPLATE_TAG_RE = re.compile(r"<([a-zA-Z][\w-]*)")
+TEMPLATE_ATTR_RE = re.compile(r'\b(class|id)="([^"]*)"')
+
+# Parts of a selector that don't narrow down which elements it can match.
+SELECTOR_NOISE_RE = re.compile(r"\[[^\]]*\]|::?[\w-]+(?:\([^)]*\))?")
+COMBINATOR_RE = re.compile(r"\s*[>+~]\s*|\s+")
+SELECTOR_TAG_RE = re.compile(r"[a-zA-Z][\w-]*")
+SELECTOR_NAME_RE = re.compile(r"([.#])([\w-]+)")
+
+# Grouping at-rules whose nested rules are filtered like top-level ones.
+GROUPING_AT_RULES = ("@media", "@supports")
+
+# Swaps a preloaded stylesheet in once it has loaded.
+DEFER_ONLOAD = "this.onload=null;this.rel='stylesheet'"
+
+
+def _matching_brace(css, start):
+    """Index of the } closing the { at start (or the end of css)."""
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == "{":
+            depth += 1
+        elif css[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(css)
+
+
+def parse_css(css):
+    """
+    Split a stylesheet into its rules.
+
+    Returns a list of ("rule", selectors, declarations) for style rules,
+    ("group", prelude, rules) for @media/@supports blocks and ("raw", text)
+    for any other at-rule. Comments are dropped.
+    """
+    css = COMMENT_RE.sub("", css)
+    rules = []
+    index = 0
+    while index < len(css):
+        brace = css.find("{", index)
+        semicolon = css.find(";", index)
+        if brace == -1 and semicolon == -1:
+            break
+        if css[index:].lstrip().startswith("@") and semicolon != -1 and (
+                brace == -1 or semicolon < brace):
+            # Statement at-rule such as @import or @charset
+            rules.append(("raw", css[index:semicolon + 1].strip()))
+            index = semicolon + 1
+            continue
+        if brace == -1:
+            break
+        end = _matching_brace(css, brace)
+        prelude = css[index:brace].strip()
+        body = css[brace + 1:end]
+        if prelude.startswith(GROUPING_AT_RULES):
+            rules.append(("group", prelude, parse_css(body)))
+        elif prelude.startswith("@"):
+            rules.append(("raw", css[index:end + 1].strip()))
+        else:
+            selectors = [selector.strip() for selector in prelude.split(",")]
+            rules.append(("rule", selectors, " ".join(body.split())))
+        index = end + 1
+    return rules
+
+
+def selector_matches(selector, features):
+    """
+    Check whether a selector can match anything on a page.
+
+    Every tag, class and id named in the selector must be among the page's
+    features. Pseudo-classes, pseudo-elements and attribute conditions are
+    ignored, so the check errs on the side of keeping a rule.
+    """
+    selector = SELECTOR_NOISE_RE.sub("", selector)
+    for compound in COMBINATOR_RE.split(selector.strip()):
+        tag = SELECTOR_TAG_RE.match(compound)
+        if tag and tag.group().lower() not in features:
+            return False
+        for prefix, name in SELECTOR_NAME_RE.findall(compound):
+            if prefix + name not in features:
+                return False
+    return True
+
+
+def _used_css(rules, features):
+    out = []
+    for rule in rules:
+        if rule[0] == "rule":
+            selectors = [selector for selector in rule[1] if selector_matches(selector, features)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{rule[2]}}}")
+        elif rule[0] == "group":
+            nested = _used_css(rule[2], features)
+            if nested:
+                out.append(f"{rule[1]}{{{nested}}}")
+        else:
+            out.append(rule[1])
+    return "".join(out)
+
+
+def template_features(template):
+    """Tags, .classes and #ids written in a template's markup."""
+    features = {tag.lower() for tag in TEMPLATE_TAG_RE.findall(template)}
+    for attr, value in TEMPLATE_ATTR_RE.findall(template):
+        prefix = "." if attr == "class" else "#"
+        features.update(prefix + name for name in value.split())
+    return features
+
+
+def document_features(document):
+    """Tags, .classes and #ids used by a FlatDocument."""
+    features = set(document.tag_names)
+    for props in document.props.values():
+        if "class" in props:
+            features.update("." + name for name in str(props["class"]).split())
+        if "id" in props:
+            features.add("#" + str(props["id"]))
+    # Highlighted code is stored as rendered markup, whose token spans
+    # could use any of the token classes
+    if any(str(feature).startswith(".language-") for feature in features):
+        features.add("span")
+        features.update("." + name for name in TOKEN_CLASSES.values())
+    return features
+
+
+def first_image(document):
+    """src of the first image in a FlatDocument, or None."""
+    # Props are stored as nodes are added, so they are in document order
+    for index, props in document.props.items():
+        if "src" in props and document.tag(index) == "img":
+            return props["src"]
+    return None
+
+
+class CriticalCss:
+    """
+    Inlines the CSS rules each page uses and defers the full stylesheet.
+
+    The critical CSS for a page depends only on the set of tags and classes
+    it uses, and most pages share a handful of such sets, so it is computed
+    once per set and cached.
+
+    Relative url() references are inlined as written and would resolve
+    against the page instead of the stylesheet; use site-absolute URLs.
+    """
+
+    def __init__(self, css, template=""):
+        # Identifies the stylesheet, for caches of pages rendered with it
+        self.digest = hashlib.sha1(css.encode("utf-8")).hexdigest()
+        self.rules = parse_css(css)
+        self.template_features = template_features(template)
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_template(cls, template, static_dir):
+        """
+        Load the first stylesheet linked from a template out of static_dir.
+
+        Returns:
+            CriticalCss, or None if the template links no local stylesheet.
+        """
+        link = STYLESHEET_LINK_RE.search(template)
+        href = HREF_RE.search(link.group()) if link else None
+        if href is None or not href.group(1).startswith("/") or href.group(1).startswith("//"):
+            return None
+        path = os.path.join(static_dir, *href.group(1)[1:].split("/"))
+        try:
+            with open(path, "r") as css_file:
+                return cls(css_file.read(), template)
+        except OSError:
+            return None
+
+    def css_for(self, features):
+        """The rules that can apply to a page with the given features."""
+        key = frozenset(features | self.template_features)
+        css = self.cache.get(key)
+        if css is None:
+            self.misses += 1
+            css = self.cache[key] = _used_css(self.rules, key)
+        else:
+            self.hits += 1
+        return css
+
+    def apply(self, template, document, rewrite_url=None):
+        """
+        Add a page's critical CSS and image preload to a (rewritten) template.
+
+        The stylesheet link becomes a preload that switches itself to a
+        stylesheet once loaded, with the plain link kept in <noscript>, and
+        the used rules are inlined in a <style> just before it. The page's
+        first image, if any, gets a <link rel="preload"> before </head>.
+
+        Args:
+            template (str): Template text with the target's URLs applied.
+            document (FlatDocument): The page body.
+            rewrite_url (callable): Applied to the preloaded image URL.
+
+        Returns:
+            str: The template with the hints added.
+        """
+        link = STYLESHEET_LINK_RE.search(template)
+        if link is not None:
+            tag = link.group()
+            deferred = tag.replace('rel="stylesheet"',
+                                   f'rel="preload" as="style" onload="{DEFER_ONLOAD}"', 1)
+            css = self.css_for(document_features(document))
+            template = (template[:link.start()] + f"<style>{css}</style>{deferred}"
+                        f"<noscript>{tag}</noscript>" + template[link.end():])
+
+        image = first_image(document)
+        if image is not None:
+            if rewrite_url is not None:
+                image = rewrite_url(image)
+            preload = f'<link rel="preload" as="image" href="{escape_attr(image)}" />'
+            head_end = template.find("</head>")
+            if head_end != -1:
+                template = f"{template[:head_end]}{preload}\n  {template[head_end:]}"
+        return template
@@ -0,0 +1,165 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+
+
+class BuildDaemon:
+    """
+    Handles build requests for a long-running process.
+
+    The build, render and status callables are supplied by the caller (see
+    run_daemon() in main.py), which keeps the parse caches they share alive
+    between requests. Builds and renders are serialized by a lock, so
+    concurrent clients never see a half-written output tree; status
+    requests are answered without waiting for it.
+
+    Requests and responses are JSON objects:
+        {"command": "build"}
+        {"command": "render", "path": "content/index.md"}
+        {"command": "status"}
+    """
+
+    def __init__(self, build, render, status=None):
+        self.build = build
+        self.render = render
+        self.status = status
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.busy = False
+        self.last_build = None
+
+    def handle(self, request):
+        """Process one request and return the response object."""
+        self.requests += 1
+        command = request.get("command")
+        if command == "status":
+            response = {
+                "ok": True,
+                "uptime": round(time.time() - self.started, 3),
+                "requests": self.requests,
+                "busy": self.busy,
+                "last_build": self.last_build,
+            }
+            if self.status is not None:
+                response.update(self.status())
+            return response
+
+        if command not in ("build", "render"):
+            return {"ok": False, "error": f"Unknown command: {command!r}"}
+        if command == "render" and not request.get("path"):
+            return {"ok": False, "error": "render needs a path"}
+
+        with self.lock:
+            self.busy = True
+            start = time.perf_counter()
+            try:
+                if command == "build":
+                    pages = self.build()
+                    elapsed = time.perf_counter() - start
+                    self.last_build = {"pages": len(pages), "seconds": round(elapsed, 6),
+                                       "finished": time.time()}
+                    return {"ok": True, "pages": len(pages), "seconds": round(elapsed, 6)}
+                html = self.render(request["path"])
+                return {"ok": True, "html": html,
+                        "seconds": round(time.perf_counter() - start, 6)}
+            finally:
+                self.busy = False
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads newline-delimited JSON requests and writes one response line each."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.build_daemon.handle(json.loads(line))
+            except Exception as error:
+                response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def remove_stale_socket(socket_path):
+    """
+    Remove a socket file left behind by a daemon that is no longer running.
+
+    Only a socket that refuses connections is removed.
+
+    Raises:
+        FileExistsError: If the path is not a socket, or a daemon is still
+            listening on it.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return
+    raise FileExistsError(f"A daemon is already listening on {socket_path}")
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, build_daemon):
+        # A socket file left behind by a crashed daemon would block bind()
+        remove_stale_socket(socket_path)
+        self.build_daemon = build_daemon
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve(socket_path, build_daemon):
+    """Serve requests on socket_path until interrupted."""
+    with DaemonServer(socket_path, build_daemon) as server:
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+
+def send_request(socket_path, command, **params):
+    """
+    Send one request to a running daemon and return its response.
+
+    Example:
+        send_request(".ssg-cache/daemon.sock", "render", path="content/index.md")
+    """
+    request = dict(params, command=command)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as response:
+            return json.loads(response.readline())
+
+
+if __name__ == "__main__":
+    # Minimal client: python -m src.daemon SOCKET build|status|render [PATH]
+    import sys
+
+    if len(sys.argv) < 3:
+        sys.exit("usage: python -m src.daemon SOCKET build|status|render [PATH]")
+    params = {"path": sys.argv[3]} if len(sys.argv) > 3 else {}
+    result = send_request(sys.argv[1], sys.argv[2], **params)
+    if result.get("ok") and "html" in result:
+        print(result["html"])
+    else:
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result.get("ok") else 1)
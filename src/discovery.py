@@ -0,0 +1,261 @@
+import json
+import os
+import re
+import time
+
+# Read from the top of each scanned tree (content/, static/, ...).
+IGNORE_FILE = ".ssgignore"
+
+# Always ignored: the ignore file itself, editor temp files, OS litter and
+# dependency/bytecode directories.
+DEFAULT_IGNORES = (
+    IGNORE_FILE,
+    "*~",
+    "*.swp",
+    ".#*",
+    "#*#",
+    ".DS_Store",
+    "node_modules/",
+    "__pycache__/",
+)
+
+# Directories modified this recently are not trusted from the snapshot:
+# a change in the same timestamp tick as the scan would go unnoticed.
+RACY_WINDOW_NS = 2 * 10**9
+
+
+def _translate(pattern):
+    """Translate a gitignore glob (without anchoring) into a regex."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif char == "*":
+            out.append("[^/]*")
+            i += 1
+        elif char == "?":
+            out.append("[^/]")
+            i += 1
+        elif char == "[" and pattern.find("]", i + 2) != -1:
+            end = pattern.find("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif char == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(char))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    A list of .gitignore-style patterns.
+
+    Supported: blank lines and # comments, * ? [...] and ** globs, a
+    trailing / to match directories only, a leading or inner / to anchor
+    the pattern at the top of the tree, and ! to re-include a path. As in
+    git, the last matching pattern wins, and nothing inside an ignored
+    directory can be re-included.
+    """
+
+    def __init__(self, patterns=()):
+        self.rules = []
+        for line in patterns:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            regex = re.compile(("" if anchored else "(?:.*/)?") + _translate(line))
+            self.rules.append((regex, negate, dir_only))
+
+    def ignored(self, relative_path, is_dir=False):
+        """
+        Check a path against the rules.
+
+        Args:
+            relative_path (str): Path relative to the tree's top, with / separators.
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            bool: True if the path is ignored.
+        """
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(relative_path):
+                ignored = not negate
+        return ignored
+
+
+def load_ignore_rules(root):
+    """The default rules plus those in root's ignore file, if any."""
+    patterns = list(DEFAULT_IGNORES)
+    try:
+        with open(os.path.join(root, IGNORE_FILE), "r") as ignore_file:
+            patterns.extend(ignore_file.read().splitlines())
+    except OSError:
+        pass
+    return IgnoreRules(patterns)
+
+
+class FileEntry:
+    """
+    A discovered file.
+
+    path is relative to the scanned tree, with / separators. size and
+    mtime_ns are None unless the scan was asked for stats.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "inode")
+
+    def __init__(self, path, size=None, mtime_ns=None, inode=None):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+
+    def __repr__(self):
+        return f"FileEntry({self.path!r}, {self.size}, {self.mtime_ns}, {self.inode})"
+
+
+class DirectorySnapshot:
+    """
+    Directory listings with file stats, saved between builds.
+
+    Each directory is stored with its mtime. Adding, removing or renaming an
+    entry changes a directory's mtime, so while it is unchanged its listing
+    and file stats are reused without reading or stat-ing the directory's
+    files again.
+
+    Files edited in place don't touch their directory, so their new size and
+    mtime are only seen once something else in the directory changes. Only
+    use a snapshot where that is acceptable, or where files are replaced by
+    rename (as most editors and tools do when saving).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._old = {}
+        self._new = {}
+        if path:
+            try:
+                with open(path, "r") as snapshot_file:
+                    self._old = json.load(snapshot_file)
+            except (OSError, ValueError):
+                self._old = {}
+
+    def lookup(self, dir_path, mtime_ns):
+        """Return the saved (files, subdirs) of a directory if its mtime is unchanged."""
+        saved = self._old.get(dir_path)
+        if saved is None or saved[0] != mtime_ns:
+            self.misses += 1
+            return None
+        self.hits += 1
+        files = [tuple(file) for file in saved[1]]
+        self._new[dir_path] = saved
+        return files, saved[2]
+
+    def record(self, dir_path, mtime_ns, files, subdirs):
+        if time.time_ns() - mtime_ns > RACY_WINDOW_NS:
+            self._new[dir_path] = [mtime_ns, files, subdirs]
+
+    def save(self):
+        """Write the directories seen since loading (dropping vanished ones)."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as snapshot_file:
+            json.dump(self._new, snapshot_file)
+
+
+def _list_dir(path, with_stats, snapshot):
+    """Return (files, subdirs) of a directory, both sorted by name."""
+    if snapshot is not None:
+        mtime_ns = os.stat(path).st_mtime_ns
+        saved = snapshot.lookup(path, mtime_ns)
+        if saved is not None:
+            return saved
+        with_stats = True
+
+    files = []
+    subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            # The entry type comes from the directory listing itself; only
+            # symlinks (and filesystems without d_type) need a stat here.
+            # As with os.walk(), symlinked directories are not entered (a
+            # link to an ancestor would loop), but symlinked files are listed.
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            elif entry.is_file():
+                if with_stats:
+                    st = entry.stat()
+                    files.append((entry.name, st.st_size, st.st_mtime_ns, st.st_ino))
+                else:
+                    files.append((entry.name, None, None, entry.inode()))
+    files.sort()
+    subdirs.sort()
+
+    if snapshot is not None:
+        snapshot.record(path, mtime_ns, files, subdirs)
+    return files, subdirs
+
+
+def scan_tree(root, ignore=None, with_stats=False, snapshot=None):
+    """
+    List the files below root with os.scandir, skipping ignored paths.
+
+    Files come in the same order as a sorted os.walk(): a directory's files
+    by name, then its subdirectories by name. Ignored directories are not
+    entered at all.
+
+    Args:
+        root (str): Top of the tree.
+        ignore (IgnoreRules): Rules to apply; defaults to load_ignore_rules(root).
+        with_stats (bool): Fill in each entry's size and mtime (one stat per file).
+        snapshot (DirectorySnapshot): Reuse listings and stats of directories
+            whose mtime is unchanged. Implies with_stats.
+
+    Returns:
+        list: FileEntry objects.
+    """
+    if ignore is None:
+        ignore = load_ignore_rules(root)
+    entries = []
+    pending = [""]
+    while pending:
+        prefix = pending.pop()
+        files, subdirs = _list_dir(os.path.join(root, prefix) if prefix else root,
+                                   with_stats, snapshot)
+        for name, size, mtime_ns, inode in files:
+            relative_path = prefix + name
+            if not ignore.ignored(relative_path):
+                entries.append(FileEntry(relative_path, size, mtime_ns, inode))
+        # Pushed in reverse so that subdirectories are visited in name order
+        for name in reversed(subdirs):
+            relative_path = prefix + name
+            if not ignore.ignored(relative_path, is_dir=True):
+                pending.append(relative_path + "/")
+    return entries
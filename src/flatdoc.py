@@ -0,0 +1,429 @@
+from array import array
+
+from src.block_markdown import (
+    BlockType,
+    code_parts,
+    find_block_syntax,
+    heading_parts,
+    markdown_to_blocks,
+    ordered_list_items,
+    paragraph_text,
+    quote_text,
+    unordered_list_items,
+)
+from src.highlight import highlight
+from src.htmlnode import LeafNode, ParentNode, RawHTMLNode, escape_attr, escape_text
+from src.inline_markdown import text_to_spans, text_to_textnodes
+from src.targets import URL_ATTRS, rewrite_html_node_urls
+from src.textnode import EXTENSION_TAGS, TextType
+
+# Node kinds. TEXT is a bare text run (LeafNode without a tag), LEAF an
+# element holding only text (LeafNode with a tag), ELEMENT an element with
+# child nodes (ParentNode) and RAW already rendered markup (RawHTMLNode).
+TEXT = 0
+LEAF = 1
+ELEMENT = 2
+RAW = 3
+
+NO_NODE = -1
+
+INLINE_TAGS = {
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+
+class FlatDocument:
+    """
+    A document stored as parallel arrays instead of a tree of node objects.
+
+    Node i is described by kinds[i], tag_ids[i] (an index into tag_names),
+    the slice text[text_starts[i]:text_ends[i]] and its links parents[i],
+    first_children[i] and next_siblings[i] (NO_NODE when absent).
+    Attributes are rare, so they live in a dict keyed by node index. Node 0
+    is the root.
+
+    Text is appended to a buffer while the document is built, either per
+    node or once per run of source text that several nodes then index into
+    (see add_source()). Call finish() before reading the document back; it
+    joins the buffer and links children to their parents.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.tag_ids = array("H")
+        self.text_starts = array("q")
+        self.text_ends = array("q")
+        self.parents = array("q")
+        self.first_children = array("q")
+        self.next_siblings = array("q")
+        self.props = {}
+        self.tag_names = [None]
+        self.text = ""
+        self._tag_index = {None: 0}
+        self.preorder = True
+        self._chunks = []
+        self._text_size = 0
+        # Whether any text (other than RAW markup) has characters to escape
+        self._needs_escaping = False
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def tag_id(self, tag):
+        """Intern a tag name and return its id."""
+        tag_id = self._tag_index.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tag_names)
+            self.tag_names.append(tag)
+            self._tag_index[tag] = tag_id
+        return tag_id
+
+    def add_source(self, text):
+        """
+        Append text to the buffer without adding a node.
+
+        The text is escaped when written, so it must not be RAW markup.
+
+        Returns:
+            int: Offset of text in the buffer; nodes added with
+                start=offset + i, end=offset + j hold text[i:j] without
+                copying it.
+        """
+        offset = self._text_size
+        if text:
+            self._chunks.append(text)
+            self._text_size += len(text)
+            if "&" in text or "<" in text or ">" in text:
+                self._needs_escaping = True
+        return offset
+
+    def add_node(self, kind, parent=NO_NODE, tag=None, text="", props=None,
+                 start=None, end=None):
+        """
+        Append a node as the last child of parent and return its index.
+
+        Args:
+            kind (int): TEXT, LEAF, ELEMENT or RAW.
+            parent (int): Index of the parent node, NO_NODE for the root.
+            tag (str): Tag name (None for TEXT and RAW nodes).
+            text (str): Text of TEXT and LEAF nodes, markup of RAW nodes.
+            props (dict): Attributes, or None.
+            start (int): With end, the node's text as a slice of the buffer
+                (see add_source()), instead of text.
+            end (int): End of that slice.
+        """
+        index = len(self.kinds)
+        if start is None:
+            start = end = self._text_size
+            if text:
+                self._chunks.append(text)
+                end = self._text_size = start + len(text)
+                if kind != RAW and ("&" in text or "<" in text or ">" in text):
+                    self._needs_escaping = True
+        tag_id = self._tag_index.get(tag)
+        if tag_id is None:
+            tag_id = self.tag_id(tag)
+        self.kinds.append(kind)
+        self.tag_ids.append(tag_id)
+        self.text_starts.append(start)
+        self.text_ends.append(end)
+        self.parents.append(parent)
+        if props:
+            self.props[index] = props
+        return index
+
+    def add_element(self, tag, parent=NO_NODE, props=None):
+        return self.add_node(ELEMENT, parent, tag, "", props)
+
+    def add_leaf(self, tag, text, parent, props=None):
+        return self.add_node(LEAF, parent, tag, text, props)
+
+    def add_text(self, text, parent):
+        return self.add_node(TEXT, parent, None, text)
+
+    def add_raw(self, html, parent):
+        return self.add_node(RAW, parent, None, html)
+
+    def append_html_node(self, node, parent=NO_NODE):
+        """Copy an HTMLNode tree into the document below parent."""
+        if isinstance(node, RawHTMLNode):
+            return self.add_raw(node.value, parent)
+        if isinstance(node, LeafNode):
+            if node.value is None:
+                raise ValueError("invalid HTML: no value")
+            if node.tag is None:
+                return self.add_text(node.value, parent)
+            return self.add_leaf(node.tag, node.value, parent, node.props)
+        if node.tag is None:
+            raise ValueError("invalid HTML: no tag")
+        if node.children is None:
+            raise ValueError("invalid HTML: no children")
+        index = self.add_element(node.tag, parent, node.props)
+        for child in node.children:
+            self.append_html_node(child, index)
+        return index
+
+    def finish(self):
+        """
+        Join the text buffer and link each node to its siblings.
+
+        Must be called once building is done. Also records whether nodes
+        were added in document (pre-)order, each below the previous node or
+        one of its ancestors, which lets to_html() write a subtree in one
+        forward scan.
+        """
+        self.text = "".join(self._chunks)
+        self._chunks = [self.text]
+
+        size = len(self.parents)
+        first_children = [NO_NODE] * size
+        next_siblings = [NO_NODE] * size
+        last_children = [NO_NODE] * size
+        preorder = True
+        path = []
+        for index, parent in enumerate(self.parents):
+            while path and path[-1] != parent:
+                path.pop()
+            if parent != NO_NODE:
+                if not path:
+                    preorder = False
+                last = last_children[parent]
+                if last == NO_NODE:
+                    first_children[parent] = index
+                else:
+                    next_siblings[last] = index
+                last_children[parent] = index
+            path.append(index)
+        self.first_children = array("q", first_children)
+        self.next_siblings = array("q", next_siblings)
+        self.preorder = preorder
+        return self
+
+    def node_text(self, index):
+        return self.text[self.text_starts[index]:self.text_ends[index]]
+
+    def tag(self, index):
+        return self.tag_names[self.tag_ids[index]]
+
+    def children(self, index):
+        """Yield the indices of a node's children in order."""
+        child = self.first_children[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_siblings[child]
+
+    def _props_html(self, index, rewrite_url=None):
+        props = self.props.get(index)
+        if not props:
+            return ""
+        if rewrite_url is None:
+            return "".join([f' {key}="{escape_attr(str(value))}"' for key, value in props.items()])
+        return "".join([
+            f' {key}="{escape_attr(rewrite_url(value) if key in URL_ATTRS else str(value))}"'
+            for key, value in props.items()
+        ])
+
+    def to_html(self, index=0, rewrite_url=None):
+        """
+        Serialize the subtree rooted at index without building node objects.
+
+        Args:
+            index (int): Root of the subtree to serialize.
+            rewrite_url (callable): Optional function applied to every href
+                and src attribute, so one parsed document can be written for
+                several deployment targets without touching the page text.
+        """
+        if not self.preorder:
+            node = self.to_html_node(index)
+            if rewrite_url is not None:
+                rewrite_html_node_urls(node, rewrite_url)
+            return node.to_html()
+
+        # Nodes were added in document order, so a subtree is a contiguous
+        # run of indices and can be written in one forward scan over the
+        # arrays (as lists, which iterate faster); prop-less tags come from
+        # a prebuilt table, and text is only escaped if some of it needs it.
+        kinds = self.kinds
+        # Only an element has a subtree; any other node is written alone
+        end = len(kinds) if kinds[index] == ELEMENT else index + 1
+        tag_ids = self.tag_ids
+        text = self.text
+        props = self.props
+        tag_names = self.tag_names
+        open_tags = [f"<{tag}>" for tag in tag_names]
+        close_tags = [f"</{tag}>" for tag in tag_names]
+        needs_escaping = self._needs_escaping
+
+        out = []
+        append = out.append
+        open_elements = []
+        current = NO_NODE
+        node = index - 1
+        for kind, parent, tag_id, start, stop in zip(
+                kinds[index:end].tolist(), self.parents[index:end].tolist(),
+                tag_ids[index:end].tolist(), self.text_starts[index:end].tolist(),
+                self.text_ends[index:end].tolist()):
+            node += 1
+            if parent != current:
+                while open_elements and open_elements[-1] != parent:
+                    append(close_tags[tag_ids[open_elements.pop()]])
+                if node != index and not open_elements:
+                    break
+                current = parent
+
+            if kind == TEXT:
+                append(escape_text(text[start:stop]) if needs_escaping else text[start:stop])
+                continue
+            if kind == RAW:
+                append(text[start:stop])
+                continue
+            if node in props:
+                append(f"<{tag_names[tag_id]}{self._props_html(node, rewrite_url)}>")
+            else:
+                append(open_tags[tag_id])
+            if kind == LEAF:
+                append(escape_text(text[start:stop]) if needs_escaping else text[start:stop])
+                append(close_tags[tag_id])
+            else:
+                open_elements.append(node)
+                current = node
+        while open_elements:
+            append(close_tags[tag_ids[open_elements.pop()]])
+        return "".join(out)
+
+    def to_html_node(self, index=0):
+        """Convert the subtree rooted at index to LeafNode/ParentNode objects."""
+        kind = self.kinds[index]
+        props = self.props.get(index)
+        props = dict(props) if props else None
+        if kind == TEXT:
+            return LeafNode(None, self.node_text(index))
+        if kind == RAW:
+            return RawHTMLNode(self.node_text(index))
+        if kind == LEAF:
+            return LeafNode(self.tag(index), self.node_text(index), props)
+        children = [self.to_html_node(child) for child in self.children(index)]
+        return ParentNode(self.tag(index), children, props)
+
+    def urls(self):
+        """Yield (node index, attribute, URL) for every href/src in the document."""
+        for index, props in self.props.items():
+            for attr in URL_ATTRS:
+                if attr in props:
+                    yield index, attr, props[attr]
+
+    def count_kinds(self):
+        """Return the number of (TEXT, LEAF, ELEMENT) nodes."""
+        return (self.kinds.count(TEXT), self.kinds.count(LEAF), self.kinds.count(ELEMENT))
+
+
+def add_inline(doc, parent, text):
+    """
+    Parse inline markdown and append the resulting nodes below parent.
+
+    The text is added to the buffer once and each node indexes into it,
+    straight from the parser's match positions.
+    """
+    spans = text_to_spans(text)
+    if spans is None:
+        _add_textnodes(doc, parent, text)
+        return
+    add_node = doc.add_node
+    offset = doc.add_source(text)
+    for text_type, start, end, url in spans:
+        if text_type is TextType.TEXT:
+            add_node(TEXT, parent, None, "", None, offset + start, offset + end)
+        elif text_type is TextType.LINK:
+            add_node(LEAF, parent, "a", "", {"href": url}, offset + start, offset + end)
+        elif text_type is TextType.IMAGE:
+            add_node(LEAF, parent, "img", "", {"alt": text[start:end], "src": url})
+        else:
+            add_node(LEAF, parent, INLINE_TAGS[text_type], "", None, offset + start, offset + end)
+
+
+def _add_textnodes(doc, parent, text):
+    """add_inline() through TextNodes, for extension inline syntaxes."""
+    for text_node in text_to_textnodes(text):
+        text_type = text_node.text_type
+        if text_type == TextType.TEXT:
+            doc.add_text(text_node.text, parent)
+        elif text_type == TextType.LINK:
+            doc.add_leaf("a", text_node.text, parent, {"href": text_node.url})
+        elif text_type == TextType.IMAGE:
+            doc.add_leaf("img", "", parent, {"alt": text_node.text, "src": text_node.url})
+        elif text_type in INLINE_TAGS:
+            doc.add_leaf(INLINE_TAGS[text_type], text_node.text, parent)
+        elif text_type in EXTENSION_TAGS:
+            doc.add_leaf(EXTENSION_TAGS[text_type], text_node.text, parent)
+        else:
+            raise Exception("not valid")
+
+
+def add_code(doc, parent, block):
+    language, text = code_parts(block)
+    pre = doc.add_element("pre", parent)
+    if language is None:
+        code = doc.add_element("code", pre)
+        doc.add_text(text, code)
+        return
+    code = doc.add_element("code", pre, {"class": f"language-{language}"})
+    doc.add_raw(highlight(text, language), code)
+
+
+def add_paragraph(doc, parent, block):
+    add_inline(doc, doc.add_element("p", parent), paragraph_text(block))
+
+
+def add_heading(doc, parent, block):
+    level, text = heading_parts(block)
+    add_inline(doc, doc.add_element(f"h{level}", parent), text)
+
+
+def add_quote(doc, parent, block):
+    add_inline(doc, doc.add_element("blockquote", parent), quote_text(block))
+
+
+def add_unordered_list(doc, parent, block):
+    ul = doc.add_element("ul", parent)
+    for text in unordered_list_items(block):
+        add_inline(doc, doc.add_element("li", ul), text)
+
+
+def add_ordered_list(doc, parent, block):
+    ol = doc.add_element("ol", parent)
+    for text in ordered_list_items(block):
+        add_inline(doc, doc.add_element("li", ol), text)
+
+
+# Block syntax name -> function(doc, parent, block) appending the block.
+# Syntaxes without an entry (extensions, usually) are converted with their
+# to_html_node() and copied in.
+FLAT_BUILDERS = {
+    BlockType.PARAGRAPH: add_paragraph,
+    BlockType.HEADING: add_heading,
+    BlockType.CODE: add_code,
+    BlockType.QUOTE: add_quote,
+    BlockType.UNORDERED_LIST: add_unordered_list,
+    BlockType.ORDERED_LIST: add_ordered_list,
+}
+
+
+def markdown_to_flat_document(markdown):
+    """
+    Parse a markdown document straight into a FlatDocument.
+
+    Produces the same structure as markdown_to_html_node(), rooted at a
+    div, without allocating a node object per element.
+    """
+    doc = FlatDocument()
+    root = doc.add_element("div")
+    for block in markdown_to_blocks(markdown):
+        syntax = find_block_syntax(block)
+        builder = FLAT_BUILDERS.get(syntax.name)
+        if builder is None:
+            doc.append_html_node(syntax.to_html_node(block), root)
+        else:
+            builder(doc, root, block)
+    return doc.finish()
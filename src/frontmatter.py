@@ -0,0 +1,156 @@
+HEADER_CHUNK_SIZE = 4096
+
+# A closing fence must appear within this many characters of the start of
+# the file; past that the file is treated as having no front matter, so an
+# unclosed fence doesn't make the header reader load the whole document.
+MAX_HEADER_SIZE = 64 * 1024
+
+# Opening fence -> key/value separator. "---" is YAML style ("key: value"),
+# "+++" is TOML style ("key = value").
+FENCES = {"---": ":", "+++": "="}
+
+
+def parse_front_matter_value(value):
+    """
+    Convert a raw front matter value into a Python value.
+
+    Supports quoted strings, booleans and inline lists ("[a, b]").
+    Anything else is returned as a stripped string.
+    """
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        items = [item.strip() for item in value[1:-1].split(",")]
+        return [parse_front_matter_value(item) for item in items if item]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+
+def _front_matter_bounds(text):
+    """
+    Locate the front matter block at the start of `text`.
+
+    Returns:
+        tuple: (fence, end of the header lines, start of the body), or None
+        if `text` has no complete front matter block.
+    """
+    fence = text[:3]
+    if fence not in FENCES or text[3:4] != "\n":
+        return None
+    end = text.find(f"\n{fence}", 3, MAX_HEADER_SIZE)
+    if end == -1:
+        return None
+    body_start = text.find("\n", end + 4)
+    return fence, end, len(text) if body_start == -1 else body_start + 1
+
+
+def _parse_header(lines, separator):
+    metadata = {}
+    # Key with an empty value, which "- item" lines below it turn into a list
+    list_key = None
+    for line in lines.split("\n"):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if list_key is not None and (stripped == "-" or stripped.startswith("- ")):
+            if metadata[list_key] == "":
+                metadata[list_key] = []
+            metadata[list_key].append(parse_front_matter_value(stripped[1:]))
+            continue
+        key, sep, value = line.partition(separator)
+        if not sep:
+            raise ValueError(f"Invalid front matter line: {line!r}")
+        key = key.strip()
+        metadata[key] = parse_front_matter_value(value)
+        list_key = key if separator == ":" and metadata[key] == "" else None
+    return metadata
+
+
+def split_front_matter(markdown):
+    """
+    Split a markdown document into its front matter and body.
+
+    Front matter is an optional block at the very start of the document,
+    fenced either by "---" lines ("key: value" pairs) or by "+++" lines
+    ("key = value" pairs). YAML-style keys may also list their values on
+    the following lines as "- item".
+
+    Args:
+        markdown (str): The full markdown document.
+
+    Returns:
+        tuple: (metadata dict, markdown body without the front matter).
+    """
+    bounds = _front_matter_bounds(markdown)
+    if bounds is None:
+        return {}, markdown
+    fence, end, body_start = bounds
+    return _parse_header(markdown[4:end], FENCES[fence]), markdown[body_start:]
+
+
+def read_front_matter(path, chunk_size=HEADER_CHUNK_SIZE):
+    """
+    Read only the front matter of a markdown file.
+
+    The file is read in chunks until the closing fence is found, so the
+    cost depends on the size of the header rather than of the document,
+    and the markdown body is never parsed. Each chunk is searched only from
+    just before its start, and reading stops after MAX_HEADER_SIZE.
+
+    Args:
+        path (str): Path to the markdown file.
+        chunk_size (int): Number of characters to read at a time.
+
+    Returns:
+        dict: The metadata, empty if the file has no front matter.
+
+    Raises:
+        ValueError: If the front matter has an invalid line; the message
+            names the file.
+    """
+    with open(path, "r") as markdown_file:
+        text = markdown_file.read(max(chunk_size, 4))
+        fence = text[:3]
+        if fence not in FENCES or text[3:4] != "\n":
+            return {}
+        start = 3
+        while True:
+            end = text.find(f"\n{fence}", start, MAX_HEADER_SIZE)
+            if end != -1:
+                try:
+                    return _parse_header(text[4:end], FENCES[fence])
+                except ValueError as error:
+                    raise ValueError(f"{path}: {error}") from error
+            if len(text) >= MAX_HEADER_SIZE:
+                return {}
+            chunk = markdown_file.read(chunk_size)
+            if not chunk:
+                return {}
+            # The fence may straddle the previous chunk's end
+            start = max(3, len(text) - len(fence))
+            text += chunk
+
+
+def is_draft(metadata):
+    """True if the metadata marks the page as a draft."""
+    return metadata.get("draft") is True
+
+
+def scan_front_matter(content_dir):
+    """
+    Yield (path, metadata) for every markdown file below content_dir.
+
+    Only file headers are read, which makes this suitable for tooling that
+    needs metadata for a large tree (listings, sitemaps, draft reports).
+    Ignored paths (see src/discovery.py) are skipped.
+    """
+    import os
+
+    from src.discovery import scan_tree
+
+    for entry in scan_tree(content_dir):
+        if entry.path.endswith(".md"):
+            path = os.path.join(content_dir, entry.path)
+            yield path, read_front_matter(path)
@@ -0,0 +1,197 @@
+import hashlib
+import re
+
+from src.htmlnode import RawHTMLNode, escape_text
+
+# Token kind -> CSS class of the <span> wrapping it.
+TOKEN_CLASSES = {
+    "comment": "tok-comment",
+    "string": "tok-string",
+    "number": "tok-number",
+    "keyword": "tok-keyword",
+    "builtin": "tok-builtin",
+}
+
+# Maximum number of rendered snippets kept in memory.
+CACHE_SIZE = 4096
+
+
+def _keywords(words):
+    return r"\b(?:" + "|".join(words.split()) + r")\b"
+
+
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+
+# Strings and comments that are never closed run to the end of their line
+# (or of the code) and still match, instead of failing and being retried
+# from every later quote, which would take quadratic time.
+_DQ_STRING = r'"(?:[^"\\\n]|\\.)*"?'
+_SQ_STRING = r"'(?:[^'\\\n]|\\.)*'?"
+_BLOCK_COMMENT = r"/\*[\s\S]*?(?:\*/|\Z)"
+
+# Each language is a list of (token kind, pattern). Earlier patterns win
+# when several match at the same position.
+_LANGUAGE_RULES = {
+    "python": [
+        ("comment", r"#[^\n]*"),
+        ("string", r'[rbfuRBFU]{0,2}(?:"""[\s\S]*?(?:"""|\Z)|\'\'\'[\s\S]*?(?:\'\'\'|\Z)|' + _DQ_STRING + "|" + _SQ_STRING + ")"),
+        ("keyword", _keywords(
+            "False None True and as assert async await break class continue def del "
+            "elif else except finally for from global if import in is lambda nonlocal "
+            "not or pass raise return try while with yield match case")),
+        ("builtin", _keywords(
+            "print len range str int float list dict set tuple bool open isinstance "
+            "super object type enumerate zip map filter sorted min max sum any all")),
+        ("number", _NUMBER),
+    ],
+    "javascript": [
+        ("comment", r"//[^\n]*|" + _BLOCK_COMMENT),
+        ("string", _DQ_STRING + "|" + _SQ_STRING + r"|`(?:[^`\\]|\\[\s\S])*`?"),
+        ("keyword", _keywords(
+            "break case catch class const continue debugger default delete do else "
+            "export extends finally for function if import in instanceof let new "
+            "return super switch this throw try typeof var void while with yield "
+            "async await of null undefined true false")),
+        ("builtin", _keywords("console document window Math JSON Object Array String Number Promise")),
+        ("number", _NUMBER),
+    ],
+    "go": [
+        ("comment", r"//[^\n]*|" + _BLOCK_COMMENT),
+        ("string", _DQ_STRING + r"|`[^`]*`?|" + _SQ_STRING),
+        ("keyword", _keywords(
+            "break case chan const continue default defer else fallthrough for func "
+            "go goto if import interface map package range return select struct "
+            "switch type var nil true false")),
+        ("builtin", _keywords(
+            "append cap close copy delete len make new panic print println recover "
+            "string int int64 float64 bool byte rune error")),
+        ("number", _NUMBER),
+    ],
+    "bash": [
+        ("comment", r"(?<![\w$])#[^\n]*"),
+        ("string", _DQ_STRING + r"|'[^']*'?"),
+        ("keyword", _keywords(
+            "if then else elif fi for while until do done case esac in function "
+            "return exit export local readonly")),
+        ("builtin", _keywords("echo cd pwd printf read source test set unset shift")),
+        ("number", _NUMBER),
+    ],
+    "json": [
+        ("string", _DQ_STRING),
+        ("keyword", _keywords("true false null")),
+        ("number", r"-?" + _NUMBER),
+    ],
+    "css": [
+        ("comment", _BLOCK_COMMENT),
+        ("string", _DQ_STRING + "|" + _SQ_STRING),
+        ("number", r"#[0-9a-fA-F]{3,8}\b|-?\d+(?:\.\d+)?(?:px|em|rem|%|vh|vw|s|ms)?"),
+        ("keyword", r"@[\w-]+|!important"),
+    ],
+}
+
+LANGUAGE_ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "node": "javascript",
+    "golang": "go",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+}
+
+
+def _compile(rules):
+    pattern = "|".join(f"(?P<{kind}>{regex})" for kind, regex in rules)
+    return re.compile(pattern)
+
+
+_LEXERS = {name: _compile(rules) for name, rules in _LANGUAGE_RULES.items()}
+
+_cache = {}
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def normalize_language(language):
+    """Map a fence info string ("Python", "js", ...) to a known language or None."""
+    words = language.split()
+    if not words:
+        return None
+    language = words[0].lower()
+    language = LANGUAGE_ALIASES.get(language, language)
+    return language if language in _LEXERS else None
+
+
+def tokenize(code, language):
+    """
+    Split code into (token kind, text) pairs.
+
+    Text between recognized tokens is returned with kind None. Unknown
+    languages yield the whole code as a single plain token.
+    """
+    lexer = _LEXERS.get(language)
+    if lexer is None:
+        return [(None, code)] if code else []
+    tokens = []
+    last_index = 0
+    for match in lexer.finditer(code):
+        start = match.start()
+        if start == match.end():
+            continue
+        if start > last_index:
+            tokens.append((None, code[last_index:start]))
+        tokens.append((match.lastgroup, match.group()))
+        last_index = match.end()
+    if last_index < len(code):
+        tokens.append((None, code[last_index:]))
+    return tokens
+
+
+def tokens_to_html(tokens):
+    """Render (token kind, text) pairs as escaped text and <span class="tok-..."> elements."""
+    return "".join(
+        escape_text(text) if kind is None
+        else f'<span class="{TOKEN_CLASSES[kind]}">{escape_text(text)}</span>'
+        for kind, text in tokens
+    )
+
+
+def highlight(code, language):
+    """
+    Highlight code into the HTML content of its <code> element.
+
+    The rendered fragment is cached by the language and a hash of the code,
+    so a snippet repeated across many pages is tokenized, escaped and
+    joined only once per process; later pages reuse the finished string.
+
+    Returns:
+        str: The escaped, highlighted HTML.
+    """
+    key = (language, hashlib.sha1(code.encode("utf-8")).digest())
+    html = _cache.get(key)
+    if html is not None:
+        cache_stats["hits"] += 1
+        return html
+    cache_stats["misses"] += 1
+    html = tokens_to_html(tokenize(code, language))
+    if len(_cache) >= CACHE_SIZE:
+        # Drop the oldest entry (dicts keep insertion order)
+        del _cache[next(iter(_cache))]
+    _cache[key] = html
+    return html
+
+
+def clear_cache():
+    _cache.clear()
+    cache_stats["hits"] = 0
+    cache_stats["misses"] = 0
+
+
+def highlight_to_html_nodes(code, language):
+    """
+    Highlight code and return the children for its <code> element.
+
+    The highlighted markup is a single RawHTMLNode holding the cached
+    fragment.
+    """
+    return [RawHTMLNode(highlight(code, language))]
@@ -1,3 +1,32 @@
+def escape_text(text):
+    """
+    Escape text content for HTML.
+
+    Only &, < and > are special in text. Strings without them, which is
+    nearly all prose, are returned unchanged without building a new string.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attr(value):
+    """
+    Escape a double-quoted attribute value for HTML.
+
+    Like escape_text(), but also escapes the double quote that would
+    otherwise end the attribute.
+    """
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
 class HTMLNode:
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
@@ -13,7 +42,7 @@ class HTMLNode:
             return ""
         props_html = ""
         for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
+            props_html += f' {prop}="{escape_attr(str(self.props[prop]))}"'
         return props_html
 
     def __repr__(self):
@@ -28,13 +57,26 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("invalid HTML: no value")
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return escape_text(self.value)
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
+class RawHTMLNode(HTMLNode):
+    """Markup that is already rendered and escaped, written out as it is."""
+
+    def __init__(self, html):
+        super().__init__(None, html)
+
+    def to_html(self):
+        return self.value
+
+    def __repr__(self):
+        return f"RawHTMLNode({self.value!r})"
+
+
 class ParentNode(HTMLNode):
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
@@ -44,8 +86,22 @@ class ParentNode(HTMLNode):
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        parts = []
+        # Adjacent plain text leaves are escaped as one run
+        text_run = []
+        for child in self.children:
+            if child.tag is None and type(child) is LeafNode:
+                if child.value is None:
+                    raise ValueError("invalid HTML: no value")
+                text_run.append(child.value)
+                continue
+            if text_run:
+                parts.append(escape_text("".join(text_run)))
+                text_run = []
+            parts.append(child.to_html())
+        if text_run:
+            parts.append(escape_text("".join(text_run)))
+        return f"<{self.tag}{self.props_to_html()}>{''.join(parts)}</{self.tag}>"
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
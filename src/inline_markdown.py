@@ -1,12 +1,19 @@
-from src.textnode import TextNode, TextType
+from src.textnode import EXTENSION_TAGS, TextNode, TextType
 import re
 
 
+# Neither bracketed part can contain the delimiter that ends it, so a failed
+# match attempt gives up at the next bracket or parenthesis and scanning a
+# text stays linear in its length.
+LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return LINK_RE.findall(text)
 
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return IMAGE_RE.findall(text)
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -29,101 +36,262 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         new_nodes.extend(split_nodes)
     return new_nodes
 
-def split_nodes_link(old_nodes):
-    res = []
 
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    """
+    Split nodes on every match of pattern, turning matches into text_type nodes.
+
+    Match positions come straight from the regex scan, so each node's text
+    is visited once and never searched again for the matched markdown.
+    """
+    res = []
     for node in old_nodes:
-        if node.text_type == TextType.LINK:
-            # Already a link, keep as is
+        if node.text_type == text_type:
+            # Already split, keep as is
             res.append(node)
             continue
 
         text = node.text
-        links = extract_markdown_links(text)
-
-        if not links:
-            res.append(node)
-            continue
-
         last_index = 0
-        for link_text, link_url in links:
-            # Find where this link appears in the text
-            start = text.find(f"[{link_text}]({link_url})", last_index)
-            end = start + len(f"[{link_text}]({link_url})")
+        for match in pattern.finditer(text):
+            start, end = match.span()
 
-            # Add text before the link
+            # Add text before the match
             if start > last_index:
                 res.append(TextNode(text[last_index:start], TextType.TEXT))
 
-            # Add the link node
-            res.append(TextNode(link_text, TextType.LINK, link_url))
-
+            res.append(TextNode(match.group(1), text_type, match.group(2)))
             last_index = end
 
-        # Add remaining text after the last link
-        if last_index < len(text):
+        if last_index == 0:
+            res.append(node)
+        elif last_index < len(text):
+            # Add remaining text after the last match
             res.append(TextNode(text[last_index:], TextType.TEXT))
 
     return res
 
 
+def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, LINK_RE, TextType.LINK)
+
+
 def split_nodes_image(old_nodes):
-    res = []
-    for node in old_nodes:
-        if node.text_type == TextType.IMAGE:
-            # Already an image, keep as is
-            res.append(node)
-            continue
+    return _split_nodes_pattern(old_nodes, IMAGE_RE, TextType.IMAGE)
 
-        text = node.text
-        images = extract_markdown_images(text)
 
-        if not images:
-            res.append(node)
-            continue
+class InlineSyntax:
+    """
+    One inline markdown pass, run by text_to_textnodes().
 
-        last_index = 0
-        for alt_text, url in images:
-            # Find the exact position of this image in text
-            img_markdown = f"![{alt_text}]({url})"
-            match_start = text.find(img_markdown, last_index)
+    Args:
+        name: Unique name of the syntax. Extensions that set tag also use it
+            as the text type of the nodes they create.
+        triggers: Characters the syntax starts with. The pass is skipped for
+            text that contains none of them.
+        split: Function taking a list of TextNodes and returning a new list.
+        tag: HTML tag for the syntax's nodes (extensions only).
+    """
 
-            # Add preceding text if any
-            if match_start > last_index:
-                res.append(TextNode(text[last_index:match_start], TextType.TEXT))
+    def __init__(self, name, triggers, split, tag=None):
+        self.name = name
+        self.triggers = frozenset(triggers)
+        self.split = split
+        self.tag = tag
 
-            # Add the image node
-            res.append(TextNode(alt_text, TextType.IMAGE, url))
+    def __repr__(self):
+        return f"InlineSyntax({self.name!r})"
 
-            # Move last_index past this image
-            last_index = match_start + len(img_markdown)
 
-        # Add any remaining text after the last image
-        if last_index < len(text):
-            res.append(TextNode(text[last_index:], TextType.TEXT))
+def delimiter_syntax(name, delimiter, tag):
+    """An inline syntax for text wrapped in delimiter, e.g. ~~struck~~ -> <del>."""
+    return InlineSyntax(name, delimiter[0],
+                        lambda nodes: split_nodes_delimiter(nodes, delimiter, name), tag)
 
-    return res
 
+# Passes in the order they run: code first (highest precedence), then bold
+# (**text**), italic (_text_), images and finally links.
+INLINE_SYNTAXES = [
+    InlineSyntax("code", "`", lambda nodes: split_nodes_delimiter(nodes, "`", TextType.CODE)),
+    InlineSyntax("bold", "*", lambda nodes: split_nodes_delimiter(nodes, "**", TextType.BOLD)),
+    InlineSyntax("italic", "_", lambda nodes: split_nodes_delimiter(nodes, "_", TextType.ITALIC)),
+    InlineSyntax("image", "!", split_nodes_image),
+    InlineSyntax("link", "[", split_nodes_link),
+]
+
+# The passes text_to_spans() implements.
+BUILTIN_INLINE_SYNTAXES = tuple(INLINE_SYNTAXES)
+
+# Trigger character -> (position, syntax) of the passes it starts, in the
+# order they run, and a character class matching any trigger. Rebuilt
+# whenever a syntax is registered or removed.
+_INLINE_DISPATCH = {}
+_INLINE_TRIGGER_RE = None
+# Matches a trigger character of an extension syntax (None if there are
+# none), and whether every built-in pass is still registered;
+# text_to_spans() needs both.
+_EXTENSION_TRIGGER_RE = None
+_builtins_registered = True
+
+
+def _char_class(chars):
+    """A compiled pattern matching any one of chars, or None if there are none."""
+    if not chars:
+        return None
+    return re.compile("[" + "".join(re.escape(char) for char in sorted(chars)) + "]")
+
+
+def _build_inline_dispatch():
+    global _INLINE_TRIGGER_RE, _EXTENSION_TRIGGER_RE, _builtins_registered
+    _INLINE_DISPATCH.clear()
+    extension_triggers = set()
+    for position, syntax in enumerate(INLINE_SYNTAXES):
+        for char in syntax.triggers:
+            _INLINE_DISPATCH.setdefault(char, []).append((position, syntax))
+        if syntax not in BUILTIN_INLINE_SYNTAXES:
+            extension_triggers.update(syntax.triggers)
+    _INLINE_TRIGGER_RE = _char_class(_INLINE_DISPATCH)
+    _EXTENSION_TRIGGER_RE = _char_class(extension_triggers)
+    _builtins_registered = all(syntax in INLINE_SYNTAXES for syntax in BUILTIN_INLINE_SYNTAXES)
+
+
+_build_inline_dispatch()
+
+
+def register_inline_syntax(syntax, before=None):
+    """
+    Add an inline syntax.
+
+    Args:
+        syntax (InlineSyntax): The syntax to add.
+        before (str): Name of the pass to run it before; it runs last if omitted.
+    """
+    names = [registered.name for registered in INLINE_SYNTAXES]
+    if syntax.name in names:
+        raise ValueError(f"Inline syntax already registered: {syntax.name}")
+    index = names.index(before) if before is not None else len(names)
+    if syntax.tag is not None:
+        EXTENSION_TAGS[syntax.name] = syntax.tag
+    INLINE_SYNTAXES.insert(index, syntax)
+    _build_inline_dispatch()
+
+
+def unregister_inline_syntax(name):
+    """Remove the inline syntax with the given name."""
+    for index, syntax in enumerate(INLINE_SYNTAXES):
+        if syntax.name == name:
+            del INLINE_SYNTAXES[index]
+            EXTENSION_TAGS.pop(name, None)
+            _build_inline_dispatch()
+            return
+    raise ValueError(f"Inline syntax not registered: {name}")
 
 
 def text_to_textnodes(text):
+    """
+    Parse inline markdown into a list of TextNodes.
+
+    Runs each registered pass (see INLINE_SYNTAXES) once, each linear in the
+    length of the text, so parsing is O(n) in the worst case. Only the
+    passes registered for trigger characters that occur in the text are
+    looked up and run, in registration order, so the cost of a text does
+    not grow with the number of syntaxes it doesn't use.
+    """
+    if not text:
+        return []
+
     # Start with the whole text as a single TEXT node
     nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Split by code blocks first (highest precedence)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
-    # Then split by bold (**text**)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    
-    # Then split by italic (_text_)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    
-    # Then split by images
-    nodes = split_nodes_image(nodes)
-    
-    # Finally split by links
-    nodes = split_nodes_link(nodes)
-    
+    if _INLINE_TRIGGER_RE is None:
+        return nodes
+    chars = set(_INLINE_TRIGGER_RE.findall(text))
+    if not chars:
+        return nodes
+    if len(chars) == 1:
+        passes = _INLINE_DISPATCH[next(iter(chars))]
+    else:
+        passes = sorted({entry for char in chars for entry in _INLINE_DISPATCH[char]},
+                        key=lambda entry: entry[0])
+    for _, syntax in passes:
+        nodes = syntax.split(nodes)
     return nodes
 
+
+def _split_spans_delimiter(text, spans, delimiter, text_type):
+    """split_nodes_delimiter() on spans of text."""
+    new_spans = []
+    size = len(delimiter)
+    for span in spans:
+        if span[0] is not TextType.TEXT:
+            new_spans.append(span)
+            continue
+        _, start, end, _ = span
+        inside = False
+        found = text.find(delimiter, start, end)
+        while found != -1:
+            if found > start:
+                new_spans.append((text_type if inside else TextType.TEXT, start, found, None))
+            inside = not inside
+            start = found + size
+            found = text.find(delimiter, start, end)
+        if inside:
+            raise ValueError("invalid markdown, formatted section not closed")
+        if end > start:
+            new_spans.append((TextType.TEXT, start, end, None))
+    return new_spans
+
+
+def _split_spans_pattern(text, spans, pattern, text_type):
+    """_split_nodes_pattern() on spans of text."""
+    new_spans = []
+    for span in spans:
+        if span[0] is text_type:
+            new_spans.append(span)
+            continue
+        _, start, end, _ = span
+        last_index = start
+        for match in pattern.finditer(text, start, end):
+            if match.start() > last_index:
+                new_spans.append((TextType.TEXT, last_index, match.start(), None))
+            new_spans.append((text_type, match.start(1), match.end(1), match.group(2)))
+            last_index = match.end()
+        if last_index == start:
+            new_spans.append(span)
+        elif last_index < end:
+            new_spans.append((TextType.TEXT, last_index, end, None))
+    return new_spans
+
+
+def text_to_spans(text):
+    """
+    Parse inline markdown into (text type, start, end, url) tuples.
+
+    Gives the same nodes as text_to_textnodes(), each as the slice
+    text[start:end] instead of a TextNode holding a copy of it, so a
+    document can be built from the match positions alone. Only the
+    built-in syntaxes are implemented.
+
+    Returns:
+        list: The spans, or None if the text contains a trigger character
+            of an extension syntax or a built-in syntax was removed (use
+            text_to_textnodes() then).
+    """
+    if not _builtins_registered:
+        return None
+    if _EXTENSION_TRIGGER_RE is not None and _EXTENSION_TRIGGER_RE.search(text):
+        return None
+    if not text:
+        return []
+
+    spans = [(TextType.TEXT, 0, len(text), None)]
+    if "`" in text:
+        spans = _split_spans_delimiter(text, spans, "`", TextType.CODE)
+    if "**" in text:
+        spans = _split_spans_delimiter(text, spans, "**", TextType.BOLD)
+    if "_" in text:
+        spans = _split_spans_delimiter(text, spans, "_", TextType.ITALIC)
+    if "![" in text:
+        spans = _split_spans_pattern(text, spans, IMAGE_RE, TextType.IMAGE)
+    if "[" in text:
+        spans = _split_spans_pattern(text, spans, LINK_RE, TextType.LINK)
+    return spans
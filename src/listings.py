@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+
+from src.htmlnode import LeafNode, ParentNode
+from src.output import as_output
+from src.targets import BuildTarget, rewrite_html_node_urls
+from src.template import fill_template
+
+POSTS_PER_PAGE = 10
+FEED_ENTRIES = 20
+
+
+class Page:
+    """Metadata for one generated page, collected while it is rendered."""
+
+    def __init__(self, source, url, title, date=None, tags=None, source_hash=None):
+        self.source = source
+        self.url = url
+        self.title = title
+        self.date = date
+        self.tags = tags or []
+        self.source_hash = source_hash
+
+    def key(self):
+        """The fields that listings depend on, in a stable order."""
+        return (self.url, self.title, self.date, tuple(self.tags))
+
+    def __repr__(self):
+        return f"Page({self.url}, {self.title}, {self.date}, {self.tags})"
+
+
+def page_url(relative_path):
+    """
+    Map a content-relative markdown path to the URL it is served at.
+
+    "blog/tom/index.md" -> "/blog/tom/", "about.md" -> "/about.html".
+    """
+    relative_path = relative_path.replace(os.sep, "/")
+    if relative_path == "index.md":
+        return "/"
+    if relative_path.endswith("/index.md"):
+        return "/" + relative_path[:-len("index.md")]
+    return "/" + relative_path[:-len(".md")] + ".html"
+
+
+def tag_slug(tag):
+    """Turn a tag into a URL-safe path segment."""
+    slug = "".join(c if c.isalnum() else "-" for c in tag.lower())
+    return "-".join(part for part in slug.split("-") if part)
+
+
+def section_posts(pages, section):
+    """Return the pages below /<section>/ (excluding its index), newest first."""
+    prefix = f"/{section}/"
+    posts = [page for page in pages if page.url.startswith(prefix) and page.url != prefix]
+    # Undated posts sort last, ties are broken by URL for a stable order.
+    posts.sort(key=lambda page: page.url)
+    posts.sort(key=lambda page: page.date or "", reverse=True)
+    return posts
+
+
+def paginate(items, per_page):
+    """Split items into pages of at most per_page items (always at least one page)."""
+    return [items[i:i + per_page] for i in range(0, len(items), per_page)] or [[]]
+
+
+def listing_page_path(base_dir, number):
+    """Output path (relative to the site root) of page `number` of a listing."""
+    if number == 1:
+        return f"{base_dir}/index.html"
+    return f"{base_dir}/page/{number}/index.html"
+
+
+def listing_page_url(base_dir, number):
+    return "/" + listing_page_path(base_dir, number)[:-len("index.html")]
+
+
+def listing_to_html_node(title, posts, base_dir, number, total):
+    """
+    Build the body of one listing page.
+
+    Args:
+        title (str): Heading for the listing.
+        posts (list): Pages shown on this page.
+        base_dir (str): Site-relative directory of the listing (e.g. "blog").
+        number (int): 1-based page number.
+        total (int): Number of pages in the listing.
+
+    Returns:
+        ParentNode: A div containing the heading, post list and pager.
+    """
+    items = []
+    for post in posts:
+        children = [LeafNode("a", post.title, {"href": post.url})]
+        if post.date:
+            children.append(LeafNode(None, f" ({post.date})"))
+        items.append(ParentNode("li", children))
+    children = [LeafNode("h1", title)]
+    if items:
+        children.append(ParentNode("ul", items))
+    pager = []
+    if number > 1:
+        pager.append(LeafNode("a", "Newer posts", {"href": listing_page_url(base_dir, number - 1)}))
+    if number < total:
+        if pager:
+            pager.append(LeafNode(None, " "))
+        pager.append(LeafNode("a", "Older posts", {"href": listing_page_url(base_dir, number + 1)}))
+    if pager:
+        children.append(ParentNode("p", pager))
+    return ParentNode("div", children)
+
+
+def atom_timestamp(date):
+    """Format a front matter date (YYYY-MM-DD or full timestamp) for Atom."""
+    if not date:
+        return "1970-01-01T00:00:00Z"
+    if "T" in date:
+        return date
+    return f"{date}T00:00:00Z"
+
+
+def xml_escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def atom_feed(title, site_url, feed_path, posts, author=None, rewrite_url=None):
+    """
+    Render an Atom feed for the given posts (already sorted newest first).
+
+    Args:
+        title (str): Feed title.
+        site_url (str): Absolute site URL without trailing slash (may be empty).
+        feed_path (str): Site-relative URL of the feed itself.
+        posts (list): Pages to include.
+        author (str): Name of the feed's author; defaults to the title.
+        rewrite_url (callable): Maps site-relative URLs to the target's
+            (e.g. adds its basepath) when there is no site URL.
+
+    Returns:
+        str: The feed XML.
+    """
+    def feed_url(url):
+        if site_url or rewrite_url is None:
+            return xml_escape(site_url + url)
+        return xml_escape(rewrite_url(url))
+
+    updated = atom_timestamp(posts[0].date if posts else None)
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{xml_escape(title)}</title>",
+        f'  <link href="{feed_url(feed_path)}" rel="self"/>',
+        f'  <link href="{feed_url("/")}"/>',
+        f"  <id>{feed_url(feed_path)}</id>",
+        f"  <updated>{updated}</updated>",
+        f"  <author><name>{xml_escape(author or title)}</name></author>",
+    ]
+    for post in posts:
+        url = feed_url(post.url)
+        lines.extend([
+            "  <entry>",
+            f"    <title>{xml_escape(post.title)}</title>",
+            f'    <link href="{url}"/>',
+            f"    <id>{url}</id>",
+            f"    <updated>{atom_timestamp(post.date)}</updated>",
+        ])
+        for tag in post.tags:
+            lines.append(f'    <category term="{xml_escape(tag)}"/>')
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def generate_listings(pages, template, output_dir, basepath="/", site_url="",
+                      section="blog", cache_path=None, per_page=POSTS_PER_PAGE,
+                      target=None, critical=None, author=None):
+    """
+    Generate the paginated section index, per-tag pages and the Atom feed.
+
+    A section with its own index page (content/<section>/index.md) keeps
+    it, and only the later listing pages (/<section>/page/2/ on) are
+    generated. Any other listing that would land on a rendered page's URL,
+    and tags whose slugs are the same (e.g. "C++" and "c"), are reported
+    rather than overwritten.
+
+    Each listing file is keyed by a signature of everything it depends on
+    (its posts' metadata, position, template, and the target's settings and
+    asset map, which its URLs are rewritten with). Files whose
+    signature matches the previous build are written from the cache instead
+    of being rendered again, so editing one post only re-renders the
+    listings that actually show it.
+
+    Args:
+        pages (list): Page objects collected while rendering the site.
+        template (str): Page template text.
+        output_dir (str): Output directory of the site, or an output from
+            src.output.
+        basepath (str): Base path for the site.
+        site_url (str): Absolute site URL used in the feed. Without one, the
+            feed links to URLs rewritten for the target, like the pages.
+        section (str): Content directory whose pages are posts.
+        cache_path (str): JSON file holding rendered listings, or None.
+        per_page (int): Posts per listing page.
+        target (BuildTarget): Target whose URL rewriting applies; built from
+            output_dir and basepath when omitted.
+        critical (CriticalCss): Inlines each listing page's critical CSS, if
+            given, as for content pages.
+        author (str): Author named in the feed; defaults to the feed title.
+
+    Returns:
+        tuple: (list of written site-relative paths, number re-rendered).
+
+    Raises:
+        ValueError: If a listing would replace a page, or two tags share a slug.
+    """
+    if target is None:
+        target = BuildTarget(output_dir, basepath)
+    output = as_output(output_dir)
+    template = target.template(template)
+    posts = section_posts(pages, section)
+    site_url = site_url.rstrip("/")
+    cache = _load_cache(cache_path) if cache_path else {}
+    new_cache = {}
+    written = []
+    rendered = 0
+
+    # (output path, signature inputs, render function)
+    jobs = []
+
+    def add_listing(base_dir, title, items):
+        chunks = paginate(items, per_page)
+        for number, chunk in enumerate(chunks, start=1):
+            inputs = (title, number, len(chunks), [post.key() for post in chunk])
+            def render(chunk=chunk, number=number, total=len(chunks)):
+                node = listing_to_html_node(title, chunk, base_dir, number, total)
+                rewrite_html_node_urls(node, target.rewrite_url)
+                page_template = template
+                if critical is not None:
+                    from src.flatdoc import FlatDocument
+
+                    document = FlatDocument()
+                    document.append_html_node(node)
+                    page_template = critical.apply(template, document.finish(),
+                                                   target.rewrite_url)
+                return fill_template(page_template, title, node.to_html())
+            jobs.append((listing_page_path(base_dir, number), inputs, render))
+
+    add_listing(section, section.capitalize(), posts)
+
+    tags = {}
+    for post in posts:
+        for tag in post.tags:
+            tags.setdefault(tag, []).append(post)
+    slugs = {}
+    for tag in sorted(tags):
+        slug = tag_slug(tag)
+        if not slug:
+            raise ValueError(f"Tag {tag!r} has no characters usable in a URL")
+        if slug in slugs:
+            raise ValueError(f"Tags {slugs[slug]!r} and {tag!r} would both be listed at /tags/{slug}/")
+        slugs[slug] = tag
+        add_listing(f"tags/{slug}", f"Posts tagged \"{tag}\"", tags[tag])
+
+    feed_path = f"/{section}/atom.xml"
+    feed_posts = posts[:FEED_ENTRIES]
+    jobs.append((
+        feed_path[1:],
+        ("feed", site_url, author, [post.key() for post in feed_posts]),
+        lambda: atom_feed(section.capitalize(), site_url, feed_path, feed_posts, author,
+                          target.rewrite_url),
+    ))
+
+    # Everything rendered depends on how the target rewrites URLs
+    settings = (template, critical.digest if critical else None, target.settings(),
+                sorted(target.assets.items()))
+    settings_digest = hashlib.sha1(repr(settings).encode("utf-8")).hexdigest()
+
+    page_urls = {page.url for page in pages}
+    for path, inputs, render in jobs:
+        url = "/" + (path[:-len("index.html")] if path.endswith("index.html") else path)
+        if url in page_urls:
+            if path == listing_page_path(section, 1):
+                print(f"Keeping {url} from its own index page instead of the generated listing")
+                continue
+            raise ValueError(f"Generated listing {url} would replace the page rendered there")
+        signature = hashlib.sha1(repr((settings_digest, inputs)).encode("utf-8")).hexdigest()
+        cached = cache.get(path)
+        if cached and cached[0] == signature:
+            content = cached[1]
+        else:
+            content = render()
+            rendered += 1
+        new_cache[path] = [signature, content]
+
+        output.write_text(path, content)
+        written.append(path)
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(cache_path, "w") as cache_file:
+            json.dump(new_cache, cache_file)
+    return written, rendered
@@ -0,0 +1,189 @@
+import contextlib
+import tracemalloc
+
+from src.flatdoc import FlatDocument
+from src.htmlnode import LeafNode, ParentNode
+from src.textnode import TextNode
+
+# Node classes whose constructions are counted while profiling.
+COUNTED_CLASSES = (TextNode, LeafNode, ParentNode)
+
+# While a page is parsed, its memory is checked against the limit each time
+# this many more nodes have been created.
+MEMORY_CHECK_INTERVAL = 1000
+
+
+class MemoryBudgetError(Exception):
+    """A page went over a per-page memory or node limit."""
+
+    def __init__(self, source, message):
+        super().__init__(f"{source}: {message}")
+        self.source = source
+
+
+class PageMemory:
+    """
+    Memory use of one page.
+
+    peak_bytes is the peak memory allocated while the page was parsed and
+    rendered, over what was allocated when it started. node_counts maps a
+    node class name (plus "document" for FlatDocument nodes) to the number
+    created for the page; nodes is their total, which the node limit applies to.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.peak_bytes = 0
+        self.node_counts = {}
+        self._baseline = 0
+
+    @property
+    def nodes(self):
+        return sum(self.node_counts.values())
+
+    def __repr__(self):
+        return f"PageMemory({self.source!r}, {self.peak_bytes}, {self.node_counts})"
+
+
+def format_bytes(size):
+    """1536 -> "1.5 KiB"."""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+
+
+class MemoryProfiler:
+    """
+    Records the peak memory and node counts of each page, and enforces limits.
+
+    Use as a context manager around a build: while active it traces
+    allocations with tracemalloc and counts TextNode, LeafNode and
+    ParentNode constructions and FlatDocument nodes by wrapping their
+    __init__ and FlatDocument.add_node, which are restored on exit. Wrap
+    each page in measure().
+
+    The node limit is checked as nodes are created, so a runaway page fails
+    as soon as it crosses it. The memory limit is checked every
+    MEMORY_CHECK_INTERVAL nodes and when the page is done; memory taken by
+    a single block (such as one huge code block) is only seen once the
+    block has been added.
+
+    Args:
+        max_page_bytes (int): Peak memory allowed per page, or None.
+        max_page_nodes (int): Nodes allowed per page, or None.
+    """
+
+    def __init__(self, max_page_bytes=None, max_page_nodes=None):
+        self.max_page_bytes = max_page_bytes
+        self.max_page_nodes = max_page_nodes
+        self.pages = []
+        self._current = None
+        self._saved_inits = {}
+        self._started_tracing = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        for cls in COUNTED_CLASSES:
+            self._saved_inits[cls] = cls.__dict__.get("__init__")
+            cls.__init__ = self._counting_init(cls, cls.__init__)
+        FlatDocument.add_node = self._counting_add_node(FlatDocument.add_node)
+        return self
+
+    def __exit__(self, *exc_info):
+        for cls, init in self._saved_inits.items():
+            if init is None:
+                del cls.__init__
+            else:
+                cls.__init__ = init
+        self._saved_inits = {}
+        FlatDocument.add_node = FlatDocument.add_node.__wrapped__
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def _counting_init(self, cls, init):
+        name = cls.__name__
+        profiler = self
+
+        def __init__(node, *args, **kwargs):
+            page = profiler._current
+            if page is not None and type(node) is cls:
+                page.node_counts[name] = page.node_counts.get(name, 0) + 1
+                profiler._check_nodes(page)
+            init(node, *args, **kwargs)
+
+        return __init__
+
+    def _counting_add_node(self, add_node):
+        profiler = self
+
+        def counting_add_node(document, *args, **kwargs):
+            page = profiler._current
+            if page is not None:
+                page.node_counts["document"] = page.node_counts.get("document", 0) + 1
+                profiler._check_nodes(page)
+            return add_node(document, *args, **kwargs)
+
+        counting_add_node.__wrapped__ = add_node
+        return counting_add_node
+
+    def _check_nodes(self, page):
+        nodes = page.nodes
+        if self.max_page_nodes is not None and nodes > self.max_page_nodes:
+            raise MemoryBudgetError(
+                page.source, f"created more than the limit of {self.max_page_nodes} nodes"
+            )
+        if self.max_page_bytes is not None and nodes % MEMORY_CHECK_INTERVAL == 0:
+            self._check_memory(page, tracemalloc.get_traced_memory()[1] - page._baseline)
+
+    def _check_memory(self, page, peak_bytes):
+        if peak_bytes > self.max_page_bytes:
+            raise MemoryBudgetError(
+                page.source, f"peak memory {format_bytes(peak_bytes)} exceeds "
+                             f"the limit of {format_bytes(self.max_page_bytes)}"
+            )
+
+    @contextlib.contextmanager
+    def measure(self, source):
+        """
+        Measure one page. Yields its PageMemory.
+
+        Raises:
+            MemoryBudgetError: If the page goes over a limit.
+        """
+        page = PageMemory(source)
+        tracemalloc.reset_peak()
+        page._baseline = tracemalloc.get_traced_memory()[0]
+        previous, self._current = self._current, page
+        try:
+            yield page
+        finally:
+            self._current = previous
+            page.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - page._baseline)
+            self.pages.append(page)
+        if self.max_page_bytes is not None:
+            self._check_memory(page, page.peak_bytes)
+
+    def add_document(self, page, document):
+        """Count the nodes of a page's FlatDocument."""
+        page.node_counts["document"] = len(document)
+        self._check_nodes(page)
+
+    def worst(self, count=10):
+        """The pages with the highest peak memory, highest first."""
+        return sorted(self.pages, key=lambda page: page.peak_bytes, reverse=True)[:count]
+
+    def report(self, count=10):
+        """A text table of the worst pages."""
+        lines = [f"Peak memory per page (worst {min(count, len(self.pages))} "
+                 f"of {len(self.pages)}):"]
+        for page in self.worst(count):
+            counts = ", ".join(f"{name} {number}" for name, number in sorted(page.node_counts.items()))
+            lines.append(f"  {format_bytes(page.peak_bytes):>10}  {page.source}  ({counts})")
+        return "\n".join(lines)
@@ -0,0 +1,289 @@
+import contextlib
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+# Archive suffix -> tarfile compression ("" for an uncompressed tar), or "zip".
+ARCHIVE_FORMATS = {
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tar.xz": "xz",
+    ".zip": "zip",
+}
+
+# Earliest timestamp a zip entry can hold (1980-01-01).
+ZIP_EPOCH = 315532800
+
+
+def archive_format(path):
+    """Return the archive format for path, or None if it is a directory path."""
+    for suffix, compression in ARCHIVE_FORMATS.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+
+def source_date_epoch():
+    """Timestamp stored in archives: $SOURCE_DATE_EPOCH, or 0 for reproducibility."""
+    try:
+        return int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    except ValueError:
+        return 0
+
+
+class DirectoryOutput:
+    """Writes the built site as files below a directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, relative_path):
+        """Local path of a site-relative path, creating its parent directories."""
+        path = os.path.join(self.root, *relative_path.split("/"))
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        return path
+
+    def reset(self):
+        """Delete the directory's previous contents and recreate it."""
+        if os.path.exists(self.root):
+            print(f"Deleting existing directory: {self.root}")
+            shutil.rmtree(self.root)
+        print(f"Creating directory: {self.root}")
+        os.makedirs(self.root)
+
+    def write_text(self, relative_path, text):
+        self.write_bytes(relative_path, text.encode("utf-8"))
+
+    def write_bytes(self, relative_path, data):
+        path = self.path(relative_path)
+        with open(path, "wb") as output_file:
+            output_file.write(data)
+
+    def copy_file(self, relative_path, source_path):
+        path = self.path(relative_path)
+        shutil.copy(source_path, path)
+
+    @contextlib.contextmanager
+    def open_text(self, relative_path):
+        """Open a text file for incremental writing."""
+        path = self.path(relative_path)
+        with open(path, "w", encoding="utf-8") as output_file:
+            yield output_file
+
+    def close(self):
+        pass
+
+    def exists(self):
+        return os.path.isdir(self.root)
+
+
+class ArchiveOutput:
+    """
+    Streams the built site straight into a tar or zip archive.
+
+    Entries are added in the order the build produces them (which is
+    sorted and stable) with a fixed timestamp, owner and mode, so building
+    the same sources twice yields byte-identical archives. Gzip headers get
+    the same fixed timestamp.
+
+    Each path can be written only once: an archive with two members of the
+    same name would extract differently depending on the tool, so a second
+    write raises ValueError instead.
+    """
+
+    def __init__(self, path):
+        self.root = path
+        self.format = archive_format(path)
+        if self.format is None:
+            raise ValueError(f"Not an archive path: {path}")
+        self.mtime = source_date_epoch()
+        self._file = None
+        self._gzip = None
+        self._archive = None
+        self._names = set()
+
+    def reset(self):
+        """Start a new, empty archive (replacing any previous one)."""
+        self.close()
+        self._names = set()
+        os.makedirs(os.path.dirname(self.root) or ".", exist_ok=True)
+        print(f"Creating archive: {self.root}")
+        if self.format == "zip":
+            self._archive = zipfile.ZipFile(self.root, "w", zipfile.ZIP_DEFLATED)
+            return
+        self._file = open(self.root, "wb")
+        if self.format == "gz":
+            import gzip
+
+            self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._file,
+                                       mtime=self.mtime)
+            self._archive = tarfile.open(fileobj=self._gzip, mode="w")
+        else:
+            self._archive = tarfile.open(fileobj=self._file, mode=f"w:{self.format}"
+                                         if self.format else "w")
+
+    def _start_entry(self, relative_path):
+        if self._archive is None:
+            self.reset()
+        if relative_path in self._names:
+            raise ValueError(f"Duplicate archive entry: {relative_path}")
+        self._names.add(relative_path)
+
+    def _tar_info(self, relative_path, size):
+        info = tarfile.TarInfo(relative_path)
+        info.size = size
+        info.mtime = self.mtime
+        info.mode = 0o644
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def _zip_info(self, relative_path):
+        import time
+
+        info = zipfile.ZipInfo(relative_path, time.gmtime(max(self.mtime, ZIP_EPOCH))[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        return info
+
+    def write_text(self, relative_path, text):
+        self.write_bytes(relative_path, text.encode("utf-8"))
+
+    def write_bytes(self, relative_path, data):
+        self._start_entry(relative_path)
+        if self.format == "zip":
+            self._archive.writestr(self._zip_info(relative_path), data)
+        else:
+            self._archive.addfile(self._tar_info(relative_path, len(data)), io.BytesIO(data))
+
+    def copy_file(self, relative_path, source_path):
+        self._start_entry(relative_path)
+        with open(source_path, "rb") as source:
+            if self.format == "zip":
+                with self._archive.open(self._zip_info(relative_path), "w") as entry:
+                    shutil.copyfileobj(source, entry)
+            else:
+                size = os.fstat(source.fileno()).st_size
+                self._archive.addfile(self._tar_info(relative_path, size), source)
+
+    @contextlib.contextmanager
+    def open_text(self, relative_path):
+        """
+        Open an archive entry for incremental writing.
+
+        Tar entries need their size up front, so the text is spooled (in
+        memory, then on disk past a few MB) and added when the block exits.
+        """
+        self._start_entry(relative_path)
+        with tempfile.SpooledTemporaryFile(max_size=8 << 20) as spool:
+            writer = io.TextIOWrapper(spool, encoding="utf-8")
+            yield writer
+            writer.flush()
+            size = spool.tell()
+            spool.seek(0)
+            if self.format == "zip":
+                with self._archive.open(self._zip_info(relative_path), "w") as entry:
+                    shutil.copyfileobj(spool, entry)
+            else:
+                self._archive.addfile(self._tar_info(relative_path, size), spool)
+            writer.detach()
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def exists(self):
+        return os.path.isfile(self.root)
+
+
+class MemoryFile:
+    """A file held by MemoryOutput, with its response headers precomputed."""
+
+    __slots__ = ("body", "etag", "content_type")
+
+    def __init__(self, body, etag, content_type):
+        self.body = body
+        self.etag = etag
+        self.content_type = content_type
+
+    @property
+    def content_length(self):
+        return len(self.body)
+
+
+class MemoryOutput:
+    """
+    Keeps the built site in memory, for serving without touching the disk.
+
+    Each file's ETag (a hash of its content) and content type are computed
+    once when it is written, so serving a request is a dict lookup.
+    """
+
+    def __init__(self, name="memory"):
+        self.root = f"<{name}>"
+        self.files = {}
+
+    def reset(self):
+        self.files = {}
+
+    def write_text(self, relative_path, text):
+        self.write_bytes(relative_path, text.encode("utf-8"))
+
+    def write_bytes(self, relative_path, data):
+        import hashlib
+        import mimetypes
+
+        content_type = mimetypes.guess_type(relative_path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith("xml"):
+            content_type += "; charset=utf-8"
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        self.files[relative_path] = MemoryFile(data, etag, content_type)
+
+    def copy_file(self, relative_path, source_path):
+        with open(source_path, "rb") as source:
+            self.write_bytes(relative_path, source.read())
+
+    @contextlib.contextmanager
+    def open_text(self, relative_path):
+        """Open a file for incremental writing; it is stored when the block exits."""
+        buffer = io.StringIO()
+        yield buffer
+        self.write_text(relative_path, buffer.getvalue())
+
+    def get(self, relative_path):
+        """Return the MemoryFile at a site-relative path, or None."""
+        return self.files.get(relative_path)
+
+    def close(self):
+        pass
+
+    def exists(self):
+        return bool(self.files)
+
+
+def open_output(path):
+    """Return the output backend for path: an archive if it has an archive suffix."""
+    if archive_format(path) is not None:
+        return ArchiveOutput(path)
+    return DirectoryOutput(path)
+
+
+def as_output(output):
+    """Accept either an output backend or a directory path."""
+    if isinstance(output, str):
+        return DirectoryOutput(output)
+    return output
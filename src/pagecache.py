@@ -0,0 +1,38 @@
+import os
+
+
+class ParseCache:
+    """
+    Parsed pages kept in memory between builds, keyed by source path.
+
+    An entry is reused while the file's size and modification time are
+    unchanged, so a long-running process (see src.daemon) only re-parses
+    the files that were edited.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, load):
+        """
+        Return the cached value for path, calling load() to (re)build it.
+
+        Args:
+            path (str): Source file the value is derived from.
+            load (callable): Builds the value from the file's current content.
+        """
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = load()
+        self.entries[path] = (key, value)
+        return value
+
+    def __len__(self):
+        return len(self.entries)
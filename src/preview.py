@@ -0,0 +1,109 @@
+import posixpath
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+
+def resolve_path(output, url_path, basepath="/"):
+    """
+    Map a request path to a file of a MemoryOutput.
+
+    Args:
+        output (MemoryOutput): The built site.
+        url_path (str): Path of the request, without query string.
+        basepath (str): Base path the site was built for.
+
+    Returns:
+        tuple: (MemoryFile or None, redirect location or None). Directories
+        are served from their index.html, and requested without a trailing
+        slash they redirect to it, as http.server does.
+    """
+    path = unquote(url_path)
+    if not path.startswith(basepath):
+        return None, None
+    relative_path = posixpath.normpath(path[len(basepath):]) if path != basepath else ""
+    if relative_path in (".", ""):
+        relative_path = ""
+    elif relative_path.startswith(".."):
+        return None, None
+    if path.endswith("/"):
+        index = f"{relative_path}/index.html" if relative_path else "index.html"
+        return output.get(index), None
+    found = output.get(relative_path)
+    if found is None and output.get(f"{relative_path}/index.html") is not None:
+        return None, url_path + "/"
+    return found, None
+
+
+def etag_matches(header, etag):
+    """Check an If-None-Match header value against an ETag."""
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    """Serves GET and HEAD requests from the server's MemoryOutput."""
+
+    server_version = "SSGPreview"
+
+    def do_GET(self):
+        self.send_file(head=False)
+
+    def do_HEAD(self):
+        self.send_file(head=True)
+
+    def send_file(self, head):
+        url_path = urlsplit(self.path).path
+        found, redirect = resolve_path(self.server.output, url_path, self.server.basepath)
+        if redirect is not None:
+            self.send_response(301)
+            self.send_header("Location", redirect)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if found is None:
+            self.send_error(404, "File not found")
+            return
+
+        if etag_matches(self.headers.get("If-None-Match", ""), found.etag):
+            self.send_response(304)
+            self.send_header("ETag", found.etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", found.content_type)
+        self.send_header("Content-Length", str(found.content_length))
+        self.send_header("ETag", found.etag)
+        # Previews change with every push, so always revalidate
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if not head:
+            self.wfile.write(found.body)
+
+
+class PreviewServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server for a site held in a MemoryOutput.
+
+    Each request is answered from memory in its own thread; nothing is read
+    from disk.
+    """
+
+    def __init__(self, address, output, basepath="/"):
+        self.output = output
+        self.basepath = basepath
+        super().__init__(address, PreviewHandler)
+
+
+def serve(output, port, host="127.0.0.1", basepath="/"):
+    """Serve a MemoryOutput over HTTP until interrupted."""
+    with PreviewServer((host, port), output, basepath) as server:
+        print(f"Serving {len(output.files)} files at http://{host}:{server.server_port}{basepath}")
+        server.serve_forever()
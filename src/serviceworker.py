@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "precache-manifest.json"
+SERVICE_WORKER_FILE = "sw.js"
+REGISTER_FILE = "sw-register.js"
+
+# Files up to this size are downloaded when the service worker installs;
+# larger ones are cached the first time they are requested.
+CRITICAL_MAX_BYTES = 100 * 1024
+
+# Characters of a file's content hash used as its precache revision.
+REVISION_LENGTH = 16
+
+# Added to the template so every page registers the service worker. Its
+# src is rewritten per target like any other template URL.
+REGISTER_TAG = f'<script src="/{REGISTER_FILE}" defer></script>'
+
+REGISTER_SCRIPT = """\
+if ("serviceWorker" in navigator) {
+  navigator.serviceWorker.register("%(base)s%(sw)s", {scope: "%(base)s"});
+}
+"""
+
+# Each deploy gets its own cache, named after the manifest version. On
+# install, unchanged critical files are copied over from the previous
+# version's cache and only changed ones are downloaded; on activate,
+# unchanged lazy files are copied too, and old caches are deleted.
+SERVICE_WORKER_SCRIPT = """\
+const VERSION = "%(version)s";
+const MANIFEST_URL = "%(base)s%(manifest)s?v=" + VERSION;
+const PREFIX = "ssg-precache-";
+const CACHE = PREFIX + VERSION;
+const META = "ssg-precache-meta";
+
+let manifest = null;
+let lazyUrls = null;
+
+function loadManifest() {
+  if (!manifest) {
+    manifest = fetch(MANIFEST_URL).then((response) => response.json());
+  }
+  return manifest;
+}
+
+async function previous() {
+  // Revisions and cache of the version being replaced, if any
+  const response = await (await caches.open(META)).match("manifest");
+  if (!response) {
+    return {revisions: {}, cache: null};
+  }
+  const old = await response.json();
+  const revisions = {};
+  for (const entry of old.critical.concat(old.lazy)) {
+    revisions[entry.url] = entry.revision;
+  }
+  return {revisions, cache: await caches.open(PREFIX + old.version)};
+}
+
+async function reuse(entries, old, cache, download) {
+  await Promise.all(entries.map(async (entry) => {
+    if (old.cache && old.revisions[entry.url] === entry.revision) {
+      const response = await old.cache.match(entry.url);
+      if (response) {
+        return cache.put(entry.url, response);
+      }
+    }
+    if (download) {
+      await cache.add(new Request(entry.url, {cache: "no-cache"}));
+    }
+  }));
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil((async () => {
+    const [current, old] = await Promise.all([loadManifest(), previous()]);
+    await reuse(current.critical, old, await caches.open(CACHE), true);
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    const [current, old] = await Promise.all([loadManifest(), previous()]);
+    // Changed lazy files are downloaded again on first use
+    await reuse(current.lazy, old, await caches.open(CACHE), false);
+    for (const name of await caches.keys()) {
+      if (name.startsWith(PREFIX) && name !== CACHE) {
+        await caches.delete(name);
+      }
+    }
+    await (await caches.open(META)).put("manifest", new Response(JSON.stringify(current)));
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin) {
+    return;
+  }
+  event.respondWith((async () => {
+    const cache = await caches.open(CACHE);
+    const cached = await cache.match(request);
+    if (cached) {
+      return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+      if (!lazyUrls) {
+        const current = await loadManifest();
+        lazyUrls = new Set(current.lazy.map((entry) => entry.url));
+      }
+      if (lazyUrls.has(url.pathname)) {
+        await cache.put(request, response.clone());
+      }
+    }
+    return response;
+  })());
+});
+"""
+
+
+def add_registration(template):
+    """Add the service worker registration script to a page template."""
+    end = template.rfind("</body>")
+    if end == -1:
+        return template + REGISTER_TAG
+    return f"{template[:end]}  {REGISTER_TAG}\n  {template[end:]}"
+
+
+def page_url(relative_path):
+    """"blog/index.html" -> "blog/" (the URL the page is requested at)."""
+    if relative_path == "index.html":
+        return ""
+    if relative_path.endswith("/index.html"):
+        return relative_path[:-len("index.html")]
+    return relative_path
+
+
+class PrecacheRecorder:
+    """
+    Wraps an output and records the pages and static files written to it.
+
+    Pages are hashed from the HTML already in memory as they are written.
+    Copied static files take their hash from source_digests (the digests
+    the asset manifest computed, keyed by source path), so no output is
+    read back.
+
+    entries maps each site-relative path to (size, sha256 hex digest).
+    Paths in unrecorded (e.g. the original names of fingerprinted assets)
+    are written but not precached.
+    """
+
+    def __init__(self, output, source_digests, unrecorded=()):
+        self.output = output
+        self.root = output.root
+        self.source_digests = source_digests
+        self.unrecorded = set(unrecorded)
+        self.entries = {}
+
+    def reset(self):
+        self.entries = {}
+        self.output.reset()
+
+    def _record(self, relative_path, data):
+        if relative_path.endswith(".html"):
+            self.entries[relative_path] = (len(data), hashlib.sha256(data).hexdigest())
+
+    def write_text(self, relative_path, text):
+        self.write_bytes(relative_path, text.encode("utf-8"))
+
+    def write_bytes(self, relative_path, data):
+        self._record(relative_path, data)
+        self.output.write_bytes(relative_path, data)
+
+    def copy_file(self, relative_path, source_path):
+        if relative_path not in self.unrecorded:
+            self.entries[relative_path] = (os.stat(source_path).st_size,
+                                           self.source_digests[source_path])
+        self.output.copy_file(relative_path, source_path)
+
+    def open_text(self, relative_path):
+        # Only feeds and sitemaps are streamed, and they are not precached
+        return self.output.open_text(relative_path)
+
+    def close(self):
+        self.output.close()
+
+    def exists(self):
+        return self.output.exists()
+
+
+def precache_manifest(entries, basepath="/", critical_max_bytes=CRITICAL_MAX_BYTES):
+    """
+    Build the precache manifest for recorded entries.
+
+    Args:
+        entries (dict): Site-relative path -> (size, hex digest).
+        basepath (str): Base path the site is built for.
+        critical_max_bytes (int): Largest file precached on install.
+
+    Returns:
+        dict: {"version", "critical": [...], "lazy": [...]}, each entry a
+        {"url", "revision", "size"} object, in output path order.
+    """
+    critical = []
+    lazy = []
+    for relative_path in sorted(entries):
+        size, digest = entries[relative_path]
+        entry = {"url": basepath + page_url(relative_path),
+                 "revision": digest[:REVISION_LENGTH], "size": size}
+        (critical if size <= critical_max_bytes else lazy).append(entry)
+    version = hashlib.sha256(
+        "".join(f"{entry['url']} {entry['revision']}\n" for entry in critical + lazy).encode("utf-8")
+    ).hexdigest()[:REVISION_LENGTH]
+    return {"version": version, "critical": critical, "lazy": lazy}
+
+
+def write_service_worker(output, entries, basepath="/", critical_max_bytes=CRITICAL_MAX_BYTES):
+    """
+    Write the precache manifest, service worker and its registration script.
+
+    Returns:
+        dict: The manifest.
+    """
+    manifest = precache_manifest(entries, basepath, critical_max_bytes)
+    output.write_text(MANIFEST_FILE, json.dumps(manifest, indent=1) + "\n")
+    output.write_text(SERVICE_WORKER_FILE, SERVICE_WORKER_SCRIPT % {
+        "version": manifest["version"], "base": basepath, "manifest": MANIFEST_FILE,
+    })
+    output.write_text(REGISTER_FILE, REGISTER_SCRIPT % {"base": basepath, "sw": SERVICE_WORKER_FILE})
+    return manifest
@@ -0,0 +1,205 @@
+import datetime
+import itertools
+import json
+import os
+import re
+
+from src.listings import xml_escape
+from src.output import as_output
+
+# Limit imposed by the sitemap protocol on a single sitemap file.
+MAX_URLS_PER_SITEMAP = 50000
+
+SITEMAP_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+SITEMAP_FOOTER = "</urlset>\n"
+
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def build_date():
+    """
+    The date stamped on content seen changing in this build: today, or the
+    date of $SOURCE_DATE_EPOCH when it is set (for reproducible builds).
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch is not None:
+        try:
+            return _utc_date(int(epoch))
+        except ValueError:
+            pass
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+def _utc_date(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).date().isoformat()
+
+
+def source_lastmod(page):
+    """
+    A reproducible lastmod for a page with no recorded history.
+
+    The front matter date is used if there is one. Otherwise the source
+    file's mtime, no later than $SOURCE_DATE_EPOCH when that is set (a
+    fresh checkout stamps every file with the checkout time).
+
+    Returns:
+        str: A YYYY-MM-DD date, or None if neither is known.
+    """
+    if page.date and DATE_RE.match(page.date):
+        return page.date[:10]
+    try:
+        mtime = os.stat(page.source).st_mtime
+    except (OSError, TypeError):
+        return None
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch is not None:
+        try:
+            mtime = min(mtime, int(epoch))
+        except ValueError:
+            pass
+    return _utc_date(mtime)
+
+
+class LastmodTracker:
+    """
+    Remember when each URL's source content last changed.
+
+    A URL keeps its previous lastmod for as long as its source hash stays
+    the same, so rebuilding an unchanged page does not make it look updated.
+    The history lives in the cache file, so keep it between builds (e.g. in
+    the CI cache). A URL missing from it gets the fallback given for it.
+    """
+
+    def __init__(self, cache_path=None, today=None):
+        self.cache_path = cache_path
+        self.today = today or build_date()
+        self.previous = {}
+        self.current = {}
+        if cache_path:
+            try:
+                with open(cache_path, "r") as cache_file:
+                    self.previous = json.load(cache_file)
+            except (OSError, ValueError):
+                self.previous = {}
+
+    def lastmod(self, url, content_hash, fallback=None):
+        """
+        Return the URL's lastmod and record it for the next build.
+
+        Args:
+            url (str): Site-relative URL.
+            content_hash (str): Hash of the URL's source content.
+            fallback (str): Date for a URL with no recorded history;
+                defaults to today.
+        """
+        entry = self.previous.get(url)
+        if entry and entry[0] == content_hash:
+            date = entry[1]
+        elif entry is None and fallback:
+            date = fallback
+        else:
+            date = self.today
+        self.current[url] = [content_hash, date]
+        return date
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(self.cache_path, "w") as cache_file:
+            json.dump(self.current, cache_file)
+
+
+def write_sitemaps(entries, output_dir, site_root, max_urls=MAX_URLS_PER_SITEMAP):
+    """
+    Stream sitemap entries to the output, sharding at the protocol's URL limit.
+
+    URLs are written as they are produced. A site that fits in one file gets
+    a single sitemap.xml; larger sites get sitemap-1.xml, sitemap-2.xml, ...
+    plus a sitemap.xml index pointing at the shards. Only the first
+    max_urls + 1 entries are held back to tell the two cases apart, so
+    nothing is renamed afterwards and archive outputs work too.
+
+    Args:
+        entries (iterable): (site-relative URL, lastmod date) pairs.
+        output_dir (str): Output directory of the site, or an output from
+            src.output.
+        site_root (str): Absolute URL of the site root, without trailing slash.
+        max_urls (int): Maximum URLs per sitemap file.
+
+    Returns:
+        list: Names of the sitemap files written, index first.
+    """
+    output = as_output(output_dir)
+    entries = iter(entries)
+    head = list(itertools.islice(entries, max_urls + 1))
+
+    def write_urls(sitemap, urls):
+        sitemap.write(SITEMAP_HEADER)
+        for url, lastmod in urls:
+            sitemap.write(
+                f"  <url><loc>{xml_escape(site_root + url)}</loc>"
+                f"<lastmod>{lastmod}</lastmod></url>\n"
+            )
+        sitemap.write(SITEMAP_FOOTER)
+
+    if len(head) <= max_urls:
+        with output.open_text("sitemap.xml") as sitemap:
+            write_urls(sitemap, head)
+        return ["sitemap.xml"]
+
+    shards = []
+    entries = itertools.chain(head, entries)
+    for first in entries:
+        shards.append(f"sitemap-{len(shards) + 1}.xml")
+        with output.open_text(shards[-1]) as shard:
+            write_urls(shard, itertools.chain([first], itertools.islice(entries, max_urls - 1)))
+
+    with output.open_text("sitemap.xml") as index:
+        index.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for name in shards:
+            index.write(f"  <sitemap><loc>{xml_escape(site_root)}/{name}</loc></sitemap>\n")
+        index.write("</sitemapindex>\n")
+    return ["sitemap.xml"] + shards
+
+
+def write_robots(output_dir, site_root):
+    """Write a robots.txt that allows everything and points at the sitemap."""
+    as_output(output_dir).write_text(
+        "robots.txt", f"User-agent: *\nAllow: /\n\nSitemap: {site_root}/sitemap.xml\n"
+    )
+
+
+def generate_sitemap(pages, output_dir, site_root, cache_path=None,
+                     max_urls=MAX_URLS_PER_SITEMAP, robots=True):
+    """
+    Write sitemap.xml (sharded if needed) and robots.txt for the given pages.
+
+    Args:
+        pages (list): Page objects from generate_pages_recursive().
+        output_dir (str): Output directory of the site, or an output from
+            src.output.
+        site_root (str): Absolute URL of the site root, without trailing slash.
+        cache_path (str): JSON file remembering lastmod dates, or None.
+            Pages it doesn't know get their source_lastmod().
+        max_urls (int): Maximum URLs per sitemap file.
+        robots (bool): Also write robots.txt. Pass False when the site
+            brings its own, so its rules are not replaced.
+
+    Returns:
+        list: Names of the sitemap files written.
+    """
+    tracker = LastmodTracker(cache_path)
+    entries = ((page.url, tracker.lastmod(page.url, page.source_hash, source_lastmod(page)))
+               for page in pages)
+    written = write_sitemaps(entries, output_dir, site_root, max_urls)
+    tracker.save()
+    if robots:
+        write_robots(output_dir, site_root)
+    return written
@@ -0,0 +1,106 @@
+# Attributes holding URLs that are rewritten per target.
+URL_ATTRS = ("href", "src")
+
+
+class BuildTarget:
+    """
+    One output tree of a build: where it is written and how URLs are served.
+
+    A single build can render every page once and emit it to several
+    targets, e.g. a staging tree served from / and a production tree
+    served from /static_site_genrator/.
+    """
+
+    def __init__(self, output_dir, basepath="/", site_url="", name=None, assets=None):
+        if not basepath.startswith("/"):
+            basepath = "/" + basepath
+        if not basepath.endswith("/"):
+            basepath += "/"
+        self.output_dir = output_dir
+        self.basepath = basepath
+        self.site_url = site_url.rstrip("/")
+        self.name = name or output_dir
+        # Site-relative asset URL -> fingerprinted URL, see src.assets
+        self.assets = assets or {}
+        self._templates = {}
+
+    def rewrite_url(self, url):
+        """
+        Map a site-absolute URL ("/images/a.png") to its URL in this target.
+
+        Fingerprinted assets are swapped for their hashed names, then the
+        basepath is prefixed. Other URLs are returned unchanged.
+        """
+        if not url.startswith("/") or url.startswith("//"):
+            return url
+        if self.assets:
+            end = len(url)
+            for separator in "?#":
+                position = url.find(separator)
+                if position != -1:
+                    end = min(end, position)
+            url = self.assets.get(url[:end], url[:end]) + url[end:]
+        return self.basepath + url[1:]
+
+    def site_root(self):
+        """Absolute URL of the site root without trailing slash, or "" if unknown."""
+        if not self.site_url:
+            return ""
+        return self.site_url + self.basepath.rstrip("/")
+
+    def template(self, template):
+        """The template with its own URLs rewritten for this target (cached)."""
+        from src.template import rewrite_template_urls
+
+        rewritten = self._templates.get(template)
+        if rewritten is None:
+            rewritten = rewrite_template_urls(template, self.rewrite_url)
+            self._templates[template] = rewritten
+        return rewritten
+
+    def settings(self):
+        """The settings that affect this target's output, for build stamps."""
+        return f"{self.output_dir}|{self.basepath}|{self.site_url}"
+
+    def __repr__(self):
+        return f"BuildTarget({self.output_dir}, {self.basepath}, {self.site_url})"
+
+
+def parse_target(spec):
+    """
+    Parse a --target option.
+
+    The spec is either an output directory or comma-separated key=value
+    settings, e.g. "output=docs,basepath=/sub/,site_url=https://example.com".
+
+    Raises:
+        ValueError: On unknown keys or a missing output directory.
+    """
+    if "=" not in spec:
+        return BuildTarget(spec)
+    settings = {}
+    for item in spec.split(","):
+        key, sep, value = item.partition("=")
+        key = key.strip()
+        if not sep or key not in ("output", "basepath", "site_url", "name"):
+            raise ValueError(f"Invalid target setting: {item!r}")
+        settings[key] = value.strip()
+    if "output" not in settings:
+        raise ValueError(f"Target has no output directory: {spec!r}")
+    return BuildTarget(
+        settings["output"],
+        settings.get("basepath", "/"),
+        settings.get("site_url", ""),
+        settings.get("name"),
+    )
+
+
+def rewrite_html_node_urls(node, rewrite_url):
+    """Rewrite href/src attributes of an HTMLNode tree in place."""
+    if node.props:
+        for attr in URL_ATTRS:
+            if attr in node.props:
+                node.props[attr] = rewrite_url(node.props[attr])
+    for child in node.children or ():
+        rewrite_html_node_urls(child, rewrite_url)
+    return node
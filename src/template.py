@@ -0,0 +1,42 @@
+import re
+
+from src.htmlnode import escape_text
+
+# href="..." and src="..." attributes in the template's own markup.
+TEMPLATE_URL_RE = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+def rewrite_template_urls(template, rewrite_url):
+    """
+    Rewrite the href/src attributes written in a template.
+
+    Only the template's markup is touched; page content is rewritten on its
+    link and image nodes before it is inserted.
+    """
+    return TEMPLATE_URL_RE.sub(
+        lambda match: f'{match.group(1)}="{rewrite_url(match.group(2))}"', template
+    )
+
+
+def fill_template(template, title, content):
+    """Substitute the {{ Title }} and {{ Content }} placeholders."""
+    full_html = template.replace("{{ Title }}", escape_text(title))
+    return full_html.replace("{{ Content }}", content)
+
+
+def render_template(template, title, content, basepath="/"):
+    """
+    Fill the page template and apply the site basepath to the template's URLs.
+
+    Args:
+        template (str): Template text with {{ Title }} and {{ Content }} placeholders.
+        title (str): Page title.
+        content (str): Rendered HTML body, with its URLs already rewritten.
+        basepath (str): Base path for the site (e.g., / or /subpath/).
+
+    Returns:
+        str: The complete HTML page.
+    """
+    from src.targets import BuildTarget
+
+    return fill_template(BuildTarget("", basepath).template(template), title, content)
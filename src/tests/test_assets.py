@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src import assets
+from src.assets import fingerprint_assets, fingerprint_name, write_asset_metadata
+from src.targets import BuildTarget
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body {}")
+        self.write(os.path.join("images", "a.png"), "png")
+        self.cache = os.path.join(self.tmp.name, "cache", "assets.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.static, name), "w") as f:
+            f.write(text)
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("images/a.png", "0123456789abcdef"),
+                         os.path.join("images", "a.0123456789.png"))
+
+    def test_manifest(self):
+        manifest = fingerprint_assets(self.static)
+        self.assertEqual(sorted(manifest.urls), ["/images/a.png", "/index.css"])
+        self.assertRegex(manifest.urls["/index.css"], r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertTrue(manifest.urls["/index.css"][7:17] in manifest.digests["/index.css"])
+
+    def test_name_changes_with_content(self):
+        before = fingerprint_assets(self.static).urls["/index.css"]
+        self.write("index.css", "body { color: red }")
+        self.assertNotEqual(before, fingerprint_assets(self.static).urls["/index.css"])
+
+    def test_unchanged_assets_not_hashed_again(self):
+        first = fingerprint_assets(self.static, self.cache)
+        self.assertEqual(first.hashed, 2)
+        with mock.patch.object(assets, "file_digest", side_effect=AssertionError):
+            second = fingerprint_assets(self.static, self.cache)
+        self.assertEqual(second.hashed, 0)
+        self.assertEqual(second.urls, first.urls)
+
+    def test_metadata_files(self):
+        manifest = fingerprint_assets(self.static)
+        out = os.path.join(self.tmp.name, "out")
+        os.makedirs(out)
+        write_asset_metadata(out, manifest, "/sub/")
+        with open(os.path.join(out, "asset-manifest.json")) as f:
+            self.assertEqual(json.load(f), manifest.urls)
+        with open(os.path.join(out, "_headers")) as f:
+            headers = f.read()
+        self.assertIn("/sub" + manifest.urls["/index.css"], headers)
+        self.assertIn("immutable", headers)
+
+    def test_target_rewrites_assets(self):
+        target = BuildTarget("out", "/sub/", assets={"/index.css": "/index.abc.css"})
+        self.assertEqual(target.rewrite_url("/index.css"), "/sub/index.abc.css")
+        self.assertEqual(target.rewrite_url("/index.css?v=1#x"), "/sub/index.abc.css?v=1#x")
+        self.assertEqual(target.rewrite_url("/other.css"), "/sub/other.css")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
 import unittest
 import textwrap
-from src.block_markdown import markdown_to_blocks, BlockType, block_to_block_type, markdown_to_html_node
+from src.block_markdown import (
+    markdown_to_blocks, BlockType, block_to_block_type, markdown_to_html_node,
+    BlockSyntax, register_block_syntax, unregister_block_syntax,
+)
+from src.flatdoc import markdown_to_flat_document
+from src.htmlnode import LeafNode, ParentNode
 
 
 class TestBlockMarkdown(unittest.TestCase):
@@ -170,5 +175,44 @@ the **same** even with inline stuff
             extract_title(md)
 
 
+def admonition_to_html_node(block):
+    kind, _, text = block[4:].partition("\n")
+    return ParentNode("aside", [LeafNode("p", text)], {"class": kind.strip()})
+
+
+class TestBlockSyntaxRegistry(unittest.TestCase):
+    def setUp(self):
+        register_block_syntax(BlockSyntax(
+            "admonition", "!", lambda block: block.startswith("!!! "), admonition_to_html_node,
+        ))
+
+    def tearDown(self):
+        unregister_block_syntax("admonition")
+
+    def test_extension_block(self):
+        md = "!!! note\nMind the gap\n\n![img](/a.png)"
+        self.assertEqual(block_to_block_type("!!! note\nMind the gap"), "admonition")
+        self.assertEqual(block_to_block_type("![img](/a.png)"), BlockType.PARAGRAPH)
+        expected = ('<div><aside class="note"><p>Mind the gap</p></aside>'
+                    '<p><img alt="img" src="/a.png"></img></p></div>')
+        self.assertEqual(markdown_to_html_node(md).to_html(), expected)
+        self.assertEqual(markdown_to_flat_document(md).to_html(), expected)
+
+    def test_duplicate_name(self):
+        with self.assertRaises(ValueError):
+            register_block_syntax(BlockSyntax("admonition", "?", bool, admonition_to_html_node))
+
+    def test_first_takes_precedence(self):
+        register_block_syntax(BlockSyntax(
+            "hashtag", "#", lambda block: block.startswith("#tag"), lambda block: LeafNode("span", block),
+        ), first=True)
+        try:
+            self.assertEqual(block_to_block_type("#tag"), "hashtag")
+            self.assertEqual(block_to_block_type("# Title"), BlockType.HEADING)
+        finally:
+            unregister_block_syntax("hashtag")
+        self.assertEqual(block_to_block_type("#tag"), BlockType.PARAGRAPH)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from src.critical import (
+    CriticalCss,
+    document_features,
+    first_image,
+    parse_css,
+    selector_matches,
+    template_features,
+)
+from src.flatdoc import markdown_to_flat_document
+
+CSS = """
+/* base */
+body { color: red; }
+h1, h2 { margin: 0; }
+pre code { padding: 0; }
+a:hover { color: blue; }
+.tok-keyword { font-weight: bold; }
+#main > p { margin: 1em; }
+::-webkit-scrollbar { width: 12px; }
+@import url("/fonts.css");
+@media (max-width: 600px) {
+  h2 { font-size: 1em; }
+  table { width: 100%; }
+}
+@font-face { font-family: "X"; src: url("/x.woff2"); }
+"""
+
+TEMPLATE = """<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body><main id="main">{{ Content }}</main></body>
+</html>"""
+
+
+class TestParseCss(unittest.TestCase):
+    def test_rules(self):
+        rules = parse_css(CSS)
+        self.assertEqual(rules[0], ("rule", ["body"], "color: red;"))
+        self.assertEqual(rules[1], ("rule", ["h1", "h2"], "margin: 0;"))
+        self.assertIn(("raw", '@import url("/fonts.css");'), rules)
+        group = [rule for rule in rules if rule[0] == "group"][0]
+        self.assertEqual(group[1], "@media (max-width: 600px)")
+        self.assertEqual(len(group[2]), 2)
+        self.assertEqual(rules[-1][0], "raw")
+
+
+class TestSelectorMatches(unittest.TestCase):
+    def test_selectors(self):
+        features = {"body", "pre", "code", "a", ".tok-keyword", "#main", "p"}
+        self.assertTrue(selector_matches("pre code", features))
+        self.assertTrue(selector_matches("a:hover", features))
+        self.assertTrue(selector_matches("code.tok-keyword", features))
+        self.assertTrue(selector_matches("#main > p", features))
+        self.assertTrue(selector_matches("::-webkit-scrollbar", features))
+        self.assertTrue(selector_matches("*", features))
+        self.assertTrue(selector_matches('a[href^="http"]', features))
+        self.assertFalse(selector_matches("h1", features))
+        self.assertFalse(selector_matches("pre .tok-string", features))
+        self.assertFalse(selector_matches("ul li", features))
+
+
+class TestFeatures(unittest.TestCase):
+    def test_document_and_template(self):
+        doc = markdown_to_flat_document("# T\n\n```python\nif x: pass\n```\n\n![a](/a.png) ![b](/b.png)")
+        features = document_features(doc)
+        self.assertTrue({"h1", "pre", "code", "img", ".language-python", ".tok-keyword"} <= features)
+        self.assertEqual(first_image(doc), "/a.png")
+        self.assertIsNone(first_image(markdown_to_flat_document("# No images")))
+        self.assertTrue({"html", "head", "link", "body", "main", "#main"} <= template_features(TEMPLATE))
+
+
+class TestCriticalCss(unittest.TestCase):
+    def setUp(self):
+        self.critical = CriticalCss(CSS, TEMPLATE)
+
+    def test_css_for_page(self):
+        css = self.critical.css_for({"h2", "p"})
+        self.assertIn("body{color: red;}", css)
+        self.assertIn("h2{margin: 0;}", css)
+        self.assertIn("#main > p{margin: 1em;}", css)
+        self.assertIn("@media (max-width: 600px){h2{font-size: 1em;}}", css)
+        self.assertIn("@font-face", css)
+        self.assertNotIn("pre code", css)
+        self.assertNotIn("tok-keyword", css)
+        self.assertNotIn("table", css)
+
+    def test_cached_per_feature_set(self):
+        first = self.critical.css_for({"h1"})
+        self.assertIs(self.critical.css_for({"h1"}), first)
+        self.critical.css_for({"h2"})
+        self.assertEqual((self.critical.misses, self.critical.hits), (2, 1))
+
+    def test_apply(self):
+        doc = markdown_to_flat_document("# Hi\n\n![pic](/images/a.png)")
+        html = self.critical.apply(TEMPLATE, doc, lambda url: "/sub" + url)
+        self.assertIn("<style>", html)
+        self.assertIn('<link href="/index.css" rel="preload" as="style" onload=', html)
+        self.assertIn('<noscript><link href="/index.css" rel="stylesheet" /></noscript>', html)
+        self.assertIn('<link rel="preload" as="image" href="/sub/images/a.png" />', html)
+        self.assertLess(html.index("<style>"), html.index("</head>"))
+        self.assertIn("{{ Content }}", html)
+
+    def test_from_template(self):
+        with tempfile.TemporaryDirectory() as static:
+            self.assertIsNone(CriticalCss.from_template(TEMPLATE, static))
+            with open(os.path.join(static, "index.css"), "w") as f:
+                f.write(CSS)
+            critical = CriticalCss.from_template(TEMPLATE, static)
+        self.assertEqual(len(critical.rules), len(parse_css(CSS)))
+        self.assertIsNone(CriticalCss.from_template("<html></html>", static))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from src.daemon import BuildDaemon, DaemonServer, send_request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, "daemon.sock")
+        self.active = 0
+        self.overlaps = 0
+        self.daemon = BuildDaemon(self.build, self.render, lambda: {"extra": 1})
+        self.server = DaemonServer(self.socket_path, self.daemon)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def build(self):
+        self.active += 1
+        if self.active > 1:
+            self.overlaps += 1
+        time.sleep(0.01)
+        self.active -= 1
+        return ["a", "b"]
+
+    def render(self, path):
+        if path == "missing.md":
+            raise FileNotFoundError(path)
+        return f"<p>{path}</p>"
+
+    def test_render(self):
+        response = send_request(self.socket_path, "render", path="index.md")
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["html"], "<p>index.md</p>")
+
+    def test_build_and_status(self):
+        self.assertEqual(send_request(self.socket_path, "build")["pages"], 2)
+        status = send_request(self.socket_path, "status")
+        self.assertTrue(status["ok"])
+        self.assertEqual(status["last_build"]["pages"], 2)
+        self.assertEqual(status["extra"], 1)
+
+    def test_errors(self):
+        self.assertFalse(send_request(self.socket_path, "explode")["ok"])
+        self.assertFalse(send_request(self.socket_path, "render")["ok"])
+        response = send_request(self.socket_path, "render", path="missing.md")
+        self.assertFalse(response["ok"])
+        self.assertIn("FileNotFoundError", response["error"])
+
+    def test_concurrent_builds_are_serialized(self):
+        threads = [
+            threading.Thread(target=send_request, args=(self.socket_path, "build"))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.overlaps, 0)
+        self.assertEqual(self.daemon.requests, 8)
+
+    def test_socket_removed_on_close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertFalse(os.path.exists(self.socket_path))
+        # Restart so tearDown can shut it down again
+        self.server = DaemonServer(self.socket_path, self.daemon)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+
+    def test_running_daemon_is_not_replaced(self):
+        with self.assertRaisesRegex(FileExistsError, "already listening"):
+            DaemonServer(self.socket_path, self.daemon)
+        self.assertTrue(send_request(self.socket_path, "status")["ok"])
+
+
+class TestStaleSocket(unittest.TestCase):
+    def test_only_stale_sockets_are_removed(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.md")
+            with open(path, "w") as f:
+                f.write("# Keep me")
+            with self.assertRaisesRegex(FileExistsError, "not a socket"):
+                DaemonServer(path, BuildDaemon(list, str))
+            self.assertTrue(os.path.exists(path))
+
+            # A socket nobody listens on any more is replaced
+            socket_path = os.path.join(root, "d.sock")
+            stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stale.bind(socket_path)
+            stale.close()
+            server = DaemonServer(socket_path, BuildDaemon(list, str))
+            server.server_close()
+
+
+class TestDaemonEndToEnd(unittest.TestCase):
+    def test_main_daemon(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "content"))
+            os.makedirs(os.path.join(root, "static"))
+            with open(os.path.join(root, "content", "index.md"), "w") as f:
+                f.write("# Home\n\n[x](/x)")
+            with open(os.path.join(root, "content", "draft.md"), "w") as f:
+                f.write("---\ndraft: true\n---\n# Draft")
+            with open(os.path.join(root, "outside.md"), "w") as f:
+                f.write("# Outside")
+            with open(os.path.join(root, "static", "x"), "w") as f:
+                f.write("x")
+            with open(os.path.join(root, "template.html"), "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            socket_path = os.path.join(root, "d.sock")
+            process = subprocess.Popen(
+                [sys.executable, "main.py", "/sub/", "--daemon", socket_path, "--fingerprint",
+                 "--content", os.path.join(root, "content"),
+                 "--static", os.path.join(root, "static"),
+                 "--template", os.path.join(root, "template.html"),
+                 "--output", os.path.join(root, "out"),
+                 "--cache-dir", os.path.join(root, "cache")],
+                cwd=REPO_ROOT, stdout=subprocess.DEVNULL,
+            )
+            try:
+                for _ in range(200):
+                    if os.path.exists(socket_path):
+                        break
+                    time.sleep(0.02)
+                response = send_request(socket_path, "render", path="index.md")
+                # Rendered with the asset map before any build has run
+                self.assertRegex(response["html"],
+                                 '<title>Home</title><div><h1>Home</h1>'
+                                 '<p><a href="/sub/x\\.[0-9a-f]{10}">x</a></p></div>')
+                # Later renders reuse the setup until the template changes
+                assets_json = os.path.join(root, "cache", "assets.json")
+                mtime_ns = os.stat(assets_json).st_mtime_ns
+                time.sleep(0.01)
+                send_request(socket_path, "render", path="index.md")
+                self.assertEqual(os.stat(assets_json).st_mtime_ns, mtime_ns)
+                with open(os.path.join(root, "template.html"), "w") as f:
+                    f.write("<h6>{{ Title }}</h6>{{ Content }}")
+                response = send_request(socket_path, "render", path="index.md")
+                self.assertTrue(response["html"].startswith("<h6>Home</h6>"))
+                # Nothing outside the content directory, and no drafts
+                response = send_request(socket_path, "render", path="../template.html")
+                self.assertFalse(response["ok"])
+                self.assertIn("not a markdown file under", response["error"])
+                self.assertFalse(send_request(socket_path, "render",
+                                              path=os.path.join(root, "outside.md"))["ok"])
+                response = send_request(socket_path, "render", path="draft.md")
+                self.assertFalse(response["ok"])
+                self.assertIn("--drafts", response["error"])
+                self.assertEqual(send_request(socket_path, "build")["pages"], 1)
+                status = send_request(socket_path, "status")
+                self.assertEqual(status["cache_hits"], 3)
+                self.assertTrue(os.path.exists(os.path.join(root, "out", "index.html")))
+            finally:
+                process.send_signal(signal.SIGINT)
+                process.wait()
+            self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src import discovery
+from src.discovery import DirectorySnapshot, IgnoreRules, load_ignore_rules, scan_tree
+
+
+def write(path, text=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestIgnoreRules(unittest.TestCase):
+    def test_basename_patterns(self):
+        rules = IgnoreRules(["*.tmp", "# comment", "", "build/"])
+        self.assertTrue(rules.ignored("a.tmp"))
+        self.assertTrue(rules.ignored("blog/deep/a.tmp"))
+        self.assertFalse(rules.ignored("a.tmpl"))
+        self.assertTrue(rules.ignored("blog/build", is_dir=True))
+        self.assertFalse(rules.ignored("blog/build"))
+
+    def test_anchored_patterns(self):
+        rules = IgnoreRules(["/drafts", "blog/*.md"])
+        self.assertTrue(rules.ignored("drafts", is_dir=True))
+        self.assertFalse(rules.ignored("blog/drafts", is_dir=True))
+        self.assertTrue(rules.ignored("blog/post.md"))
+        self.assertFalse(rules.ignored("blog/tom/index.md"))
+
+    def test_double_star_and_negation(self):
+        rules = IgnoreRules(["**/wip/**", "*.md", "!index.md", "[ab].txt"])
+        self.assertTrue(rules.ignored("blog/wip/post.txt"))
+        self.assertTrue(rules.ignored("notes.md"))
+        self.assertFalse(rules.ignored("blog/index.md"))
+        self.assertTrue(rules.ignored("a.txt"))
+        self.assertFalse(rules.ignored("c.txt"))
+
+
+class TestScanTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for path in ["index.md", "b/z.md", "b/c/y.md", "a/x.md", "a/x.md~",
+                     "node_modules/pkg/readme.md", "drafts/wip.md"]:
+            write(os.path.join(self.root, path), path)
+        write(os.path.join(self.root, ".ssgignore"), "/drafts/\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def paths(self, **kwargs):
+        return [entry.path for entry in scan_tree(self.root, **kwargs)]
+
+    def test_walk_order_and_ignores(self):
+        self.assertEqual(self.paths(), ["index.md", "a/x.md", "b/z.md", "b/c/y.md"])
+
+    def test_explicit_rules(self):
+        self.assertIn("drafts/wip.md", self.paths(ignore=IgnoreRules()))
+        self.assertTrue(load_ignore_rules(self.root).ignored("drafts", is_dir=True))
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_symlinked_directories_not_entered(self):
+        os.symlink("..", os.path.join(self.root, "b", "loop"))
+        os.symlink("b", os.path.join(self.root, "alias"))
+        os.symlink("index.md", os.path.join(self.root, "link.md"))
+        self.assertEqual(self.paths(), ["index.md", "link.md", "a/x.md", "b/z.md", "b/c/y.md"])
+
+    def test_stats(self):
+        entries = {entry.path: entry for entry in scan_tree(self.root, with_stats=True)}
+        st = os.stat(os.path.join(self.root, "b", "c", "y.md"))
+        entry = entries["b/c/y.md"]
+        self.assertEqual((entry.size, entry.mtime_ns, entry.inode),
+                         (st.st_size, st.st_mtime_ns, st.st_ino))
+        self.assertIsNone(scan_tree(self.root)[0].size)
+
+    def test_snapshot_reuses_unchanged_directories(self):
+        path = os.path.join(self.root, "cache", "snapshot.json")
+        ignore = IgnoreRules(["cache/"])
+        # Pretend the scan happens well after the tree was written
+        with mock.patch.object(discovery, "RACY_WINDOW_NS", -10**18):
+            first = DirectorySnapshot(path)
+            scan_tree(self.root, ignore, snapshot=first)
+            first.save()
+
+            write(os.path.join(self.root, "b", "new.md"))
+            second = DirectorySnapshot(path)
+            paths = [entry.path for entry in scan_tree(self.root, ignore, snapshot=second)]
+        self.assertIn("b/new.md", paths)
+        self.assertEqual(second.misses, 2)  # root (cache/ was created) and b/
+        self.assertGreaterEqual(second.hits, 3)
+
+    def test_recent_directories_not_trusted(self):
+        path = os.path.join(self.tmp.name, "snapshot.json")
+        first = DirectorySnapshot(path)
+        scan_tree(self.root, snapshot=first)
+        first.save()
+        second = DirectorySnapshot(path)
+        scan_tree(self.root, snapshot=second)
+        self.assertEqual(second.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import random
+import unittest
+from src.block_markdown import markdown_to_html_node
+from src.flatdoc import (
+    FlatDocument,
+    markdown_to_flat_document,
+    TEXT,
+    LEAF,
+    ELEMENT,
+    NO_NODE,
+)
+from src.htmlnode import LeafNode, ParentNode
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), "content")
+
+SAMPLE = """
+# Heading with **bold**
+
+A paragraph with _italic_, `code`, a [link](/a?b=1&c=2) and ![img](/i.png).
+
+> quoted <text>
+> more
+
+- one
+- two & three
+
+1. first
+2. second
+
+```python
+def f(): return 1
+```
+
+```
+plain
+```
+"""
+
+
+def content_pages():
+    for root, _, files in os.walk(CONTENT_DIR):
+        for file in files:
+            if file.endswith(".md"):
+                with open(os.path.join(root, file)) as f:
+                    yield f.read()
+
+
+class TestFlatDocument(unittest.TestCase):
+    def assertSameHtml(self, markdown):
+        expected = markdown_to_html_node(markdown).to_html()
+        doc = markdown_to_flat_document(markdown)
+        self.assertEqual(doc.to_html(), expected)
+        self.assertEqual(doc.to_html_node().to_html(), expected)
+
+    def test_matches_tree_parser(self):
+        self.assertSameHtml(SAMPLE)
+
+    def test_matches_tree_parser_on_content(self):
+        for markdown in content_pages():
+            self.assertSameHtml(markdown)
+
+    def test_matches_tree_parser_on_random_input(self):
+        alphabet = ["[", "]", "(", ")", "!", "**", "_", "`", "#", " ", "\n",
+                    "\n\n", "a", ">", "- ", "1. ", "```", "<", "&"]
+        for seed in range(300):
+            rng = random.Random(seed)
+            markdown = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+            try:
+                expected = markdown_to_html_node(markdown).to_html()
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    markdown_to_flat_document(markdown)
+                continue
+            self.assertEqual(markdown_to_flat_document(markdown).to_html(), expected)
+
+    def test_structure(self):
+        doc = markdown_to_flat_document("Hi **there**")
+        self.assertEqual(list(doc.kinds), [ELEMENT, ELEMENT, TEXT, LEAF])
+        self.assertEqual([doc.tag(i) for i in range(len(doc))], ["div", "p", None, "b"])
+        self.assertEqual(list(doc.parents), [NO_NODE, 0, 1, 1])
+        self.assertEqual(list(doc.children(1)), [2, 3])
+        self.assertEqual(doc.node_text(3), "there")
+        self.assertEqual(doc.count_kinds(), (1, 1, 2))
+
+    def test_props_are_sparse(self):
+        doc = markdown_to_flat_document("[a](/x) b")
+        self.assertEqual(doc.props, {2: {"href": "/x"}})
+
+    def test_append_html_node(self):
+        node = ParentNode("p", [LeafNode(None, "a < b"), LeafNode("a", "x", {"href": "/"})])
+        doc = FlatDocument()
+        doc.append_html_node(node)
+        doc.finish()
+        self.assertEqual(doc.to_html(), node.to_html())
+
+    def test_subtree_to_html(self):
+        doc = markdown_to_flat_document("- a\n- **b**\n\nafter")
+        items = list(doc.children(1))
+        self.assertEqual(doc.to_html(items[1]), "<li><b>b</b></li>")
+        self.assertEqual(doc.to_html(1), "<ul><li>a</li><li><b>b</b></li></ul>")
+
+    def test_text_and_leaf_to_html_stop_at_node(self):
+        doc = markdown_to_flat_document("hello **b** world")
+        for index in range(len(doc)):
+            self.assertEqual(doc.to_html(index), doc.to_html_node(index).to_html())
+        self.assertEqual(doc.to_html(3), "<b>b</b>")
+        self.assertEqual(doc.to_html(2), "hello ")
+
+    def test_out_of_order_building(self):
+        doc = FlatDocument()
+        root = doc.add_element("div")
+        first = doc.add_element("p", root)
+        second = doc.add_element("p", root)
+        doc.add_text("one", first)
+        doc.add_text("two", second)
+        doc.finish()
+        self.assertFalse(doc.preorder)
+        self.assertEqual(doc.to_html(), "<div><p>one</p><p>two</p></div>")
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_flat_document("").to_html(), "<div></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.frontmatter import split_front_matter, read_front_matter, is_draft, scan_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        md = "# Title\n\nBody"
+        self.assertEqual(split_front_matter(md), ({}, md))
+
+    def test_front_matter(self):
+        md = "---\ntitle: \"Hello\"\ndate: 2024-01-02\ntags: [a, b]\ndraft: false\n---\n# Title\n"
+        metadata, body = split_front_matter(md)
+        self.assertEqual(
+            metadata,
+            {"title": "Hello", "date": "2024-01-02", "tags": ["a", "b"], "draft": False},
+        )
+        self.assertEqual(body, "# Title\n")
+
+    def test_unclosed_front_matter_is_body(self):
+        md = "---\ntitle: Hello\n# Title"
+        self.assertEqual(split_front_matter(md), ({}, md))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n")
+
+    def test_block_list(self):
+        md = "---\ntitle: Hello\ntags:\n  - a\n  - \"b c\"\nempty:\ndraft: true\n---\nBody"
+        self.assertEqual(
+            split_front_matter(md),
+            ({"title": "Hello", "tags": ["a", "b c"], "empty": "", "draft": True}, "Body"),
+        )
+
+    def test_list_item_without_key(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: Hello\n- a\n---\n")
+
+    def test_toml_front_matter(self):
+        md = "+++\ntitle = \"Hello\"\ntags = [\"a\"]\ndraft = true\n+++\nBody"
+        self.assertEqual(
+            split_front_matter(md),
+            ({"title": "Hello", "tags": ["a"], "draft": True}, "Body"),
+        )
+
+
+class TestReadFrontMatter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_reads_header_only(self):
+        path = self.write("a.md", "---\ntitle: A\n---\n" + "x" * 100000)
+        self.assertEqual(read_front_matter(path), {"title": "A"})
+
+    def test_header_larger_than_chunk(self):
+        header = "".join(f"key{i}: {i}\n" for i in range(100))
+        path = self.write("a.md", f"---\n{header}---\n# Body")
+        metadata = read_front_matter(path, chunk_size=16)
+        self.assertEqual(len(metadata), 100)
+        self.assertEqual(metadata["key99"], "99")
+
+    def test_no_header(self):
+        path = self.write("a.md", "# Title\n---\n")
+        self.assertEqual(read_front_matter(path), {})
+
+    def test_unclosed_header(self):
+        path = self.write("a.md", "---\ntitle: A\n")
+        self.assertEqual(read_front_matter(path), {})
+
+    def test_unclosed_header_stops_reading(self):
+        path = self.write("a.md", "---\ntitle: A\n" + "x\n" * (2 << 20))
+        with mock.patch("src.frontmatter._parse_header") as parse:
+            self.assertEqual(read_front_matter(path, chunk_size=1024), {})
+        parse.assert_not_called()
+
+    def test_header_too_large(self):
+        header = "".join(f"key{i}: {i}\n" for i in range(10000))
+        path = self.write("a.md", f"---\n{header}---\n# Body")
+        self.assertEqual(read_front_matter(path), {})
+        self.assertEqual(split_front_matter(f"---\n{header}---\n# Body")[0], {})
+
+    def test_fence_across_chunks(self):
+        path = self.write("a.md", "---\nab: c\n---\nBody")
+        for chunk_size in range(4, 16):
+            self.assertEqual(read_front_matter(path, chunk_size=chunk_size), {"ab": "c"})
+
+    def test_invalid_line_names_file(self):
+        path = self.write("a.md", "---\nnot a pair\n---\n")
+        with self.assertRaisesRegex(ValueError, "a.md"):
+            read_front_matter(path)
+
+    def test_is_draft(self):
+        self.assertTrue(is_draft({"draft": True}))
+        self.assertFalse(is_draft({"draft": "no"}))
+        self.assertFalse(is_draft({}))
+
+    def test_scan(self):
+        self.write("a.md", "---\ndraft: true\n---\n")
+        self.write("b.md", "# B")
+        self.write("c.txt", "---\ntitle: C\n---\n")
+        self.assertEqual(
+            [(os.path.basename(p), m) for p, m in scan_front_matter(self.tmp.name)],
+            [("a.md", {"draft": True}), ("b.md", {})],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
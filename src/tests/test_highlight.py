@@ -0,0 +1,94 @@
+import unittest
+from src.highlight import (
+    tokenize,
+    highlight,
+    clear_cache,
+    cache_stats,
+    normalize_language,
+    highlight_to_html_nodes,
+)
+from src.block_markdown import markdown_to_html_node
+from src.flatdoc import markdown_to_flat_document
+
+
+class TestHighlight(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+
+    def test_normalize_language(self):
+        self.assertEqual(normalize_language("Python"), "python")
+        self.assertEqual(normalize_language("js title=x"), "javascript")
+        self.assertIsNone(normalize_language(""))
+        self.assertIsNone(normalize_language("elflang"))
+
+    def test_tokenize_python(self):
+        self.assertEqual(
+            tokenize("def f(): return 42  # answer", "python"),
+            [
+                ("keyword", "def"),
+                (None, " f(): "),
+                ("keyword", "return"),
+                (None, " "),
+                ("number", "42"),
+                (None, "  "),
+                ("comment", "# answer"),
+            ],
+        )
+
+    def test_keyword_inside_string_is_string(self):
+        self.assertEqual(tokenize("x = 'if'", "python")[-1], ("string", "'if'"))
+
+    def test_tokens_cover_input(self):
+        code = 'func main(){\n    fmt.Println("Aiya, Ambar!") // hi\n}\n'
+        self.assertEqual("".join(text for _, text in tokenize(code, "go")), code)
+
+    def test_unclosed_comment_and_string_run_to_end(self):
+        self.assertEqual(tokenize("x /* a /* b", "css"), [(None, "x "), ("comment", "/* a /* b")])
+        self.assertEqual(tokenize('s = "a\nb', "go")[-2:], [("string", '"a'), (None, "\nb")])
+        self.assertEqual(tokenize('"""doc\nx', "python"), [("string", '"""doc\nx')])
+
+    def test_unknown_language(self):
+        self.assertEqual(tokenize("a b", None), [(None, "a b")])
+
+    def test_cache(self):
+        first = highlight("print(1)", "python")
+        second = highlight("print(1)", "python")
+        self.assertIs(first, second)
+        self.assertEqual(cache_stats, {"hits": 1, "misses": 1})
+        highlight("print(1)", "javascript")
+        self.assertEqual(cache_stats["misses"], 2)
+
+    def test_highlight_renders_escaped_html(self):
+        self.assertEqual(
+            highlight('if a < b: s = "<i>"', "python"),
+            '<span class="tok-keyword">if</span> a &lt; b: s = '
+            '<span class="tok-string">"&lt;i&gt;"</span>',
+        )
+
+    def test_flat_document_reuses_cached_fragment(self):
+        markdown = "```python\nx = 1\n```"
+        first = markdown_to_flat_document(markdown)
+        second = markdown_to_flat_document(markdown)
+        self.assertEqual(cache_stats, {"hits": 1, "misses": 1})
+        self.assertEqual(first.to_html(), second.to_html())
+        self.assertEqual(first.to_html(), markdown_to_html_node(markdown).to_html())
+
+    def test_html_nodes(self):
+        html = "".join(node.to_html() for node in highlight_to_html_nodes("x = 1", "python"))
+        self.assertEqual(html, 'x = <span class="tok-number">1</span>')
+
+    def test_fenced_block(self):
+        node = markdown_to_html_node("```python\nif x:\n    pass\n```")
+        self.assertEqual(
+            node.to_html(),
+            '<div><pre><code class="language-python"><span class="tok-keyword">if</span>'
+            ' x:\n    <span class="tok-keyword">pass</span>\n</code></pre></div>',
+        )
+
+    def test_fenced_block_unknown_language(self):
+        node = markdown_to_html_node("```elflang\nfunc\n```")
+        self.assertEqual(node.to_html(), "<div><pre><code>func\n</code></pre></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
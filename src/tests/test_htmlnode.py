@@ -1,5 +1,5 @@
 import unittest
-from src.htmlnode import LeafNode, ParentNode, HTMLNode
+from src.htmlnode import LeafNode, ParentNode, HTMLNode, escape_text, escape_attr
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -108,6 +108,41 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b && c > d"), "a &lt; b &amp;&amp; c &gt; d")
+        self.assertEqual(escape_text('say "hi"'), 'say "hi"')
+
+    def test_escape_text_fast_path_returns_same_object(self):
+        text = "nothing special here"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attr(self):
+        self.assertEqual(escape_attr('/q?a=1&b="2"'), "/q?a=1&amp;b=&quot;2&quot;")
+
+    def test_leaf_escapes_value_and_props(self):
+        node = LeafNode("a", "<click>", {"href": '/x?a=1&b="2"'})
+        self.assertEqual(
+            node.to_html(),
+            '<a href="/x?a=1&amp;b=&quot;2&quot;">&lt;click&gt;</a>',
+        )
+
+    def test_text_runs_escaped(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode(None, "fish & "),
+                LeafNode(None, "chips <"),
+                LeafNode("b", "&"),
+                LeafNode(None, ">"),
+            ],
+        )
+        self.assertEqual(node.to_html(), "<p>fish &amp; chips &lt;<b>&amp;</b>&gt;</p>")
+
+    def test_text_run_without_value(self):
+        node = ParentNode("p", [LeafNode(None, None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
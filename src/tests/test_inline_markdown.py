@@ -5,8 +5,16 @@ from src.inline_markdown import (
     extract_markdown_images,
     split_nodes_image,
     split_nodes_link,
-    text_to_textnodes
+    text_to_spans,
+    text_to_textnodes,
+    delimiter_syntax,
+    register_inline_syntax,
+    unregister_inline_syntax,
+    InlineSyntax,
+    INLINE_SYNTAXES,
 )
+from src.block_markdown import markdown_to_html_node
+from src.flatdoc import markdown_to_flat_document
 
 from src.textnode import TextNode, TextType
 
@@ -168,6 +176,87 @@ class TestInlineMarkdown(unittest.TestCase):
         result_nodes = text_to_textnodes(text)
         self.assertEqual(result_nodes, expected_nodes)
 
+    def test_text_to_spans_matches_textnodes(self):
+        texts = [
+            "This is **text** with an _italic_ word and a `code block`",
+            "![img](/i.png) and [a](/a) [b](/b)",
+            "`[in code](/x)` **[in bold](/y)** _![alt](/z)_",
+            "***a** b*", "a__b", "", "plain",
+        ]
+        for text in texts:
+            spans = text_to_spans(text)
+            self.assertEqual(
+                [TextNode(text[start:end], text_type, url) for text_type, start, end, url in spans],
+                text_to_textnodes(text),
+            )
+        with self.assertRaises(ValueError):
+            text_to_spans("`unclosed")
+
+
+class TestInlineSyntaxRegistry(unittest.TestCase):
+    def test_extension_syntax(self):
+        register_inline_syntax(delimiter_syntax("strike", "~~", "del"), before="image")
+        try:
+            self.assertEqual(
+                text_to_textnodes("a ~~b~~ _c_"),
+                [TextNode("a ", TextType.TEXT), TextNode("b", "strike"),
+                 TextNode(" ", TextType.TEXT), TextNode("c", TextType.ITALIC)],
+            )
+            expected = "<div><p>a <del>b</del></p></div>"
+            self.assertEqual(markdown_to_html_node("a ~~b~~").to_html(), expected)
+            self.assertEqual(markdown_to_flat_document("a ~~b~~").to_html(), expected)
+            self.assertIsNone(text_to_spans("a ~~b~~"))
+        finally:
+            unregister_inline_syntax("strike")
+        self.assertEqual(text_to_textnodes("~~b~~"), [TextNode("~~b~~", TextType.TEXT)])
+        self.assertEqual(text_to_spans("~~b~~"), [(TextType.TEXT, 0, 5, None)])
+
+    def test_passes_skipped_without_trigger(self):
+        calls = []
+        def split(nodes):
+            calls.append(nodes)
+            return nodes
+        register_inline_syntax(InlineSyntax("spy", "@", split))
+        try:
+            text_to_textnodes("plain **text**")
+            self.assertEqual(calls, [])
+            text_to_textnodes("mail @me")
+            self.assertEqual(len(calls), 1)
+        finally:
+            unregister_inline_syntax("spy")
+        self.assertEqual([syntax.name for syntax in INLINE_SYNTAXES],
+                         ["code", "bold", "italic", "image", "link"])
+
+    def test_triggered_passes_run_in_registration_order(self):
+        calls = []
+        def spy(name):
+            def split(nodes):
+                calls.append(name)
+                return nodes
+            return split
+        register_inline_syntax(InlineSyntax("first", "@", spy("first")), before="code")
+        register_inline_syntax(InlineSyntax("second", "@%", spy("second")))
+        try:
+            text_to_textnodes("% **b** @")
+            self.assertEqual(calls, ["first", "second"])
+            # Untriggered extensions leave the span parser in use
+            self.assertEqual(text_to_spans("a **b**"),
+                             [(TextType.TEXT, 0, 2, None), (TextType.BOLD, 4, 5, None)])
+            self.assertIsNone(text_to_spans("a @b"))
+        finally:
+            unregister_inline_syntax("first")
+            unregister_inline_syntax("second")
+
+    def test_spans_need_every_builtin(self):
+        italic = INLINE_SYNTAXES[2]
+        unregister_inline_syntax("italic")
+        try:
+            self.assertIsNone(text_to_spans("plain"))
+            self.assertEqual(markdown_to_flat_document("a _b_").to_html(), "<div><p>a _b_</p></div>")
+        finally:
+            register_inline_syntax(italic, before="image")
+        self.assertEqual(text_to_spans("plain"), [(TextType.TEXT, 0, 5, None)])
+
 
 if __name__ == "__main__":
     unittest.main()
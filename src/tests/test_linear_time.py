@@ -0,0 +1,83 @@
+import random
+import time
+import unittest
+from src.block_markdown import markdown_to_html_node
+from src.highlight import clear_cache
+
+# Pathological inputs for the parser, each a function of a size n.
+ADVERSARIAL_INPUTS = {
+    "open_brackets": lambda n: "[" * n,
+    "unclosed_links": lambda n: "[a](" * n,
+    "unclosed_url": lambda n: "[a](" + "x[" * n,
+    "nested_brackets": lambda n: "[" * n + "a" + "](" * n,
+    "open_parens": lambda n: "[a](" + "(" * n,
+    "many_images": lambda n: "![a](b)" * n,
+    "many_links": lambda n: "[a](b) " * n,
+    "unclosed_code": lambda n: "`" + "a" * n,
+    "unclosed_bold": lambda n: "**a " * n + "**",
+    "unclosed_italic": lambda n: "_" * (2 * n + 1),
+    "huge_line": lambda n: "word **bold** " * n,
+    "long_quote": lambda n: "> quote\n" * n,
+    "list_broken_at_end": lambda n: "- item\n" * n + "not an item",
+    "long_ordered_list": lambda n: "".join(f"{i + 1}. item\n" for i in range(n)),
+    "ordered_list_huge_number": lambda n: "1" * n + ". item",
+    "hashes": lambda n: "#" * n + " heading",
+    "many_blocks": lambda n: "para\n\n" * n,
+    "js_unclosed_comments": lambda n: "```js\n" + "/* a " * n + "\n```",
+    "css_unclosed_comments": lambda n: "```css\n" + "/* a " * n + "\n```",
+    "python_unclosed_docstring": lambda n: "```python\n" + '"""' + " a" * n + "\n```",
+    "js_unclosed_templates": lambda n: "```js\n" + "` a\\" * n + "\n```",
+    "json_unclosed_strings": lambda n: "```json\n" + '"\\' * n + "\n```",
+}
+
+# Growing the input 8x may cost at most this many times more. Linear code
+# lands around 8x; quadratic code would be around 64x.
+MAX_GROWTH = 24
+SMALL = 1000
+LARGE = SMALL * 8
+
+
+def parse_time(markdown):
+    best = None
+    for _ in range(3):
+        # Highlighted code would otherwise come from the cache after the first run
+        clear_cache()
+        start = time.perf_counter()
+        try:
+            markdown_to_html_node(markdown).to_html()
+        except ValueError:
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class TestLinearTime(unittest.TestCase):
+    def test_scaling_is_linear(self):
+        for name, make in ADVERSARIAL_INPUTS.items():
+            with self.subTest(name):
+                small = parse_time(make(SMALL))
+                large = parse_time(make(LARGE))
+                # Ignore inputs too fast to time reliably
+                if large < 0.002:
+                    continue
+                self.assertLess(large / small, MAX_GROWTH)
+
+
+class TestFuzz(unittest.TestCase):
+    ALPHABET = ["[", "]", "(", ")", "!", "**", "_", "`", "#", " ", "\n",
+                "\n\n", "a", ">", "- ", "1. ", "```"]
+
+    def test_random_input_only_raises_value_error(self):
+        for seed in range(500):
+            rng = random.Random(seed)
+            markdown = "".join(rng.choice(self.ALPHABET) for _ in range(rng.randint(0, 80)))
+            with self.subTest(markdown=markdown):
+                try:
+                    markdown_to_html_node(markdown).to_html()
+                except ValueError:
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+from src.critical import CriticalCss
+from src.targets import BuildTarget
+from src.listings import (
+    Page,
+    page_url,
+    tag_slug,
+    section_posts,
+    paginate,
+    generate_listings,
+)
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+def make_posts(count):
+    return [
+        Page(f"content/blog/p{i}/index.md", f"/blog/p{i}/", f"Post {i}",
+             f"2024-01-{i + 1:02d}", ["even" if i % 2 == 0 else "odd"])
+        for i in range(count)
+    ]
+
+
+class TestListings(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.md"), "/")
+        self.assertEqual(page_url("blog/tom/index.md"), "/blog/tom/")
+        self.assertEqual(page_url("about.md"), "/about.html")
+
+    def test_tag_slug(self):
+        self.assertEqual(tag_slug("Lord of the Rings!"), "lord-of-the-rings")
+
+    def test_section_posts_sorted_newest_first(self):
+        pages = [Page("a", "/", "Home")] + make_posts(3)
+        posts = section_posts(pages, "blog")
+        self.assertEqual([post.title for post in posts], ["Post 2", "Post 1", "Post 0"])
+
+    def test_paginate(self):
+        self.assertEqual(paginate([1, 2, 3], 2), [[1, 2], [3]])
+        self.assertEqual(paginate([], 2), [[]])
+
+    def test_generate_listings(self):
+        with tempfile.TemporaryDirectory() as out:
+            written, rendered = generate_listings(make_posts(5), TEMPLATE, out, per_page=2)
+            self.assertIn("blog/index.html", written)
+            self.assertIn("blog/page/3/index.html", written)
+            self.assertIn("tags/even/page/2/index.html", written)
+            self.assertIn("blog/atom.xml", written)
+            self.assertEqual(rendered, len(written))
+            with open(os.path.join(out, "blog", "index.html")) as f:
+                html = f.read()
+            self.assertIn('<a href="/blog/p4/">Post 4</a>', html)
+            self.assertIn('<a href="/blog/page/2/">Older posts</a>', html)
+
+    def test_feed_without_site_url_uses_basepath(self):
+        with tempfile.TemporaryDirectory() as out:
+            generate_listings(make_posts(1), TEMPLATE, out, basepath="/sub/", author="Tom")
+            with open(os.path.join(out, "blog", "atom.xml")) as f:
+                feed = f.read()
+            self.assertIn('<link href="/sub/blog/p0/"/>', feed)
+            self.assertIn('<link href="/sub/blog/atom.xml" rel="self"/>', feed)
+            self.assertIn("<author><name>Tom</name></author>", feed)
+
+            generate_listings(make_posts(1), TEMPLATE, out, site_url="https://example.com/sub")
+            with open(os.path.join(out, "blog", "atom.xml")) as f:
+                feed = f.read()
+            self.assertIn('<link href="https://example.com/sub/blog/p0/"/>', feed)
+            self.assertIn("<author><name>Blog</name></author>", feed)
+
+    def test_cache_covers_target_urls(self):
+        with tempfile.TemporaryDirectory() as out:
+            cache = os.path.join(out, "cache.json")
+            generate_listings(make_posts(1), TEMPLATE, out, cache_path=cache)
+            _, rendered = generate_listings(make_posts(1), TEMPLATE, out, basepath="/sub/",
+                                            cache_path=cache)
+            self.assertGreater(rendered, 0)
+            with open(os.path.join(out, "blog", "index.html")) as f:
+                self.assertIn('<a href="/sub/blog/p0/">', f.read())
+
+            target = BuildTarget(out, "/sub/", assets={"/a.css": "/a.123.css"})
+            _, rendered = generate_listings(make_posts(1), TEMPLATE, out, cache_path=cache,
+                                            target=target)
+            self.assertGreater(rendered, 0)
+
+    def test_section_index_page_is_kept(self):
+        pages = [Page("content/blog/index.md", "/blog/", "My blog")] + make_posts(3)
+        with tempfile.TemporaryDirectory() as out:
+            written, _ = generate_listings(pages, TEMPLATE, out, per_page=2)
+            self.assertNotIn("blog/index.html", written)
+            self.assertIn("blog/page/2/index.html", written)
+            self.assertFalse(os.path.exists(os.path.join(out, "blog", "index.html")))
+
+    def test_listing_over_page_is_an_error(self):
+        pages = [Page("content/tags/even/index.md", "/tags/even/", "Even")] + make_posts(3)
+        with tempfile.TemporaryDirectory() as out:
+            with self.assertRaisesRegex(ValueError, "/tags/even/"):
+                generate_listings(pages, TEMPLATE, out)
+
+    def test_tag_slug_collision_is_an_error(self):
+        posts = make_posts(2)
+        posts[0].tags = ["C++"]
+        posts[1].tags = ["c"]
+        with tempfile.TemporaryDirectory() as out:
+            with self.assertRaisesRegex(ValueError, "/tags/c/"):
+                generate_listings(posts, TEMPLATE, out)
+
+    def test_critical_css(self):
+        template = ('<head><link href="/index.css" rel="stylesheet" /></head>'
+                    "<title>{{ Title }}</title>{{ Content }}")
+        critical = CriticalCss("li a { color: red; }\ntable { margin: 0; }", template)
+        with tempfile.TemporaryDirectory() as out:
+            cache = os.path.join(out, "cache.json")
+            generate_listings(make_posts(2), template, out, cache_path=cache, critical=critical)
+            with open(os.path.join(out, "blog", "index.html")) as f:
+                html = f.read()
+            self.assertIn("<style>li a{color: red;}</style>", html)
+            self.assertIn('rel="preload" as="style"', html)
+            # A different stylesheet invalidates the cached listings
+            other = CriticalCss("li { margin: 0; }", template)
+            _, rendered = generate_listings(make_posts(2), template, out, cache_path=cache,
+                                            critical=other)
+            self.assertGreater(rendered, 0)
+
+    def test_only_affected_listings_rerendered(self):
+        with tempfile.TemporaryDirectory() as out:
+            cache = os.path.join(out, "cache.json")
+            posts = make_posts(6)
+            generate_listings(posts, TEMPLATE, out, cache_path=cache, per_page=2)
+            _, rendered = generate_listings(posts, TEMPLATE, out, cache_path=cache, per_page=2)
+            self.assertEqual(rendered, 0)
+
+            # Retitle the oldest post: only the last blog page, its tag page
+            # and the feed show it.
+            posts[0].title = "Renamed"
+            written, rendered = generate_listings(posts, TEMPLATE, out, cache_path=cache, per_page=2)
+            self.assertEqual(rendered, 3)
+            with open(os.path.join(out, "blog", "page", "3", "index.html")) as f:
+                self.assertIn("Renamed", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+
+import main
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Startup budget for `import main`, in microseconds. Generous enough for slow
+# CI machines, tight enough to catch an eager import of the parser or shutil.
+IMPORT_BUDGET_US = 25000
+LAZY_MODULES = {"src.block_markdown", "src.inline_markdown", "shutil", "argparse"}
+
+
+def import_times(statement):
+    """Run `statement` under -X importtime and return {module: cumulative_us}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_is_lazy(self):
+        times = import_times("import main")
+        self.assertIn("main", times)
+        self.assertFalse(LAZY_MODULES & set(times), LAZY_MODULES & set(times))
+
+    def test_import_budget(self):
+        # Take the best of a few runs to filter out scheduler noise.
+        best = min(import_times("import main")["main"] for _ in range(3))
+        self.assertLess(best, IMPORT_BUDGET_US)
+
+
+class TestFastPath(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.args = [
+            "--content", os.path.join(root, "content"),
+            "--static", os.path.join(root, "static"),
+            "--template", os.path.join(root, "template.html"),
+            "--output", os.path.join(root, "out"),
+            "--cache-dir", os.path.join(root, "cache"),
+        ]
+        write(os.path.join(root, "content", "index.md"), "# Home\n\nHello")
+        write(os.path.join(root, "static", "index.css"), "body {}")
+        write(os.path.join(root, "template.html"), "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, *extra):
+        result = subprocess.run(
+            [sys.executable, "main.py", *extra, *self.args],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        return result.stdout
+
+    def test_second_build_is_noop(self):
+        self.assertIn("All pages generated", self.build())
+        self.assertIn("up to date", self.build())
+
+    def test_change_triggers_rebuild(self):
+        self.build()
+        write(os.path.join(self.tmp.name, "content", "new.md"), "# New")
+        self.assertIn("All pages generated", self.build())
+        self.assertIn("up to date", self.build())
+
+    def test_output_change_triggers_rebuild(self):
+        self.build()
+        out = os.path.join(self.tmp.name, "out")
+        os.remove(os.path.join(out, "index.css"))
+        self.assertIn("All pages generated", self.build())
+        self.assertTrue(os.path.exists(os.path.join(out, "index.css")))
+        write(os.path.join(out, "index.html"), "stale")
+        self.assertIn("All pages generated", self.build())
+        self.assertIn("up to date", self.build())
+
+    def test_basepath_change_triggers_rebuild(self):
+        self.build()
+        self.assertIn("All pages generated", self.build("/sub/"))
+
+    def test_force(self):
+        self.build()
+        self.assertIn("All pages generated", self.build("--force"))
+
+    def test_drafts_skipped(self):
+        write(os.path.join(self.tmp.name, "content", "wip.md"), "---\ndraft: true\n---\n# WIP")
+        out = os.path.join(self.tmp.name, "out")
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(out, "wip.html")))
+        self.build("--drafts")
+        self.assertTrue(os.path.exists(os.path.join(out, "wip.html")))
+
+    def test_ignore_file(self):
+        root = self.tmp.name
+        write(os.path.join(root, "content", ".ssgignore"), "notes/\n")
+        write(os.path.join(root, "content", "notes", "todo.md"), "# Todo")
+        write(os.path.join(root, "static", "index.css~"), "backup")
+        self.build()
+        self.assertEqual(sorted(os.listdir(os.path.join(root, "out"))), ["index.css", "index.html"])
+        # Ignored files don't make the output stale
+        write(os.path.join(root, "content", "notes", "todo.md"), "# Todo\n\nMore")
+        self.assertIn("up to date", self.build())
+
+    def test_trust_dir_mtimes(self):
+        self.build("--trust-dir-mtimes")
+        self.assertIn("up to date", self.build("--trust-dir-mtimes"))
+        write(os.path.join(self.tmp.name, "content", "new.md"), "# New")
+        self.assertIn("All pages generated", self.build("--trust-dir-mtimes"))
+
+    def test_multiple_targets(self):
+        root = self.tmp.name
+        write(os.path.join(root, "content", "index.md"), "# Home\n\n[Contact](/contact)")
+        self.build(
+            "--target", f"output={os.path.join(root, 'staging')}",
+            "--target", f"output={os.path.join(root, 'prod')},basepath=/sub/",
+        )
+        with open(os.path.join(root, "staging", "index.html")) as f:
+            self.assertIn('<a href="/contact">', f.read())
+        with open(os.path.join(root, "prod", "index.html")) as f:
+            self.assertIn('<a href="/sub/contact">', f.read())
+        self.assertTrue(os.path.exists(os.path.join(root, "prod", "index.css")))
+
+    def test_archive_output(self):
+        archive = os.path.join(self.tmp.name, "site.tar.gz")
+        self.build("--target", f"output={archive}")
+        with tarfile.open(archive) as tar:
+            self.assertEqual(sorted(tar.getnames()), ["index.css", "index.html"])
+        self.assertIn("up to date", self.build("--target", f"output={archive}"))
+
+    def test_static_robots_txt_is_kept(self):
+        root = self.tmp.name
+        write(os.path.join(root, "static", "robots.txt"), "User-agent: *\nDisallow: /private/\n")
+        self.build("--site-url", "https://example.com")
+        with open(os.path.join(root, "out", "robots.txt")) as f:
+            self.assertEqual(f.read(), "User-agent: *\nDisallow: /private/\n")
+        self.assertTrue(os.path.exists(os.path.join(root, "out", "sitemap.xml")))
+
+    def test_critical_css(self):
+        root = self.tmp.name
+        write(os.path.join(root, "static", "index.css"), "h1 { color: red; }\nul { margin: 0; }")
+        write(os.path.join(root, "template.html"),
+              '<head><link href="/index.css" rel="stylesheet" /></head>{{ Content }}')
+        self.build("--critical-css", "--fingerprint")
+        with open(os.path.join(root, "out", "index.html")) as f:
+            html = f.read()
+        self.assertIn("<style>h1{color: red;}</style>", html)
+        self.assertIn('rel="preload" as="style"', html)
+        self.assertNotIn('href="/index.css"', html)
+
+    def test_page_node_limit(self):
+        write(os.path.join(self.tmp.name, "content", "big.md"), "# Big\n\n" + "- item\n" * 500)
+        result = subprocess.run(
+            [sys.executable, "main.py", "--max-page-nodes", "200", *self.args],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("big.md", result.stderr)
+        self.assertIn("All pages generated", self.build("--max-page-nodes", "5000"))
+
+    def test_service_worker(self):
+        root = self.tmp.name
+        out = os.path.join(root, "out")
+        write(os.path.join(root, "content", "about.md"), "# About")
+
+        def revisions():
+            with open(os.path.join(out, "precache-manifest.json")) as f:
+                manifest = json.load(f)
+            return {entry["url"]: entry["revision"] for entry in manifest["critical"]}
+
+        self.build("--service-worker")
+        first = revisions()
+        self.assertEqual(sorted(first), ["/", "/about.html", "/index.css"])
+        self.assertTrue(os.path.exists(os.path.join(out, "sw.js")))
+        with open(os.path.join(out, "index.html")) as f:
+            self.assertIn('src="/sw-register.js"', f.read())
+
+        write(os.path.join(root, "content", "about.md"), "# About us")
+        self.build("--service-worker")
+        second = revisions()
+        self.assertEqual(first["/"], second["/"])
+        self.assertNotEqual(first["/about.html"], second["/about.html"])
+
+    def test_fingerprint(self):
+        out = os.path.join(self.tmp.name, "out")
+        write(os.path.join(self.tmp.name, "content", "index.md"), "# Home\n\n![a](/index.css)")
+        write(os.path.join(self.tmp.name, "template.html"), '<link href="/index.css">{{ Content }}')
+        self.build("--fingerprint", "--service-worker")
+        names = [name for name in os.listdir(out)
+                 if name.endswith(".css") and name != "index.css"]
+        self.assertEqual(len(names), 1)
+        with open(os.path.join(out, "index.html")) as f:
+            html = f.read()
+        self.assertIn(f'<link href="/{names[0]}">', html)
+        self.assertIn(f'src="/{names[0]}"', html)
+        # References that aren't rewritten still find the original name
+        self.assertTrue(os.path.exists(os.path.join(out, "index.css")))
+        with open(os.path.join(out, "precache-manifest.json")) as f:
+            urls = [entry["url"] for entry in json.load(f)["critical"]]
+        self.assertIn(f"/{names[0]}", urls)
+        self.assertNotIn("/index.css", urls)
+
+    def test_stamp_changes_with_size(self):
+        path = os.path.join(self.tmp.name, "content", "index.md")
+        before = main.compute_build_stamp([path], {})
+        write(path, "# Home\n\nHello, world")
+        self.assertNotEqual(before, main.compute_build_stamp([path], {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from src.block_markdown import markdown_to_html_node
+from src.flatdoc import FlatDocument, markdown_to_flat_document
+from src.htmlnode import LeafNode, ParentNode
+from src.memory import MemoryBudgetError, MemoryProfiler, format_bytes
+from src.textnode import TextNode
+
+MARKDOWN = "# Title\n\nSome **bold** and _italic_ text\n\n- one\n- two"
+
+
+class TestMemoryProfiler(unittest.TestCase):
+    def test_counts_nodes_per_page(self):
+        with MemoryProfiler() as profiler:
+            with profiler.measure("a.md"):
+                markdown_to_html_node(MARKDOWN)
+            with profiler.measure("b.md") as page:
+                profiler.add_document(page, markdown_to_flat_document("plain"))
+            markdown_to_html_node(MARKDOWN)  # outside any page: not counted
+        a, b = profiler.pages
+        self.assertEqual(a.node_counts, {"TextNode": 11, "LeafNode": 8, "ParentNode": 6})
+        # The flat document is built from match positions, without TextNodes
+        self.assertEqual(b.node_counts, {"document": 3})
+        self.assertGreater(a.peak_bytes, 0)
+
+    def test_restores_classes(self):
+        inits = [cls.__dict__.get("__init__") for cls in (TextNode, LeafNode, ParentNode)]
+        add_node = FlatDocument.add_node
+        with MemoryProfiler():
+            self.assertNotEqual(TextNode.__dict__["__init__"], inits[0])
+            self.assertNotEqual(FlatDocument.add_node, add_node)
+        self.assertEqual([cls.__dict__.get("__init__") for cls in (TextNode, LeafNode, ParentNode)],
+                         inits)
+        self.assertIs(FlatDocument.add_node, add_node)
+
+    def test_node_limit_fails_fast(self):
+        with MemoryProfiler(max_page_nodes=5) as profiler:
+            with self.assertRaises(MemoryBudgetError) as caught:
+                with profiler.measure("big.md"):
+                    markdown_to_html_node(MARKDOWN)
+        self.assertEqual(caught.exception.source, "big.md")
+        self.assertIn("big.md", str(caught.exception))
+        self.assertEqual(profiler.pages[0].nodes, 6)
+
+    def test_limits_checked_while_document_is_built(self):
+        markdown = "\n".join(f"- item {i}" for i in range(3000))
+        for limits in ({"max_page_nodes": 500}, {"max_page_bytes": 1024}):
+            with MemoryProfiler(**limits) as profiler:
+                with self.assertRaises(MemoryBudgetError):
+                    with profiler.measure("list.md"):
+                        markdown_to_flat_document(markdown)
+            # Stopped long before the list's 6,002 document nodes were added
+            self.assertLessEqual(profiler.pages[0].node_counts["document"], 1000)
+
+    def test_memory_limit(self):
+        with MemoryProfiler(max_page_bytes=1024) as profiler:
+            with profiler.measure("small.md"):
+                pass
+            with self.assertRaises(MemoryBudgetError):
+                with profiler.measure("huge.md"):
+                    data = [str(i) for i in range(10000)]
+                    del data
+
+    def test_report(self):
+        with MemoryProfiler() as profiler:
+            for name, size in [("small.md", 10), ("huge.md", 100000), ("mid.md", 1000)]:
+                with profiler.measure(name):
+                    data = [str(i) for i in range(size)]
+                    del data
+        self.assertEqual([page.source for page in profiler.worst(2)], ["huge.md", "mid.md"])
+        lines = profiler.report(2).splitlines()
+        self.assertEqual(lines[0], "Peak memory per page (worst 2 of 3):")
+        self.assertIn("huge.md", lines[1])
+
+    def test_format_bytes(self):
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(1536), "1.5 KiB")
+        self.assertEqual(format_bytes(3 * 2**20), "3.0 MiB")
+
+
+if __name__ == "__main__":
+    unittest.main()
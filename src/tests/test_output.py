@@ -0,0 +1,119 @@
+import os
+import tarfile
+import tempfile
+import time
+import unittest
+import zipfile
+from unittest import mock
+from src.output import ArchiveOutput, DirectoryOutput, MemoryOutput, archive_format, open_output
+from src.sitemap import write_sitemaps
+
+
+def build(output, static_path):
+    output.reset()
+    output.copy_file("images/a.png", static_path)
+    output.write_text("index.html", "<h1>Hi</h1>")
+    with output.open_text("blog/atom.xml") as feed:
+        feed.write("<feed>")
+        feed.write("</feed>")
+    output.close()
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "a.png")
+        with open(self.static, "wb") as f:
+            f.write(b"\x89PNG" * 100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_archive_format(self):
+        self.assertEqual(archive_format("site.tar.gz"), "gz")
+        self.assertEqual(archive_format("site.tgz"), "gz")
+        self.assertEqual(archive_format("site.tar"), "")
+        self.assertEqual(archive_format("site.zip"), "zip")
+        self.assertIsNone(archive_format("docs"))
+        self.assertIsInstance(open_output("docs"), DirectoryOutput)
+        self.assertIsInstance(open_output("site.zip"), ArchiveOutput)
+
+    def test_directory(self):
+        out = self.path("out")
+        build(DirectoryOutput(out), self.static)
+        with open(os.path.join(out, "blog", "atom.xml")) as f:
+            self.assertEqual(f.read(), "<feed></feed>")
+        self.assertTrue(os.path.exists(os.path.join(out, "images", "a.png")))
+
+    def test_memory(self):
+        output = MemoryOutput()
+        build(output, self.static)
+        self.assertEqual(sorted(output.files), ["blog/atom.xml", "images/a.png", "index.html"])
+        feed = output.get("blog/atom.xml")
+        self.assertEqual(feed.body, b"<feed></feed>")
+        self.assertEqual(feed.content_type, "application/xml; charset=utf-8")
+        self.assertEqual(output.get("images/a.png").content_length, 400)
+        self.assertEqual(output.get("images/a.png").content_type, "image/png")
+        self.assertNotEqual(output.get("index.html").etag, feed.etag)
+        self.assertFalse(os.path.exists(self.path("memory")))
+
+    def test_tar_contents(self):
+        for name in ("site.tar", "site.tar.gz", "site.tar.xz"):
+            build(ArchiveOutput(self.path(name)), self.static)
+            with tarfile.open(self.path(name)) as tar:
+                self.assertEqual(tar.getnames(), ["images/a.png", "index.html", "blog/atom.xml"])
+                self.assertEqual(tar.extractfile("blog/atom.xml").read(), b"<feed></feed>")
+                info = tar.getmember("index.html")
+                self.assertEqual((info.mtime, info.uid, info.mode), (0, 0, 0o644))
+
+    def test_zip_contents(self):
+        build(ArchiveOutput(self.path("site.zip")), self.static)
+        with zipfile.ZipFile(self.path("site.zip")) as archive:
+            self.assertEqual(archive.namelist(), ["images/a.png", "index.html", "blog/atom.xml"])
+            self.assertEqual(archive.read("images/a.png"), b"\x89PNG" * 100)
+            self.assertEqual(archive.getinfo("index.html").date_time, (1980, 1, 1, 0, 0, 0))
+
+    def test_archives_are_reproducible(self):
+        for suffix in (".tar.gz", ".zip"):
+            first, second = self.path("one" + suffix), self.path("two" + suffix)
+            build(ArchiveOutput(first), self.static)
+            os.utime(self.static, (time.time() + 100, time.time() + 100))
+            build(ArchiveOutput(second), self.static)
+            with open(first, "rb") as a, open(second, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_source_date_epoch(self):
+        with mock.patch.dict(os.environ, {"SOURCE_DATE_EPOCH": "1700000000"}):
+            build(ArchiveOutput(self.path("site.tar")), self.static)
+        with tarfile.open(self.path("site.tar")) as tar:
+            self.assertEqual(tar.getmember("index.html").mtime, 1700000000)
+
+    def test_duplicate_archive_entry_is_an_error(self):
+        for name in ("site.tar", "site.zip"):
+            output = ArchiveOutput(self.path(name))
+            output.copy_file("robots.txt", self.static)
+            with self.assertRaisesRegex(ValueError, "robots.txt"):
+                output.write_text("robots.txt", "User-agent: *\n")
+            with self.assertRaisesRegex(ValueError, "robots.txt"):
+                with output.open_text("robots.txt"):
+                    pass
+            output.close()
+            # A new archive starts with no names taken
+            build(output, self.static)
+
+    def test_sharded_sitemap_into_archive(self):
+        output = ArchiveOutput(self.path("site.tar"))
+        entries = ((f"/p{i}/", "2024-01-01") for i in range(5))
+        written = write_sitemaps(entries, output, "https://example.com", max_urls=2)
+        output.close()
+        with tarfile.open(self.path("site.tar")) as tar:
+            self.assertEqual(sorted(tar.getnames()), sorted(written))
+            index = tar.extractfile("sitemap.xml").read().decode()
+        self.assertIn("<loc>https://example.com/sitemap-3.xml</loc>", index)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import http.client
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from src.output import MemoryOutput
+from src.preview import PreviewServer, etag_matches, resolve_path
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestResolvePath(unittest.TestCase):
+    def setUp(self):
+        self.output = MemoryOutput()
+        self.output.write_text("index.html", "home")
+        self.output.write_text("blog/index.html", "blog")
+        self.output.write_text("index.css", "body {}")
+
+    def test_files_and_indexes(self):
+        self.assertEqual(resolve_path(self.output, "/")[0].body, b"home")
+        self.assertEqual(resolve_path(self.output, "/blog/")[0].body, b"blog")
+        self.assertEqual(resolve_path(self.output, "/index.css")[0].body, b"body {}")
+        self.assertEqual(resolve_path(self.output, "/blog"), (None, "/blog/"))
+        self.assertEqual(resolve_path(self.output, "/missing"), (None, None))
+        self.assertEqual(resolve_path(self.output, "/../index.css"), (None, None))
+
+    def test_basepath(self):
+        self.assertEqual(resolve_path(self.output, "/sub/blog/", "/sub/")[0].body, b"blog")
+        self.assertEqual(resolve_path(self.output, "/sub/", "/sub/")[0].body, b"home")
+        self.assertEqual(resolve_path(self.output, "/index.css", "/sub/"), (None, None))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches("", '"b"'))
+
+
+class TestPreviewServer(unittest.TestCase):
+    def setUp(self):
+        self.output = MemoryOutput()
+        self.output.write_text("index.html", "<h1>Hi</h1>")
+        self.output.write_text("blog/index.html", "<h1>Blog</h1>")
+        self.server = PreviewServer(("127.0.0.1", 0), self.output)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(self, method, path, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+        try:
+            connection.request(method, path, headers=headers or {})
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            connection.close()
+
+    def test_get(self):
+        response, body = self.request("GET", "/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<h1>Hi</h1>")
+        self.assertEqual(response.getheader("Content-Type"), "text/html; charset=utf-8")
+        self.assertEqual(response.getheader("Content-Length"), str(len(body)))
+        self.assertEqual(response.getheader("ETag"), self.output.get("index.html").etag)
+
+    def test_conditional_get(self):
+        etag = self.output.get("index.html").etag
+        response, body = self.request("GET", "/", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+        response, _ = self.request("GET", "/", {"If-None-Match": '"stale"'})
+        self.assertEqual(response.status, 200)
+
+    def test_head(self):
+        response, body = self.request("HEAD", "/blog/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Length"), "13")
+        self.assertEqual(body, b"")
+
+    def test_redirect_and_missing(self):
+        response, _ = self.request("GET", "/blog?x=1")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/blog/"))
+        response, _ = self.request("GET", "/nope.html")
+        self.assertEqual(response.status, 404)
+
+    def test_concurrent_requests(self):
+        results = []
+        def fetch():
+            results.append(self.request("GET", "/")[1])
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [b"<h1>Hi</h1>"] * 8)
+
+
+class TestPreviewEndToEnd(unittest.TestCase):
+    def test_main_serve(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "content"))
+            os.makedirs(os.path.join(root, "static"))
+            with open(os.path.join(root, "content", "index.md"), "w") as f:
+                f.write("# Home")
+            with open(os.path.join(root, "template.html"), "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            process = subprocess.Popen(
+                [sys.executable, "-u", "main.py", "--serve", "0",
+                 "--content", os.path.join(root, "content"),
+                 "--static", os.path.join(root, "static"),
+                 "--template", os.path.join(root, "template.html"),
+                 "--output", os.path.join(root, "out"),
+                 "--cache-dir", os.path.join(root, "cache")],
+                cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True,
+            )
+            try:
+                for line in process.stdout:
+                    match = re.match(r"Serving \d+ files at http://127.0.0.1:(\d+)/", line)
+                    if match:
+                        break
+                connection = http.client.HTTPConnection("127.0.0.1", int(match.group(1)))
+                connection.request("GET", "/")
+                body = connection.getresponse().read()
+                connection.close()
+                self.assertEqual(body, b"<title>Home</title><div><h1>Home</h1></div>")
+            finally:
+                process.send_signal(signal.SIGINT)
+                process.communicate()
+            # Nothing was written to disk
+            self.assertEqual(sorted(os.listdir(root)), ["content", "static", "template.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
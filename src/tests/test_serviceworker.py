@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from src.output import MemoryOutput
+from src.serviceworker import (
+    PrecacheRecorder,
+    add_registration,
+    page_url,
+    precache_manifest,
+    write_service_worker,
+)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class TestPrecacheManifest(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "")
+        self.assertEqual(page_url("blog/tom/index.html"), "blog/tom/")
+        self.assertEqual(page_url("404.html"), "404.html")
+        self.assertEqual(page_url("images/a.png"), "images/a.png")
+
+    def test_groups_by_size(self):
+        entries = {"index.html": (500, "a" * 64), "images/big.png": (500000, "b" * 64),
+                   "index.css": (2000, "c" * 64)}
+        manifest = precache_manifest(entries, "/sub/", critical_max_bytes=10000)
+        self.assertEqual([entry["url"] for entry in manifest["critical"]],
+                         ["/sub/index.css", "/sub/"])
+        self.assertEqual(manifest["lazy"], [{"url": "/sub/images/big.png",
+                                             "revision": "b" * 16, "size": 500000}])
+
+    def test_version_follows_content(self):
+        entries = {"index.html": (500, "a" * 64)}
+        version = precache_manifest(entries)["version"]
+        self.assertEqual(precache_manifest(dict(entries))["version"], version)
+        entries["index.html"] = (500, "d" * 64)
+        self.assertNotEqual(precache_manifest(entries)["version"], version)
+
+    def test_add_registration(self):
+        html = add_registration("<body>{{ Content }}</body>")
+        self.assertIn('<script src="/sw-register.js" defer></script>', html)
+        self.assertLess(html.index("sw-register"), html.index("</body>"))
+
+
+class TestPrecacheRecorder(unittest.TestCase):
+    def test_records_pages_and_assets(self):
+        with tempfile.TemporaryDirectory() as static:
+            source = os.path.join(static, "a.png")
+            with open(source, "wb") as f:
+                f.write(b"png")
+            output = MemoryOutput()
+            recorder = PrecacheRecorder(output, {source: "f" * 64}, ["a.png"])
+            recorder.reset()
+            recorder.copy_file("a.1234.png", source)
+            recorder.copy_file("a.png", source)
+            recorder.write_text("index.html", "<h1>Hi</h1>")
+            recorder.write_text("blog/atom.xml", "<feed/>")
+            with recorder.open_text("sitemap.xml") as sitemap:
+                sitemap.write("<urlset/>")
+        self.assertEqual(recorder.entries, {
+            "a.1234.png": (3, "f" * 64),
+            "index.html": (11, sha256(b"<h1>Hi</h1>")),
+        })
+        self.assertEqual(sorted(output.files),
+                         ["a.1234.png", "a.png", "blog/atom.xml", "index.html", "sitemap.xml"])
+
+    def test_write_service_worker(self):
+        output = MemoryOutput()
+        manifest = write_service_worker(output, {"index.html": (11, "a" * 64)}, "/sub/")
+        self.assertEqual(json.loads(output.get("precache-manifest.json").body), manifest)
+        sw = output.get("sw.js").body.decode()
+        self.assertIn(f'const VERSION = "{manifest["version"]}";', sw)
+        self.assertIn('"/sub/precache-manifest.json?v="', sw)
+        self.assertIn('register("/sub/sw.js", {scope: "/sub/"})',
+                      output.get("sw-register.js").body.decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.listings import Page
+from src.sitemap import (
+    LastmodTracker,
+    build_date,
+    generate_sitemap,
+    source_lastmod,
+    write_sitemaps,
+)
+
+
+class TestSitemap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.out, name)) as f:
+            return f.read()
+
+    def test_single_sitemap(self):
+        written = write_sitemaps([("/", "2024-01-01"), ("/a/", "2024-01-02")],
+                                 self.out, "https://example.com")
+        self.assertEqual(written, ["sitemap.xml"])
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<url><loc>https://example.com/a/</loc><lastmod>2024-01-02</lastmod></url>", sitemap)
+        self.assertTrue(sitemap.endswith("</urlset>\n"))
+        self.assertFalse(os.path.exists(os.path.join(self.out, "sitemap-1.xml")))
+
+    def test_sharded_sitemap(self):
+        entries = ((f"/p{i}/", "2024-01-01") for i in range(5))
+        written = write_sitemaps(entries, self.out, "https://example.com", max_urls=2)
+        self.assertEqual(written, ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"])
+        index = self.read("sitemap.xml")
+        self.assertIn("<sitemapindex", index)
+        self.assertIn("<loc>https://example.com/sitemap-3.xml</loc>", index)
+        self.assertEqual(self.read("sitemap-3.xml").count("<url>"), 1)
+        self.assertEqual(self.read("sitemap-1.xml").count("<url>"), 2)
+
+    def test_lastmod_stable_for_unchanged_content(self):
+        cache = os.path.join(self.out, "lastmod.json")
+        tracker = LastmodTracker(cache, today="2024-01-01")
+        self.assertEqual(tracker.lastmod("/a/", "hash1"), "2024-01-01")
+        self.assertEqual(tracker.lastmod("/b/", "hash2"), "2024-01-01")
+        tracker.save()
+
+        tracker = LastmodTracker(cache, today="2024-02-01")
+        self.assertEqual(tracker.lastmod("/a/", "hash1"), "2024-01-01")
+        self.assertEqual(tracker.lastmod("/b/", "changed"), "2024-02-01")
+
+    def test_lastmod_without_history_is_reproducible(self):
+        source = os.path.join(self.out, "a.md")
+        with open(source, "w") as f:
+            f.write("# A")
+        os.utime(source, (1700000000, 1700000000))
+        pages = [Page(source, "/a/", "A", source_hash="h"),
+                 Page(source, "/b/", "B", "2024-03-04 10:00:00", source_hash="h")]
+        with mock.patch.dict(os.environ, {"SOURCE_DATE_EPOCH": "1600000000"}):
+            self.assertEqual(build_date(), "2020-09-13")
+            self.assertEqual(source_lastmod(pages[0]), "2020-09-13")
+        with mock.patch.dict(os.environ):
+            os.environ.pop("SOURCE_DATE_EPOCH", None)
+            self.assertEqual(source_lastmod(pages[0]), "2023-11-14")
+            generate_sitemap(pages, self.out, "https://example.com",
+                             os.path.join(self.out, "lastmod.json"))
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<loc>https://example.com/a/</loc><lastmod>2023-11-14</lastmod>", sitemap)
+        self.assertIn("<loc>https://example.com/b/</loc><lastmod>2024-03-04</lastmod>", sitemap)
+
+        # A page seen changing gets the build date, not its fallback
+        tracker = LastmodTracker(os.path.join(self.out, "lastmod.json"), today="2025-01-01")
+        self.assertEqual(tracker.lastmod("/a/", "changed", "2023-11-14"), "2025-01-01")
+
+    def test_generate_sitemap_writes_robots(self):
+        pages = [Page("index.md", "/", "Home", source_hash="h")]
+        generate_sitemap(pages, self.out, "https://example.com/sub")
+        self.assertIn("Sitemap: https://example.com/sub/sitemap.xml", self.read("robots.txt"))
+        self.assertIn("https://example.com/sub/", self.read("sitemap.xml"))
+
+    def test_generate_sitemap_can_leave_robots_alone(self):
+        with open(os.path.join(self.out, "robots.txt"), "w") as f:
+            f.write("User-agent: *\nDisallow: /private/\n")
+        pages = [Page("index.md", "/", "Home", source_hash="h")]
+        generate_sitemap(pages, self.out, "https://example.com", robots=False)
+        self.assertEqual(self.read("robots.txt"), "User-agent: *\nDisallow: /private/\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
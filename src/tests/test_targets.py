@@ -0,0 +1,70 @@
+import unittest
+from src.flatdoc import markdown_to_flat_document
+from src.htmlnode import LeafNode, ParentNode
+from src.targets import BuildTarget, parse_target, rewrite_html_node_urls
+from src.template import rewrite_template_urls, render_template
+
+
+class TestBuildTarget(unittest.TestCase):
+    def test_rewrite_url(self):
+        target = BuildTarget("out", "/sub/")
+        self.assertEqual(target.rewrite_url("/images/a.png"), "/sub/images/a.png")
+        self.assertEqual(target.rewrite_url("/"), "/sub/")
+        self.assertEqual(target.rewrite_url("https://boot.dev"), "https://boot.dev")
+        self.assertEqual(target.rewrite_url("//cdn.example.com/x"), "//cdn.example.com/x")
+        self.assertEqual(target.rewrite_url("#top"), "#top")
+
+    def test_basepath_normalized(self):
+        self.assertEqual(BuildTarget("out", "sub").basepath, "/sub/")
+
+    def test_site_root(self):
+        self.assertEqual(BuildTarget("out", "/sub/", "https://x.com/").site_root(), "https://x.com/sub")
+        self.assertEqual(BuildTarget("out").site_root(), "")
+
+    def test_parse_target(self):
+        target = parse_target("output=docs,basepath=/sub/,site_url=https://x.com")
+        self.assertEqual(
+            (target.output_dir, target.basepath, target.site_url),
+            ("docs", "/sub/", "https://x.com"),
+        )
+        self.assertEqual(parse_target("public").output_dir, "public")
+
+    def test_parse_target_errors(self):
+        with self.assertRaises(ValueError):
+            parse_target("basepath=/sub/")
+        with self.assertRaises(ValueError):
+            parse_target("output=docs,colour=blue")
+
+
+class TestUrlRewriting(unittest.TestCase):
+    def test_template_urls(self):
+        template = '<link href="/index.css"><a href="https://x.com">{{ Content }}</a>'
+        self.assertEqual(
+            rewrite_template_urls(template, BuildTarget("", "/sub/").rewrite_url),
+            '<link href="/sub/index.css"><a href="https://x.com">{{ Content }}</a>',
+        )
+
+    def test_content_text_untouched(self):
+        # Only the template's attributes are rewritten, not page content
+        html = render_template('<a href="/">{{ Content }}</a>', "T", 'href="/x"', "/sub/")
+        self.assertEqual(html, '<a href="/sub/">href="/x"</a>')
+
+    def test_document_rendered_per_target(self):
+        doc = markdown_to_flat_document("[home](/) and ![img](/a.png) and [ext](https://x.com)")
+        staging = doc.to_html(rewrite_url=BuildTarget("a").rewrite_url)
+        production = doc.to_html(rewrite_url=BuildTarget("b", "/sub/").rewrite_url)
+        self.assertIn('<a href="/">home</a>', staging)
+        self.assertIn('<a href="/sub/">home</a>', production)
+        self.assertIn('src="/sub/a.png"', production)
+        self.assertIn('<a href="https://x.com">ext</a>', production)
+        # The parsed document itself is unchanged
+        self.assertEqual(sorted(url for _, _, url in doc.urls()), ["/", "/a.png", "https://x.com"])
+
+    def test_html_node_urls(self):
+        node = ParentNode("p", [LeafNode("a", "x", {"href": "/a"}), LeafNode(None, "t")])
+        rewrite_html_node_urls(node, BuildTarget("", "/sub/").rewrite_url)
+        self.assertEqual(node.to_html(), '<p><a href="/sub/a">x</a>t</p>')
+
+
+if __name__ == "__main__":
+    unittest.main()
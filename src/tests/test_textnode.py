@@ -30,6 +30,9 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, text, https://www.boot.dev)", repr(node)
         )
 
+    def test_repr_extension_type(self):
+        self.assertEqual(repr(TextNode("b", "strike")), "TextNode(b, strike, None)")
+
 
 class TestTextNodeToHtmlNode(unittest.TestCase):
     def test_text(self):
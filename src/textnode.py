@@ -12,6 +12,11 @@ class TextType(Enum):
     IMAGE = "image"     # ![alt text](url)
 
 
+# HTML tag for each text type added by an inline syntax extension
+# (see register_inline_syntax in src/inline_markdown.py).
+EXTENSION_TAGS = {}
+
+
 class TextNode:
     def __init__(self, text, text_type:TextType, url=None):
         self.text = text
@@ -26,7 +31,9 @@ class TextNode:
         )
     
     def __repr__(self):
-        return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
+        # Extension syntaxes use their name, a plain string, as text type
+        text_type = self.text_type.value if isinstance(self.text_type, TextType) else self.text_type
+        return f"TextNode({self.text}, {text_type}, {self.url})"
 
 
 
@@ -45,4 +52,6 @@ def text_node_to_html_node(text_node):
         case TextType.IMAGE:
             return LeafNode(tag="img", value ="" , props={"alt": text_node.text, "src": text_node.url})
         case _:
+            if text_node.text_type in EXTENSION_TAGS:
+                return LeafNode(tag=EXTENSION_TAGS[text_node.text_type], value=text_node.text)
             raise Exception("not valid")